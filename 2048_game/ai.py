@@ -0,0 +1,128 @@
+# AI players for 2048, working on packed boards (see bitboard.py / engine.py).
+#
+# Every player has choose(board) -> direction (bitboard.LEFT/UP/RIGHT/DOWN) or None
+# when no move is possible, so Game2048.auto_play and headless runners can use any of them.
+# Players default to 4x4; pass size=N for other boards.
+import time
+import bitboard
+import engine
+import heuristics
+from ntuple import NTupleAI
+
+# Direction -> key, in the order Game2048 has always tried moves (ties keep the first)
+MOVE_ORDER: tuple[tuple[str, int], ...] = (
+    ('a', bitboard.LEFT), ('w', bitboard.UP), ('s', bitboard.DOWN), ('d', bitboard.RIGHT))
+
+# Value of a lost position in the search: below any score a live board can get, as
+# evaluations (heuristics.py weights, custom evaluate functions) may go negative
+LOSS_VALUE = -1e9
+
+
+class GreedyAI():
+    # One-ply search: the move whose resulting board evaluates best (see heuristics.py)
+    name = "greedy"
+
+    def __init__(self, weights: dict[str, float] | None = None, evaluate=None, size: int = 4):
+        self.engine = engine.get_engine(size)
+        self.evaluate = evaluate or heuristics.get(weights, size)
+
+    def choose(self, board: int) -> int | None:
+        best_direction = None
+        best_score = float("-inf")
+        move = self.engine.move
+        for _key, direction in MOVE_ORDER:
+            moved = move(board, direction)
+            if moved != board:
+                score = self.evaluate(moved)
+                if score > best_score:
+                    best_score = score
+                    best_direction = direction
+        return best_direction
+
+
+class _Timeout(Exception):
+    pass
+
+
+class ExpectimaxAI():
+    # Depth-limited expectimax: max nodes for the player's moves, chance nodes for
+    # the 2 (90%) / 4 (10%) spawn on every empty cell.
+    #
+    # - iterative deepening up to max_depth within time_budget seconds per move
+    #   (the deepest fully searched depth decides; depth 1 always completes)
+    # - branches whose probability falls below prob_cutoff are evaluated, not expanded
+    # - a transposition table (board -> (depth, value)) shares repeated chance nodes
+    # Leaves are scored by heuristics.get(weights), or by a custom evaluate(board).
+    name = "expectimax"
+
+    def __init__(self, time_budget: float = 0.02, max_depth: int = 4, prob_cutoff: float = 1e-4,
+                 weights: dict[str, float] | None = None, evaluate=None, size: int = 4):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.prob_cutoff = prob_cutoff
+        self.engine = engine.get_engine(size)
+        self.evaluate = evaluate or heuristics.get(weights, size)
+        self.table: dict[int, tuple[int, float]] = {}
+        self._deadline = 0.0
+        self._nodes = 0
+        # statistics of the last choose() call
+        self.last_depth = 0
+        self.last_nodes = 0
+
+    def choose(self, board: int) -> int | None:
+        moves = [(d, m) for _key, d in MOVE_ORDER if (m := self.engine.move(board, d)) != board]
+        if not moves:
+            return None
+        self.table.clear()
+        self._nodes = 0
+        self._deadline = time.perf_counter() + self.time_budget
+        best = moves[0][0]
+        self.last_depth = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = max(moves, key=lambda dm: self._chance(dm[1], depth - 1, 1.0,
+                                                              check=depth > 1))[0]
+            except _Timeout:
+                break
+            self.last_depth = depth
+            if time.perf_counter() > self._deadline:
+                break
+        self.last_nodes = self._nodes
+        return best
+
+    def _chance(self, board: int, depth: int, prob: float, check: bool = True) -> float:
+        # Expected value over the spawn of a 2 or 4 on every empty cell
+        if depth == 0 or prob < self.prob_cutoff:
+            return self.evaluate(board)
+        hit = self.table.get(board)
+        if hit is not None and hit[0] >= depth:
+            return hit[1]
+        self._nodes += 1
+
+        empty = self.engine.empty_cells(board)
+        p = prob / len(empty)
+        total = 0.0
+        for i in empty:
+            # checked per spawn: a chance node on a large board has hundreds of children
+            if check and time.perf_counter() > self._deadline:
+                raise _Timeout()
+            total += 0.9 * self._max(board | (1 << i), depth, p * 0.9, check)
+            total += 0.1 * self._max(board | (2 << i), depth, p * 0.1, check)
+        value = total / len(empty)
+        self.table[board] = (depth, value)
+        return value
+
+    def _max(self, board: int, depth: int, prob: float, check: bool) -> float:
+        # Best move value for the player (LOSS_VALUE when the game is lost)
+        best = LOSS_VALUE
+        for move in self.engine.moves:
+            moved = move(board)
+            if moved != board:
+                value = self._chance(moved, depth - 1, prob, check)
+                if value > best:
+                    best = value
+        return best
+
+
+# Players available by name (auto_play, headless runners)
+PLAYERS = {"greedy": GreedyAI, "expectimax": ExpectimaxAI, "ntuple": NTupleAI}
@@ -0,0 +1,200 @@
+# NumPy-batched 2048 engine: N boards stepped at once.
+#
+# Boards are an (N, 4, 4) uint8 array of log2 tile values (0 = empty, 1 = 2, ...), the
+# same encoding as bitboard.py. A move packs every 4-cell line into its 16-bit row code
+# and looks the result up in one (65536, 4) table, so a step is a few array operations
+# whatever N is. Moves use bitboard's codes (LEFT, UP, RIGHT, DOWN = 0, 1, 2, 3).
+#
+#   boards = BatchBoards(10000, seed=0)
+#   while boards.alive.any():
+#       boards.step(policy(boards))
+#
+# Spawning:
+#   "python" - board i draws from random.Random(seed + i) exactly like bitboard.spawn,
+#              so it replays the same game as Game2048(seed=seed + i)
+#   "numpy"  - one vectorized np.random.Generator draw for all boards (same 90%/10%
+#              odds, uniform empty cell; much faster, different sequence)
+#
+#   python batch.py --boards 10000 --steps 300   # board-steps/sec of random play, JSON
+import argparse
+import json
+import random
+import time
+import numpy as np
+import bitboard
+
+_SHIFTS = np.array([0, 4, 8, 12], dtype=np.uint16)
+
+
+def _table_cells(table: list[int]) -> np.ndarray:
+    # (65536, 4) uint8: the cells of every row code after the move
+    codes = np.array(table, dtype=np.uint16)
+    return ((codes[:, None] >> _SHIFTS) & 0xF).astype(np.uint8)
+
+
+LEFT_CELLS = _table_cells(bitboard.ROW_LEFT)
+LEFT_SCORE = np.array(bitboard.SCORE_LEFT, dtype=np.int64)
+# row code -> row code after sliding (a line can move iff its code changes)
+LEFT_CODES = np.array(bitboard.ROW_LEFT, dtype=np.uint16)
+RIGHT_CODES = np.array(bitboard.ROW_RIGHT, dtype=np.uint16)
+
+
+def _oriented(boards: np.ndarray, direction: int) -> np.ndarray:
+    # View of boards whose rows slide left for the given direction
+    if direction == bitboard.LEFT:
+        return boards
+    if direction == bitboard.RIGHT:
+        return boards[:, :, ::-1]
+    if direction == bitboard.UP:
+        return boards.transpose(0, 2, 1)
+    return boards.transpose(0, 2, 1)[:, :, ::-1]
+
+
+def _row_codes(lines: np.ndarray) -> np.ndarray:
+    # (..., 4) uint8 cells -> (...) uint16 row codes
+    lines = lines.astype(np.uint16)
+    return lines[..., 0] | (lines[..., 1] << 4) | (lines[..., 2] << 8) | (lines[..., 3] << 12)
+
+
+def slide(boards: np.ndarray, direction: int) -> tuple[np.ndarray, np.ndarray]:
+    # (moved copy of boards, merge score per board) for one direction
+    codes = _row_codes(_oriented(boards, direction))
+    moved = np.empty_like(boards)
+    _oriented(moved, direction)[...] = LEFT_CELLS[codes]
+    return moved, LEFT_SCORE[codes].sum(axis=1)
+
+
+def apply_moves(boards: np.ndarray, moves: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Apply one move per board: (new boards, merge score per board)
+    out = boards.copy()
+    score = np.zeros(len(boards), dtype=np.int64)
+    for direction in range(4):
+        idx = np.flatnonzero(moves == direction)
+        if len(idx):
+            out[idx], score[idx] = slide(boards[idx], direction)
+    return out, score
+
+
+def legal_moves(boards: np.ndarray) -> np.ndarray:
+    # (N, 4) bool: which directions change each board
+    legal = np.empty((len(boards), 4), dtype=bool)
+    rows = _row_codes(boards)
+    cols = _row_codes(boards.transpose(0, 2, 1))
+    legal[:, bitboard.LEFT] = (LEFT_CODES[rows] != rows).any(axis=1)
+    legal[:, bitboard.RIGHT] = (RIGHT_CODES[rows] != rows).any(axis=1)
+    legal[:, bitboard.UP] = (LEFT_CODES[cols] != cols).any(axis=1)
+    legal[:, bitboard.DOWN] = (RIGHT_CODES[cols] != cols).any(axis=1)
+    return legal
+
+
+def is_terminal(boards: np.ndarray) -> np.ndarray:
+    # (N,) bool: no empty cell and no equal neighbours (same test as Game2048.can_merge)
+    return ~((boards == 0).any(axis=(1, 2))
+             | (boards[:, :, 1:] == boards[:, :, :-1]).any(axis=(1, 2))
+             | (boards[:, 1:, :] == boards[:, :-1, :]).any(axis=(1, 2)))
+
+
+class BatchBoards():
+    def __init__(self, n: int, seed: int = 0, spawn: str = "python"):
+        if spawn not in ("python", "numpy"):
+            raise ValueError(f"unknown spawn mode: {spawn}")
+        self.spawn_mode = spawn
+        self.boards = np.zeros((n, 4, 4), dtype=np.uint8)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.moves = np.zeros(n, dtype=np.int64)
+        self.alive = np.ones(n, dtype=bool)
+        if spawn == "python":
+            self.rngs = [random.Random(seed + i) for i in range(n)]
+        else:
+            self.rng = np.random.default_rng(seed)
+
+        # Two starting tiles, like Game2048.__init__
+        everyone = np.arange(n)
+        self.spawn(everyone)
+        self.spawn(everyone)
+
+    def spawn(self, idx: np.ndarray) -> None:
+        # Place a 2 (90%) or 4 (10%) on a random empty cell of each board in idx
+        if self.spawn_mode == "python":
+            flat = self.boards.reshape(-1, 16)
+            for i in idx.tolist():
+                rng = self.rngs[i]
+                # same draws as bitboard.spawn: an index into the row-major empty cells, then the tile
+                empty = np.flatnonzero(flat[i] == 0)
+                if len(empty):
+                    cell = empty[rng.randrange(len(empty))]
+                    flat[i, cell] = 2 if rng.random() < 0.1 else 1
+            return
+        if not len(idx):
+            return
+        flat = self.boards[idx].reshape(len(idx), 16)
+        empty = flat == 0
+        # the k-th empty cell of each board, k uniform in [0, empty count)
+        k = (self.rng.random(len(idx)) * empty.sum(axis=1)).astype(np.int64)
+        cell = (empty.cumsum(axis=1) > k[:, None]).argmax(axis=1)
+        tiles = np.where(self.rng.random(len(idx)) < 0.1, 2, 1).astype(np.uint8)
+        flat[np.arange(len(idx)), cell] = tiles
+        self.boards[idx] = flat.reshape(-1, 4, 4)
+
+    def step(self, moves: np.ndarray) -> np.ndarray:
+        # Move every live board (moves: (N,) directions), spawn where the board changed,
+        # update score/moves/alive. Returns the (N,) bool mask of boards that moved.
+        live = np.flatnonzero(self.alive)
+        before = self.boards[live]
+        after, gained = apply_moves(before, np.asarray(moves)[live])
+        moved = (after != before).any(axis=(1, 2))
+        self.boards[live] = after
+        self.score[live] += gained
+        self.moves[live] += moved
+        self.spawn(live[moved])
+        # only changed boards can have become terminal
+        self.alive[live[moved]] = ~is_terminal(self.boards[live[moved]])
+        changed = np.zeros(len(self.boards), dtype=bool)
+        changed[live] = moved
+        return changed
+
+    def max_tile(self) -> np.ndarray:
+        # (N,) largest tile value of each board
+        return np.left_shift(1, self.boards.max(axis=(1, 2)).astype(np.int64))
+
+    def layout(self, i: int) -> list[list[int]]:
+        # Board i in Game2048's list-of-lists tile values
+        return [[1 << int(e) if e else 0 for e in row] for row in self.boards[i]]
+
+
+def random_policy(boards: BatchBoards, rng: np.random.Generator) -> np.ndarray:
+    # A uniformly random legal move per board (0 where none is legal)
+    weights = rng.random((len(boards.boards), 4)) * legal_moves(boards.boards)
+    return weights.argmax(axis=1)
+
+
+def benchmark(n: int, steps: int, spawn: str = "numpy", seed: int = 0) -> dict:
+    # Random play on n boards for up to steps steps; throughput in board-steps/sec
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    boards = BatchBoards(n, seed, spawn)
+    board_steps = 0
+    for _ in range(steps):
+        if not boards.alive.any():
+            break
+        board_steps += int(boards.alive.sum())
+        boards.step(random_policy(boards, rng))
+    elapsed = time.perf_counter() - start
+    return {"boards": n, "spawn": spawn, "board_steps": board_steps, "seconds": round(elapsed, 3),
+            "board_steps_per_sec": round(board_steps / elapsed) if elapsed else None,
+            "alive": int(boards.alive.sum()), "avg_score": round(float(boards.score.mean()), 1)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Measure the batched engine in board-steps/sec (random play).")
+    parser.add_argument("--boards", type=int, nargs="+", default=[10000])
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--spawn", choices=["numpy", "python"], nargs="+", default=["numpy", "python"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps([benchmark(n, args.steps, spawn, args.seed) for n in args.boards for spawn in args.spawn],
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# Benchmark suite for the 2048 engines and AIs, reported as JSON for run-to-run comparison.
+#
+#   python benchmark.py                          # every section, default sizes
+#   python benchmark.py --sections moves spawn --boards 20000 --out bench.json
+#   python benchmark.py --sections ai --ai-games 20 --time-budget 0.01
+#
+# Sections (all inputs come from fixed seeds, so runs are comparable):
+#   moves     moves/sec: list-based rotate + calculation (Game2048) vs bitboard vs batch
+#   can_move  checks/sec: Game2048.can_merge vs bitboard.can_move vs batch.is_terminal
+#   spawn     spawns/sec of Game2048.random_cell and bitboard.spawn by number of filled cells
+#   ai        decisions/sec, win rate and average score of each ai.PLAYERS strategy
+#             (ntuple is skipped until its weights are trained)
+import argparse
+import json
+import platform
+import random
+import time
+import numpy as np
+import ai
+import batch
+import bitboard
+import simulate
+from main import Game2048
+
+SECTIONS = ("moves", "can_move", "spawn", "ai")
+FILL_LEVELS = (2, 6, 10, 14, 15)
+
+
+def random_layouts(n: int, seed: int = 0, filled: int | None = None) -> list[list[list[int]]]:
+    # n random 4x4 layouts (filled tiles each, or a random count) with tiles 2..1024
+    rng = random.Random(seed)
+    layouts = []
+    for _ in range(n):
+        count = filled if filled is not None else rng.randint(1, 16)
+        cells = rng.sample(range(16), count)
+        layout = [[0] * 4 for _ in range(4)]
+        for cell in cells:
+            layout[cell // 4][cell % 4] = 1 << rng.randint(1, 10)
+        layouts.append(layout)
+    return layouts
+
+
+def _rate(count: int, seconds: float) -> float | None:
+    return round(count / seconds) if seconds else None
+
+
+def bench_moves(layouts) -> dict:
+    game = Game2048(seed=0)
+    keys = list(game.rotation)
+    n = len(layouts) * 4
+
+    start = time.perf_counter()
+    for layout in layouts:
+        for key in keys:
+            rot = game.rotation[key]
+            game.rotate(game.calculation(game.rotate(layout, rot)), (4 - rot) % 4)
+    list_seconds = time.perf_counter() - start
+
+    boards = [bitboard.from_layout(layout) for layout in layouts]
+    move = bitboard.move
+    start = time.perf_counter()
+    for board in boards:
+        for direction in range(4):
+            move(board, direction)
+    bitboard_seconds = time.perf_counter() - start
+
+    arrays = np.array([[[int(v).bit_length() - 1 if v else 0 for v in row] for row in layout]
+                       for layout in layouts], dtype=np.uint8)
+    start = time.perf_counter()
+    for direction in range(4):
+        batch.slide(arrays, direction)
+    batch_seconds = time.perf_counter() - start
+
+    return {"moves": n,
+            "list_moves_per_sec": _rate(n, list_seconds),
+            "bitboard_moves_per_sec": _rate(n, bitboard_seconds),
+            "batch_moves_per_sec": _rate(n, batch_seconds)}
+
+
+def bench_can_move(layouts) -> dict:
+    game = Game2048(seed=0)
+    n = len(layouts)
+
+    start = time.perf_counter()
+    for layout in layouts:
+        game.can_merge(layout)
+    list_seconds = time.perf_counter() - start
+
+    boards = [bitboard.from_layout(layout) for layout in layouts]
+    start = time.perf_counter()
+    for board in boards:
+        bitboard.can_move(board)
+    bitboard_seconds = time.perf_counter() - start
+
+    arrays = np.array([[[int(v).bit_length() - 1 if v else 0 for v in row] for row in layout]
+                       for layout in layouts], dtype=np.uint8)
+    start = time.perf_counter()
+    batch.is_terminal(arrays)
+    batch_seconds = time.perf_counter() - start
+
+    return {"checks": n,
+            "can_merge_per_sec": _rate(n, list_seconds),
+            "bitboard_can_move_per_sec": _rate(n, bitboard_seconds),
+            "batch_is_terminal_per_sec": _rate(n, batch_seconds)}
+
+
+def bench_spawn(n: int, seed: int = 0) -> dict:
+    result = {}
+    for filled in FILL_LEVELS:
+        layouts = random_layouts(n, seed, filled)
+        copies = [[row[:] for row in layout] for layout in layouts]
+        game = Game2048(seed=seed)
+        start = time.perf_counter()
+        for layout in copies:
+            game.layout = layout
+            game.random_cell()
+        cell_seconds = time.perf_counter() - start
+
+        boards = [bitboard.from_layout(layout) for layout in layouts]
+        rng = random.Random(seed)
+        spawn = bitboard.spawn
+        start = time.perf_counter()
+        for board in boards:
+            spawn(board, rng)
+        bitboard_seconds = time.perf_counter() - start
+
+        result[str(filled)] = {"random_cell_per_sec": _rate(n, cell_seconds),
+                               "bitboard_spawn_per_sec": _rate(n, bitboard_seconds)}
+    return {"spawns": n, "by_filled_cells": result}
+
+
+def bench_ai(games: int, seed: int = 0, time_budget: float | None = None) -> dict:
+    result = {}
+    for strategy in ai.PLAYERS:
+        options = {"time_budget": time_budget} if strategy == "expectimax" and time_budget is not None else {}
+        try:
+            stats = simulate.simulate(strategy, games, seed, workers=1, options=options)
+        except FileNotFoundError as e:
+            # the ntuple player needs trained weights (python ntuple.py train)
+            result[strategy] = {"skipped": str(e)}
+            continue
+        result[strategy] = {"games": games, "options": options,
+                            "decisions_per_sec": stats["moves_per_sec"],
+                            "win_rate": stats["win_rate"],
+                            "avg_score": stats["avg_score"],
+                            "max_tile": stats["max_tile"]}
+    return result
+
+
+def run(sections=SECTIONS, boards: int = 10000, ai_games: int = 5, seed: int = 0,
+        time_budget: float | None = None) -> dict:
+    # Run the selected sections and return the JSON-ready report
+    report = {"python": platform.python_version(), "seed": seed}
+    layouts = random_layouts(boards, seed) if {"moves", "can_move"} & set(sections) else None
+    if "moves" in sections:
+        report["moves"] = bench_moves(layouts)
+    if "can_move" in sections:
+        report["can_move"] = bench_can_move(layouts)
+    if "spawn" in sections:
+        report["spawn"] = bench_spawn(boards, seed)
+    if "ai" in sections:
+        report["ai"] = bench_ai(ai_games, seed, time_budget)
+    return report
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the 2048 engines and AIs (JSON report).")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--boards", type=int, default=10000, help="random boards for moves/can_move/spawn")
+    parser.add_argument("--ai-games", type=int, default=5, help="seeded games per AI strategy")
+    parser.add_argument("--time-budget", type=float, default=None, help="expectimax seconds per move")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="also write the JSON to this file")
+    args = parser.parse_args(argv)
+    text = json.dumps(run(args.sections, args.boards, args.ai_games, args.seed, args.time_budget), indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
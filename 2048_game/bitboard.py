@@ -0,0 +1,199 @@
+# 64-bit bitboard engine for 2048.
+#
+# The 4x4 board is one Python int: cell (row, col) is the 4-bit nibble at bit
+# 16*row + 4*col and holds log2 of the tile (0 = empty, 1 = 2, 2 = 4, ... 15 = 32768).
+# A row is therefore a 16-bit value, and a move is four lookups into precomputed
+# 65536-entry row tables. Up/down moves transpose the board, move the rows and
+# transpose back, so no lists are built while moving.
+
+LEFT, UP, RIGHT, DOWN = 0, 1, 2, 3
+
+# Keyboard keys used by Game2048 -> direction
+KEY_TO_DIRECTION: dict[str, int] = {'a': LEFT, 'w': UP, 'd': RIGHT, 's': DOWN}
+DIRECTION_KEYS = "awds"  # direction -> key (DIRECTION_KEYS[LEFT] == 'a')
+
+ROW_MASK = 0xFFFF
+MAX_EXPONENT = 15  # a nibble holds at most 2**15 = 32768
+
+
+def _reverse_row(row: int) -> int:
+    # Mirror the four nibbles of a row
+    return ((row >> 12) | ((row >> 4) & 0x00F0) | ((row << 4) & 0x0F00) | (row << 12)) & ROW_MASK
+
+
+def _build_tables() -> tuple[list[int], list[int], list[int], list[int]]:
+    # Precompute the result and score of sliding every possible row left and right
+    left = [0] * 65536
+    right = [0] * 65536
+    score_left = [0] * 65536
+    score_right = [0] * 65536
+    for row in range(65536):
+        cells = [(row >> (4 * i)) & 0xF for i in range(4)]
+        # same slide/merge rule as Game2048.calculation, on exponents
+        tiles = [c for c in cells if c]
+        merged = []
+        gained = 0
+        i = 0
+        while i < len(tiles):
+            if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+                e = min(tiles[i] + 1, MAX_EXPONENT)
+                merged.append(e)
+                gained += 1 << e
+                i += 2
+            else:
+                merged.append(tiles[i])
+                i += 1
+        merged += [0] * (4 - len(merged))
+        result = merged[0] | (merged[1] << 4) | (merged[2] << 8) | (merged[3] << 12)
+        left[row] = result
+        score_left[row] = gained
+        rev = _reverse_row(row)
+        right[rev] = _reverse_row(result)
+        score_right[rev] = gained
+    return left, right, score_left, score_right
+
+
+ROW_LEFT, ROW_RIGHT, SCORE_LEFT, SCORE_RIGHT = _build_tables()
+
+
+def transpose(board: int) -> int:
+    # Swap rows and columns (nibble (r, c) <-> (c, r)) with three mask-and-shift steps
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _move_rows(board: int, table: list[int]) -> int:
+    return (table[board & ROW_MASK]
+            | (table[(board >> 16) & ROW_MASK] << 16)
+            | (table[(board >> 32) & ROW_MASK] << 32)
+            | (table[board >> 48] << 48))
+
+
+def _row_score(board: int, table: list[int]) -> int:
+    return (table[board & ROW_MASK] + table[(board >> 16) & ROW_MASK]
+            + table[(board >> 32) & ROW_MASK] + table[board >> 48])
+
+
+# The four moves are written out (no helper calls): they are the engine's hot path.
+def move_left(board: int) -> int:
+    t = ROW_LEFT
+    return (t[board & 0xFFFF] | (t[(board >> 16) & 0xFFFF] << 16)
+            | (t[(board >> 32) & 0xFFFF] << 32) | (t[board >> 48] << 48))
+
+
+def move_right(board: int) -> int:
+    t = ROW_RIGHT
+    return (t[board & 0xFFFF] | (t[(board >> 16) & 0xFFFF] << 16)
+            | (t[(board >> 32) & 0xFFFF] << 32) | (t[board >> 48] << 48))
+
+
+def move_up(board: int) -> int:
+    # transpose (columns become rows, top cell first), slide left, transpose back
+    t = ROW_LEFT
+    a = (board & 0xF0F00F0FF0F00F0F) | ((board & 0x0000F0F00000F0F0) << 12) | ((board & 0x0F0F00000F0F0000) >> 12)
+    b = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+    m = t[b & 0xFFFF] | (t[(b >> 16) & 0xFFFF] << 16) | (t[(b >> 32) & 0xFFFF] << 32) | (t[b >> 48] << 48)
+    a = (m & 0xF0F00F0FF0F00F0F) | ((m & 0x0000F0F00000F0F0) << 12) | ((m & 0x0F0F00000F0F0000) >> 12)
+    return (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+
+
+def move_down(board: int) -> int:
+    t = ROW_RIGHT
+    a = (board & 0xF0F00F0FF0F00F0F) | ((board & 0x0000F0F00000F0F0) << 12) | ((board & 0x0F0F00000F0F0000) >> 12)
+    b = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+    m = t[b & 0xFFFF] | (t[(b >> 16) & 0xFFFF] << 16) | (t[(b >> 32) & 0xFFFF] << 32) | (t[b >> 48] << 48)
+    a = (m & 0xF0F00F0FF0F00F0F) | ((m & 0x0000F0F00000F0F0) << 12) | ((m & 0x0F0F00000F0F0000) >> 12)
+    return (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+
+
+MOVES = (move_left, move_up, move_right, move_down)
+
+
+def move(board: int, direction: int) -> int:
+    # Board after sliding in direction (unchanged board = illegal move)
+    return MOVES[direction](board)
+
+
+def move_with_score(board: int, direction: int) -> tuple[int, int]:
+    # (new board, sum of the tiles created by merges) for one move
+    if direction == LEFT:
+        return _move_rows(board, ROW_LEFT), _row_score(board, SCORE_LEFT)
+    if direction == RIGHT:
+        return _move_rows(board, ROW_RIGHT), _row_score(board, SCORE_RIGHT)
+    t = transpose(board)
+    if direction == UP:
+        return transpose(_move_rows(t, ROW_LEFT)), _row_score(t, SCORE_LEFT)
+    return transpose(_move_rows(t, ROW_RIGHT)), _row_score(t, SCORE_RIGHT)
+
+
+def count_empty(board: int) -> int:
+    # Fold every nibble onto its lowest bit, then count the nibbles that stayed zero
+    x = board | (board >> 2)
+    x |= x >> 1
+    return (~x & 0x1111111111111111).bit_count()
+
+
+def empty_cells(board: int) -> list[int]:
+    # Bit offsets (16*row + 4*col) of the empty cells, in row-major order
+    return [shift for shift in range(0, 64, 4) if not (board >> shift) & 0xF]
+
+
+def spawn(board: int, rng) -> int:
+    # Place a 2 (90%) or 4 (10%) on a uniformly chosen empty cell (board unchanged if full).
+    # Draws rng.randrange(len(empty)) then rng.random(), same as Game2048.random_cell.
+    empty = empty_cells(board)
+    if not empty:
+        return board
+    shift = empty[rng.randrange(len(empty))]
+    return board | ((2 if rng.random() < 0.1 else 1) << shift)
+
+
+def max_exponent(board: int) -> int:
+    # log2 of the largest tile (0 for an empty board)
+    best = 0
+    while board:
+        e = board & 0xF
+        if e > best:
+            best = e
+        board >>= 4
+    return best
+
+
+def can_move(board: int) -> bool:
+    # True if any direction changes the board (same answer as Game2048.can_merge)
+    if count_empty(board):
+        return True
+    return move_left(board) != board or move_up(board) != board
+
+
+def get_cell(board: int, row: int, col: int) -> int:
+    # Exponent stored at (row, col)
+    return (board >> (16 * row + 4 * col)) & 0xF
+
+
+def from_layout(layout: list[list[int]]) -> int:
+    # Encode a 4x4 list-of-lists board of tile values (0 = empty)
+    board = 0
+    for r, row in enumerate(layout):
+        for c, value in enumerate(row):
+            if value:
+                board |= min(value.bit_length() - 1, MAX_EXPONENT) << (16 * r + 4 * c)
+    return board
+
+
+def to_layout(board: int) -> list[list[int]]:
+    # Decode into the list-of-lists form Game2048 renders
+    layout = []
+    for r in range(4):
+        row = []
+        for c in range(4):
+            e = (board >> (16 * r + 4 * c)) & 0xF
+            row.append(1 << e if e else 0)
+        layout.append(row)
+    return layout
@@ -0,0 +1,251 @@
+# N x N 2048 engines (3 <= N <= 8) on packed boards.
+#
+# A board is one Python int with 4 bits per cell, row-major: cell (row, col) is the
+# nibble at bit 4*(N*row + col) and holds log2 of the tile (0 = empty, max 15 = 32768).
+# For N = 4 this is exactly bitboard.py's layout, and get_engine(4) uses its functions.
+#
+# Moves:
+#   N <= TABLE_MAX_SIZE  row tables: every possible N-cell row (16**N codes, 1M for N = 5)
+#                        is slid once, vectorized, into compact arrays; a move is N lookups
+#   N >  TABLE_MAX_SIZE  vectorized fallback: the board is unpacked into an (N, N) NumPy
+#                        array, slid with array operations and packed back
+#
+# Spawns use the same draws as bitboard.spawn (index into the row-major empty cells, then
+# 4 with 10%), so Game2048(size=N, seed=s) games replay exactly.
+from array import array
+import numpy as np
+import bitboard
+
+MIN_SIZE, MAX_SIZE = 3, 8
+TABLE_MAX_SIZE = 5
+MAX_EXPONENT = bitboard.MAX_EXPONENT
+LEFT, UP, RIGHT, DOWN = bitboard.LEFT, bitboard.UP, bitboard.RIGHT, bitboard.DOWN
+
+
+def slide_lines(lines: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Slide (M, N) exponent lines left with Game2048.calculation's rule:
+    # (slid lines, merge score per line); merged exponents are capped at MAX_EXPONENT
+    n = lines.shape[1]
+    # stable sort puts the tiles first, in order
+    order = np.argsort(lines == 0, axis=1, kind="stable")
+    cells = np.take_along_axis(lines, order, axis=1).astype(np.uint8)
+    gained = np.zeros(len(lines), dtype=np.int64)
+    for j in range(n - 1):
+        merge = (cells[:, j] != 0) & (cells[:, j] == cells[:, j + 1])
+        if not merge.any():
+            continue
+        rows = np.flatnonzero(merge)
+        merged = np.minimum(cells[rows, j] + 1, MAX_EXPONENT)
+        cells[rows, j] = merged
+        gained[rows] += np.left_shift(1, merged.astype(np.int64))
+        # pull the rest of the line one cell left
+        cells[rows, j + 1:n - 1] = cells[rows, j + 2:n]
+        cells[rows, n - 1] = 0
+    return cells, gained
+
+
+def _pack_lines(cells: np.ndarray) -> np.ndarray:
+    # (M, N) cells -> (M,) row codes
+    shifts = 4 * np.arange(cells.shape[1], dtype=np.int64)
+    return (cells.astype(np.int64) << shifts).sum(axis=1)
+
+
+_tables: dict[int, tuple[array, array, array, array]] = {}
+
+
+def row_tables(n: int) -> tuple[array, array, array, array]:
+    # (left, right, score_left, score_right) for N-cell rows, built once per size
+    if n not in _tables:
+        codes = np.arange(16 ** n, dtype=np.int64)
+        cells = ((codes[:, None] >> (4 * np.arange(n, dtype=np.int64))) & 0xF).astype(np.uint8)
+        left, score_left = slide_lines(cells)
+        right, score_right = slide_lines(cells[:, ::-1])
+        _tables[n] = (array("I", _pack_lines(left).astype(np.uint32).tobytes()),
+                      array("I", _pack_lines(right[:, ::-1]).astype(np.uint32).tobytes()),
+                      array("I", score_left.astype(np.uint32).tobytes()),
+                      array("I", score_right.astype(np.uint32).tobytes()))
+    return _tables[n]
+
+
+class Engine():
+    # Move generation and board queries for one board size (see get_engine)
+
+    def __init__(self, size: int):
+        if not MIN_SIZE <= size <= MAX_SIZE:
+            raise ValueError(f"board size must be between {MIN_SIZE} and {MAX_SIZE}, got {size}")
+        self.size = size
+        self.cells = size * size
+        self.row_bits = 4 * size
+        self.row_mask = (1 << self.row_bits) - 1
+        self.row_shifts = tuple(range(0, self.row_bits * size, self.row_bits))
+        self.cell_shifts = tuple(range(0, 4 * self.cells, 4))
+        self._nibble_mask = sum(1 << s for s in self.cell_shifts)
+        self._nbytes = (4 * self.cells + 7) // 8
+        self.tabled = size <= TABLE_MAX_SIZE
+        if self.tabled:
+            self.left, self.right, self.score_left, self.score_right = row_tables(size)
+        self.moves = (self.move_left, self.move_up, self.move_right, self.move_down)
+
+        if size == 4:
+            # identical layout: use the inlined 64-bit engine
+            self.moves = bitboard.MOVES
+            self.move = bitboard.move
+            self.move_with_score = bitboard.move_with_score
+            self.transpose = bitboard.transpose
+            self.count_empty = bitboard.count_empty
+            self.can_move = bitboard.can_move
+
+    # --- conversions ---
+    def from_layout(self, layout: list[list[int]]) -> int:
+        # Encode a list-of-lists board of tile values (0 = empty)
+        board = 0
+        for r, row in enumerate(layout):
+            for c, value in enumerate(row):
+                if value:
+                    board |= min(value.bit_length() - 1, MAX_EXPONENT) << (self.row_bits * r + 4 * c)
+        return board
+
+    def to_layout(self, board: int) -> list[list[int]]:
+        # Decode into the list-of-lists form Game2048 renders
+        cells = [(board >> s) & 0xF for s in self.cell_shifts]
+        n = self.size
+        return [[1 << e if e else 0 for e in cells[r * n:(r + 1) * n]] for r in range(n)]
+
+    def to_array(self, board: int) -> np.ndarray:
+        # (N, N) uint8 exponent array of a board
+        raw = np.frombuffer(board.to_bytes(self._nbytes, "little"), dtype=np.uint8)
+        nibbles = np.empty(2 * len(raw), dtype=np.uint8)
+        nibbles[0::2] = raw & 0xF
+        nibbles[1::2] = raw >> 4
+        return nibbles[:self.cells].reshape(self.size, self.size)
+
+    def from_array(self, cells: np.ndarray) -> int:
+        # Pack an (N, N) exponent array (values above MAX_EXPONENT are not allowed)
+        nibbles = np.zeros(2 * self._nbytes, dtype=np.uint8)
+        nibbles[:self.cells] = cells.ravel()
+        return int.from_bytes((nibbles[0::2] | (nibbles[1::2] << 4)).tobytes(), "little")
+
+    # --- moves ---
+    def transpose(self, board: int) -> int:
+        # Swap rows and columns
+        out = 0
+        bits = self.row_bits
+        for r in range(self.size):
+            for c in range(self.size):
+                out |= ((board >> (bits * r + 4 * c)) & 0xF) << (bits * c + 4 * r)
+        return out
+
+    def rows(self, board: int) -> list[int]:
+        # Row codes, top to bottom
+        mask = self.row_mask
+        return [(board >> s) & mask for s in self.row_shifts]
+
+    def lines(self, board: int) -> list[int]:
+        # Codes of every row and every column (columns read top to bottom)
+        return self.rows(board) + self.rows(self.transpose(board))
+
+    def _slide_rows(self, board: int, table: array, score: array | None = None) -> tuple[int, int]:
+        out = 0
+        gained = 0
+        mask = self.row_mask
+        for s in self.row_shifts:
+            code = (board >> s) & mask
+            out |= table[code] << s
+            if score is not None:
+                gained += score[code]
+        return out, gained
+
+    def _slide_array(self, board: int, direction: int) -> tuple[int, int]:
+        # Vectorized fallback: unpack, slide the oriented rows, pack
+        cells = self.to_array(board).copy()
+        view = _oriented(cells, direction)
+        slid, gained = slide_lines(view)
+        view[...] = slid
+        return self.from_array(cells), int(gained.sum())
+
+    def move_with_score(self, board: int, direction: int) -> tuple[int, int]:
+        # (new board, sum of the tiles created by merges) for one move
+        if not self.tabled:
+            return self._slide_array(board, direction)
+        if direction == LEFT:
+            return self._slide_rows(board, self.left, self.score_left)
+        if direction == RIGHT:
+            return self._slide_rows(board, self.right, self.score_right)
+        table, score = (self.left, self.score_left) if direction == UP else (self.right, self.score_right)
+        moved, gained = self._slide_rows(self.transpose(board), table, score)
+        return self.transpose(moved), gained
+
+    def move(self, board: int, direction: int) -> int:
+        # Board after sliding in direction (unchanged board = illegal move)
+        return self.moves[direction](board)
+
+    def move_left(self, board: int) -> int:
+        if self.tabled:
+            return self._slide_rows(board, self.left)[0]
+        return self._slide_array(board, LEFT)[0]
+
+    def move_right(self, board: int) -> int:
+        if self.tabled:
+            return self._slide_rows(board, self.right)[0]
+        return self._slide_array(board, RIGHT)[0]
+
+    def move_up(self, board: int) -> int:
+        if self.tabled:
+            return self.transpose(self._slide_rows(self.transpose(board), self.left)[0])
+        return self._slide_array(board, UP)[0]
+
+    def move_down(self, board: int) -> int:
+        if self.tabled:
+            return self.transpose(self._slide_rows(self.transpose(board), self.right)[0])
+        return self._slide_array(board, DOWN)[0]
+
+    # --- queries and spawning ---
+    def count_empty(self, board: int) -> int:
+        # Fold every nibble onto its lowest bit, then count the nibbles that stayed zero
+        x = board | (board >> 2)
+        x |= x >> 1
+        return (~x & self._nibble_mask).bit_count()
+
+    def empty_cells(self, board: int) -> list[int]:
+        # Bit offsets of the empty cells, in row-major order
+        return [s for s in self.cell_shifts if not (board >> s) & 0xF]
+
+    def spawn(self, board: int, rng) -> int:
+        # Place a 2 (90%) or 4 (10%) on a uniformly chosen empty cell (same draws as bitboard.spawn)
+        empty = self.empty_cells(board)
+        if not empty:
+            return board
+        shift = empty[rng.randrange(len(empty))]
+        return board | ((2 if rng.random() < 0.1 else 1) << shift)
+
+    def max_exponent(self, board: int) -> int:
+        # log2 of the largest tile (0 for an empty board)
+        return max((board >> s) & 0xF for s in self.cell_shifts)
+
+    def can_move(self, board: int) -> bool:
+        # True if any direction changes the board
+        if self.count_empty(board):
+            return True
+        return self.move_left(board) != board or self.move_up(board) != board
+
+
+def _oriented(cells: np.ndarray, direction: int) -> np.ndarray:
+    # View of an (N, N) board whose rows slide left for the given direction
+    if direction == LEFT:
+        return cells
+    if direction == RIGHT:
+        return cells[:, ::-1]
+    if direction == UP:
+        return cells.T
+    return cells.T[:, ::-1]
+
+
+_engines: dict[int, Engine] = {}
+
+
+def get_engine(size: int = 4) -> Engine:
+    # Shared Engine per board size (row tables are built on first use)
+    engine = _engines.get(size)
+    if engine is None:
+        engine = _engines[size] = Engine(size)
+    return engine
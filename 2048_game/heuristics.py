@@ -0,0 +1,156 @@
+# Table-driven board evaluation for the 2048 AIs.
+#
+# Every feature is a property of one line, so it is precomputed for all 65536 4-cell
+# row codes (see bitboard.py). A weighted sum of the feature tables gives one score
+# table, and a board is scored by looking up its four rows and four columns:
+#
+#   score = sum(table[line] for line in rows + columns)
+#
+# Other board sizes (engine.py) use the same features: tables up to 5x5, vectorized
+# features on the board's lines above.
+#
+# Features (per line of ranks r0..r3, rank = log2 of the tile, 0 = empty):
+#   empty         number of empty cells
+#   merges        adjacent equal tiles (ignoring gaps): merge potential
+#   monotonicity  -min(increase, decrease) of rank**4 along the line
+#   smoothness    -sum of rank differences between neighbouring tiles (ignoring gaps)
+#   corner        the line's highest rank when it sits at either end of the line
+#   sum           -sum of rank**3.5 (penalizes big tiles spread over the board)
+#
+# Weights are a dict feature -> float; tune them with `python simulate.py --tune`.
+from array import array
+import numpy as np
+import bitboard
+import engine
+
+FEATURES: tuple[str, ...] = ("empty", "merges", "monotonicity", "smoothness", "corner", "sum")
+
+DEFAULT_WEIGHTS: dict[str, float] = {
+    "empty": 270.0,
+    "merges": 700.0,
+    "monotonicity": 47.0,
+    "smoothness": 0.0,
+    "corner": 0.0,
+    "sum": 11.0,
+}
+
+# Offset added to every line score, keeping line (and board) scores positive. Lost
+# positions are scored by the search (ai.LOSS_VALUE), not here. The offset does not
+# change which board scores higher, but float rounding at this magnitude settles near
+# ties, so the tuned DEFAULT_WEIGHTS play as measured only with this value.
+LOST_PENALTY = 200000.0
+
+_feature_tables: dict[int, dict[str, list[float]]] = {}
+
+
+def line_feature_arrays(lines: np.ndarray) -> dict[str, np.ndarray]:
+    # Feature values of (M, N) exponent lines, one float64 array per feature
+    ranks = lines.astype(np.float64)
+    # tiles in order with the gaps removed (zeros at the end)
+    order = np.argsort(lines == 0, axis=1, kind="stable")
+    tiles = np.take_along_axis(ranks, order, axis=1)
+    count = (lines != 0).sum(axis=1)
+
+    # merges = total length of runs of equal tiles (length >= 2)
+    pair = (tiles[:, 1:] == tiles[:, :-1]) & (tiles[:, 1:] != 0)
+    run_start = pair.copy()
+    run_start[:, 1:] &= ~pair[:, :-1]
+    merges = pair.sum(axis=1) + run_start.sum(axis=1)
+
+    a, b = ranks[:, :-1] ** 4, ranks[:, 1:] ** 4
+    falling = ranks[:, :-1] > ranks[:, 1:]
+    decrease = np.where(falling, a - b, 0.0).sum(axis=1)
+    increase = np.where(falling, 0.0, b - a).sum(axis=1)
+
+    both = (tiles[:, 1:] != 0)  # neighbouring tiles after removing gaps
+    smooth = np.where(both, np.abs(tiles[:, 1:] - tiles[:, :-1]), 0.0).sum(axis=1)
+
+    top = ranks.max(axis=1)
+    at_edge = (top > 0) & ((ranks[:, 0] == top) | (ranks[:, -1] == top))
+    return {
+        "empty": (lines.shape[1] - count).astype(np.float64),
+        "merges": merges.astype(np.float64),
+        "monotonicity": -np.minimum(increase, decrease),
+        "smoothness": -smooth,
+        "corner": np.where(at_edge, top, 0.0),
+        "sum": -(ranks ** 3.5).sum(axis=1),
+    }
+
+
+def feature_tables(size: int = 4) -> dict[str, np.ndarray]:
+    # feature -> table over every row code of a size-cell line, computed once per process
+    if size not in _feature_tables:
+        codes = np.arange(16 ** size, dtype=np.int64)
+        lines = ((codes[:, None] >> (4 * np.arange(size, dtype=np.int64))) & 0xF).astype(np.uint8)
+        _feature_tables[size] = line_feature_arrays(lines)
+    return _feature_tables[size]
+
+
+def check_weights(weights: dict[str, float] | None) -> dict[str, float]:
+    # DEFAULT_WEIGHTS overridden by weights (ValueError for unknown features)
+    merged = dict(DEFAULT_WEIGHTS)
+    for name, value in (weights or {}).items():
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"unknown heuristic feature: {name} (known: {', '.join(FEATURES)})")
+        merged[name] = float(value)
+    return merged
+
+
+def build_table(weights: dict[str, float] | None = None, size: int = 4):
+    # Line score table over every row code for the given weights
+    # (a list for 4x4, the hot path; a compact array('d') for the other table sizes)
+    weights = check_weights(weights)
+    tables = feature_tables(size)
+    table = np.full(16 ** size, LOST_PENALTY)
+    for name in FEATURES:
+        if weights[name]:
+            table += weights[name] * tables[name]
+    return table.tolist() if size == 4 else array("d", table.tobytes())
+
+
+class Heuristic():
+    # 4x4 board evaluator: heuristic(board) -> score, eight lookups into one weighted table
+    size = 4
+
+    def __init__(self, weights: dict[str, float] | None = None):
+        self.weights = check_weights(weights)
+        self.table = build_table(self.weights)
+
+    def __call__(self, board: int) -> float:
+        t = self.table
+        c = bitboard.transpose(board)
+        return (t[board & 0xFFFF] + t[(board >> 16) & 0xFFFF] + t[(board >> 32) & 0xFFFF] + t[board >> 48]
+                + t[c & 0xFFFF] + t[(c >> 16) & 0xFFFF] + t[(c >> 32) & 0xFFFF] + t[c >> 48])
+
+
+class SizedHeuristic():
+    # Same evaluation for N x N boards (see engine.py): 2N table lookups while
+    # N <= engine.TABLE_MAX_SIZE, vectorized features over the 2N lines above that
+
+    def __init__(self, weights: dict[str, float] | None = None, size: int = 4):
+        self.weights = check_weights(weights)
+        self.size = size
+        self.engine = engine.get_engine(size)
+        self.table = build_table(self.weights, size) if self.engine.tabled else None
+        self._vector = np.array([self.weights[name] for name in FEATURES])
+
+    def __call__(self, board: int) -> float:
+        if self.table is not None:
+            t = self.table
+            return sum([t[line] for line in self.engine.lines(board)])
+        cells = self.engine.to_array(board)
+        features = line_feature_arrays(np.vstack((cells, cells.T)))
+        totals = np.array([features[name].sum() for name in FEATURES])
+        return float(2 * self.size * LOST_PENALTY + totals @ self._vector)
+
+
+_cache: dict[tuple, Heuristic | SizedHeuristic] = {}
+
+
+def get(weights: dict[str, float] | None = None, size: int = 4) -> Heuristic | SizedHeuristic:
+    # Shared evaluator per board size and distinct weights (tables are built once per process)
+    key = (size,) + tuple(sorted(check_weights(weights).items()))
+    heuristic = _cache.get(key)
+    if heuristic is None:
+        heuristic = _cache[key] = Heuristic(weights) if size == 4 else SizedHeuristic(weights, size)
+    return heuristic
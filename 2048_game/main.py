@@ -1,20 +1,39 @@
-import os
 from rich import print
 from rich.console import Console
-from rich.table import Table
 import random
 import copy
+import bitboard
+import engine
+import ai
+import replay
+import render
 
 console = Console()
 
 def clear_screen():
-    # Clears the terminal screen depending on OS
-    os.system("cls" if os.name == "nt" else "clear")
+    # Clears the terminal screen with escape codes (no shell process per frame)
+    console.clear()
 
 class Game2048():
-    def __init__(self):
-        # Initialize empty 4x4 grid
-        self.layout = [[0]*4 for _ in range(4)]
+    def __init__(self, seed: int | None = None, rng: random.Random | None = None,
+                 size: int = 4, win_tile: int = 2048):
+        # Board size (3x3 to 8x8) and the tile that wins the game
+        self.engine = engine.get_engine(size)  # raises ValueError outside 3..8
+        if win_tile < 4 or win_tile & (win_tile - 1) or win_tile > 1 << engine.MAX_EXPONENT:
+            raise ValueError(f"win tile must be a power of two between 4 and {1 << engine.MAX_EXPONENT}")
+        self.size = size
+        self.win_tile = win_tile
+
+        # Initialize empty size x size grid
+        self.layout = [[0]*size for _ in range(size)]
+
+        # Every spawn draws from self.rng: same seed (or injected rng state) = same game
+        self.seed: int | None = seed if seed is not None or rng is not None else random.randrange(2**32)
+        self.rng: random.Random = rng if rng is not None else random.Random(self.seed)
+
+        # Keys of the moves that changed the board, for recording() (see replay.py)
+        self.history: list[str] = []
+        self.last_move = ''
         
         # Mapping user inputs to rotations to simplify move logic
         self.rotation: dict[str, int] = {
@@ -33,13 +52,21 @@ class Game2048():
         _input: str = console.input("🎮 [bold yellow]Move (W/A/S/D): [/bold yellow]").lower()
         return _input
 
+    def empty_cells(self) -> list[tuple[int, int]]:
+        # (row, col) of every empty cell, row-major
+        return [(r, c) for r in range(self.size) for c in range(self.size) if self.layout[r][c] == 0]
+
     def random_cell(self) -> None:
-        # Place a random 2 or 4 (90% 2, 10% 4) on an empty cell
-        while True:
-            loc = [random.randint(0,3), random.randint(0,3)]
-            if self.layout[loc[0]][loc[1]] == 0:
-                self.layout[loc[0]][loc[1]] = 4 if random.random() < 0.1 else 2
-                break
+        # Place a random 2 or 4 (90% 2, 10% 4) on an empty cell (nothing if the board is full)
+        empty = self.empty_cells()
+        if not empty:
+            return
+        r, c = empty[self.rng.randrange(len(empty))]
+        self.layout[r][c] = 4 if self.rng.random() < 0.1 else 2
+
+    def recording(self) -> str:
+        # Compact "seed:moves" string that replay.py replays move by move
+        return replay.encode(self.seed, "".join(self.history), self.size)
 
     def rotate(self, grid, times) -> list:
         # Rotate grid 90 degrees clockwise 'times' times
@@ -49,28 +76,39 @@ class Game2048():
 
     def can_merge(self, grid) -> bool:
         # Check if there are any valid moves (empty spaces or adjacent merges)
-        for i in range(4):
-            for j in range(4):
+        n = len(grid)
+        for i in range(n):
+            for j in range(n):
                 if grid[i][j] == 0:
                     return True
-                if j < 3 and grid[i][j] == grid[i][j + 1]:
+                if j < n - 1 and grid[i][j] == grid[i][j + 1]:
                     return True
-                if i < 3 and grid[i][j] == grid[i + 1][j]:
+                if i < n - 1 and grid[i][j] == grid[i + 1][j]:
                     return True
         return False
 
+    def won(self) -> bool:
+        # True once a tile reaches win_tile
+        return any(cell >= self.win_tile for row in self.layout for cell in row)
+
     def movement(self, grid) -> list:
         # Perform user move by rotating, calculating merges, then rotating back
         user_move = self.user_input()
-        r = self.rotation.get(user_move)
-        if r is None:
+        direction = bitboard.KEY_TO_DIRECTION.get(user_move)
+        if direction is None:
             return grid  # invalid input, skip turn
-        
-        rotate_grid = self.rotate(grid, r)
-        grid = self.calculation(rotate_grid)
-        rotate_grid_back = self.rotate(grid, (4 - r))
-        
-        return rotate_grid_back
+        self.last_move = user_move
+
+        # same result as rotate + calculation + rotate back, via the engine's row tables
+        return self.engine.to_layout(self.engine.move(self.engine.from_layout(grid), direction))
+
+    def to_bitboard(self) -> int:
+        # Current layout as a packed board (64-bit bitboard for 4x4, see engine.py)
+        return self.engine.from_layout(self.layout)
+
+    def load_bitboard(self, board: int) -> None:
+        # Replace the layout with a packed board's tiles (for rendering)
+        self.layout = self.engine.to_layout(board)
 
     def calculation(self, grid) -> list:
         # Slide and merge tiles for each row
@@ -87,55 +125,8 @@ class Game2048():
         return new_grid
 
     def show_layout(self, grid) -> None:
-        # Use rich table to render the board with colors
-        table = Table(title="2048 GAME", style="bold white on black")
-        for _ in range(4):
-            table.add_column(justify="center", style="bold white")
-
-        for row in grid:
-            styled_row = []
-            for cell in row:
-                # Use different colors based on value
-                if cell == 0:
-                    styled_row.append("[dim]-[/dim]")
-                
-                elif cell == 2:
-                    styled_row.append(f"[cyan]{cell}[/cyan]")
-                
-                elif cell == 4:
-                    styled_row.append(f"[blue]{cell}[/blue]")
-                
-                elif cell == 8:
-                    styled_row.append(f"[magenta]{cell}[/magenta]")
-                
-                elif cell == 16:
-                    styled_row.append(f"[green]{cell}[/green]")
-                
-                elif cell == 32:
-                    styled_row.append(f"[yellow]{cell}[/yellow]")
-                
-                elif cell == 64:
-                    styled_row.append(f"[red]{cell}[/red]")
-                
-                elif cell == 128:
-                    styled_row.append(f"[bright_cyan]{cell}[/bright_cyan]")
-                
-                elif cell == 256:
-                    styled_row.append(f"[bright_magenta]{cell}[/bright_magenta]")
-                
-                elif cell == 512:
-                    styled_row.append(f"[bright_green]{cell}[/bright_green]")
-                
-                elif cell == 1024:
-                    styled_row.append(f"[bright_yellow]{cell}[/bright_yellow]")
-                
-                elif cell == 2048:
-                    styled_row.append(f"[reverse][bold bright_white on bright_red]{cell}[/bold bright_white on bright_red][/reverse]")
-                
-                else:
-                    styled_row.append(f"[bold white]{cell}[/bold white]")
-            table.add_row(*styled_row)
-        console.print(table)
+        # Use rich table to render the board with colors (precomputed tile markup, see render.py)
+        console.print(render.board_table(grid))
 
     def play(self) -> None:
         # Main loop for human player mode
@@ -147,10 +138,11 @@ class Game2048():
 
             # Only place new tile if move changed the board
             if self.layout != prev_layout:
+                self.history.append(self.last_move)
                 self.random_cell()
 
             # Check win
-            if any(2048 in row for row in self.layout):
+            if self.won():
                 clear_screen()
                 self.show_layout(self.layout)
                 console.print("[bold green]YOU WIN[/bold green]")
@@ -163,68 +155,66 @@ class Game2048():
                 console.print("[bold red]YOU LOSE[/bold red]")
                 return
 
-    def auto_play(self, delay=0.1) -> None:
-        # Simple AI that chooses move with most empty cells + corner bonus
+    def auto_play(self, delay=0, player=None, max_fps=30) -> None:
+        # AI mode: player picks each move (default: expectimax search, see ai.py).
+        # Moves run as fast as the player decides and max_fps caps the redraws;
+        # delay adds a pause (seconds) after every move to slow the game down for viewing
+        clear_screen()
+        with render.LiveRenderer(console, max_fps) as screen:
+            result = self._auto_play_loop(screen, delay, player)
+        console.print(result)
+
+    def _auto_play_loop(self, screen, delay, player) -> str:
+        # Play until the game ends, redrawing in place (frames over max_fps are skipped)
         import time
+        if player is None:
+            player = ai.ExpectimaxAI(size=self.size)
         while True:
-            clear_screen()
-            self.show_layout(self.layout)
-            time.sleep(delay)
+            screen.update(self.layout)
+            if delay > 0:
+                time.sleep(delay)
 
-            best_move = None
-            best_score = -1
-
-            # Try all moves and score them
-            for move, r in self.rotation.items():
-                rotated = self.rotate(self.layout, r)
-                moved = self.calculation(rotated)
-                moved_back = self.rotate(moved, (4 - r))
-
-                if moved_back != self.layout:
-                    empty_cells = sum(row.count(0) for row in moved_back)
-                    corner_bonus = moved_back[0][0] * 0.1
-                    score = empty_cells + corner_bonus
-
-                    if score > best_score:
-                        best_score = score
-                        best_move = move
+            board = self.to_bitboard()
+            best_move = player.choose(board)
 
             # No valid moves = lose
             if best_move is None:
-                clear_screen()
-                self.show_layout(self.layout)
-                console.print("[bold red]AI LOSES![/bold red]")
-                return
+                screen.update(self.layout, force=True)
+                return "[bold red]AI LOSES![/bold red]"
 
             # Apply best move
-            r = self.rotation[best_move]
-            rotated = self.rotate(self.layout, r)
-            moved = self.calculation(rotated)
-            self.layout = self.rotate(moved, (4 - r))
+            self.load_bitboard(self.engine.move(board, best_move))
+            self.history.append(bitboard.DIRECTION_KEYS[best_move])
             self.random_cell()
 
             # Check win
-            if any(2048 in row for row in self.layout):
-                clear_screen()
-                self.show_layout(self.layout)
-                console.print("[bold green]AI WINS![/bold green]")
-                return
+            if self.won():
+                screen.update(self.layout, force=True)
+                return "[bold green]AI WINS![/bold green]"
 
             # Check lose
             if not self.can_merge(self.layout):
-                clear_screen()
-                self.show_layout(self.layout)
-                console.print("[bold red]AI LOSES![/bold red]")
-                return
+                screen.update(self.layout, force=True)
+                return "[bold red]AI LOSES![/bold red]"
    
 def main() -> None:
     # Main entry: choose manual or AI mode
-    mode: str = console.input("Play 👤 or AI_Play 🤖 (p or a): ").lower()
-    game = Game2048()
+    mode: str = console.input("Play 👤, AI_Play 🤖 or N-tuple 🧠 (p, a or n): ").lower()
+    size: str = console.input("Board size 3-8 (Enter for 4): ").strip()
+    size_n = int(size) if size.isdigit() and engine.MIN_SIZE <= int(size) <= engine.MAX_SIZE else 4
+    game = Game2048(size=size_n)
     
     if mode == 'a':
         game.auto_play() # ← AI
     
+    elif mode == 'n':
+        try:
+            player = ai.NTupleAI(size=size_n)  # ← learned player
+        except (FileNotFoundError, ValueError) as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            return
+        game.auto_play(player=player)
+    
     else:
         game.play()
 
@@ -0,0 +1,213 @@
+# N-tuple network player for 4x4 2048, trained by TD(0) self-play on the bitboard engine.
+#
+# The network values an afterstate (the board right after a move, before the spawn):
+#   V(board) = sum over tuples t and the 8 board symmetries s of W_t[cells of t on s(board)]
+# Each tuple is a group of cells; its 16**k-entry weight table is indexed by the k cell
+# exponents. The player picks argmax(merge score + V(afterstate)).
+#
+# Weights are one flat float32 file opened with np.memmap (no deserialization at start-up,
+# pages load on demand) plus a small JSON sidecar "<file>.json" with the tuples and the
+# training counters. The default "large" network is 4 six-tuples: 4 * 16**6 weights = 256 MiB.
+#
+#   python ntuple.py train --games 20000                      # creates or resumes the weights
+#   python ntuple.py train --games 200 --network small --weights /tmp/small.bin
+#   python simulate.py --strategies ntuple --games 100        # evaluate
+import argparse
+import json
+import os
+import random
+import time
+import numpy as np
+import bitboard
+import engine
+
+# Cells are numbered row-major, 0..15
+NETWORKS: dict[str, tuple[tuple[int, ...], ...]] = {
+    # two rows-and-a-half / two rectangles, as in Yeh et al. / Jaśkowski
+    "large": ((0, 1, 2, 3, 4, 5), (4, 5, 6, 7, 8, 9), (0, 1, 2, 4, 5, 6), (4, 5, 6, 8, 9, 10)),
+    # rows and squares of 4 cells (1 MiB, for quick experiments)
+    "small": ((0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 4, 5), (1, 2, 5, 6)),
+}
+DEFAULT_WEIGHTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ntuple_weights.bin")
+LEARNING_RATE = 0.1  # split over the network's lookups
+
+
+def _symmetries() -> list[list[int]]:
+    # The 8 rotations/reflections of the 4x4 board as cell permutations
+    def rotate(p):
+        return [p[4 * (3 - c) + r] for r in range(4) for c in range(4)]
+
+    def mirror(p):
+        return [p[4 * r + 3 - c] for r in range(4) for c in range(4)]
+
+    perms = []
+    p = list(range(16))
+    for _ in range(4):
+        perms.append(p)
+        perms.append(mirror(p))
+        p = rotate(p)
+    return perms
+
+
+class NTupleNetwork():
+    # Memory-mapped n-tuple value function (see the module comment for the file format)
+
+    def __init__(self, path: str = DEFAULT_WEIGHTS, writable: bool = False):
+        meta_path = path + ".json"
+        if not os.path.exists(path) or not os.path.exists(meta_path):
+            raise FileNotFoundError(f"no n-tuple weights at {path}; train them with: python ntuple.py train")
+        with open(meta_path, encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.tuples = tuple(tuple(t) for t in self.meta["tuples"])
+        sizes = [16 ** len(t) for t in self.tuples]
+        self.weights = np.memmap(path, dtype=np.float32, mode="r+" if writable else "r", shape=(sum(sizes),))
+
+        # one row per (tuple, symmetry): bit shifts of its cells, and the tuple's table offset
+        length = max(len(t) for t in self.tuples)
+        shifts, powers, offsets = [], [], []
+        offset = 0
+        for t, size in zip(self.tuples, sizes):
+            for perm in _symmetries():
+                cells = [perm[c] for c in t]
+                shifts.append([4 * c for c in cells] + [0] * (length - len(t)))
+                powers.append([4 * i for i in range(len(t))] + [63] * (length - len(t)))
+                offsets.append(offset)
+            offset += size
+        self._shifts = np.array(shifts, dtype=np.uint64)
+        # unused slots (shorter tuples) shift by 63 bits, which the index mask then clears
+        self._powers = np.array(powers, dtype=np.uint64)
+        self._mask = np.uint64((1 << (4 * length)) - 1)
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self.step = LEARNING_RATE / len(offsets)
+
+    @classmethod
+    def create(cls, path: str = DEFAULT_WEIGHTS, tuples=NETWORKS["large"]) -> "NTupleNetwork":
+        # New zero-initialized weights file (sparse on most filesystems) and its sidecar
+        total = sum(16 ** len(t) for t in tuples)
+        np.memmap(path, dtype=np.float32, mode="w+", shape=(total,)).flush()
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump({"tuples": [list(t) for t in tuples], "games": 0, "moves": 0}, f)
+        return cls(path, writable=True)
+
+    def indices(self, board: int) -> np.ndarray:
+        # Weight index of every (tuple, symmetry) lookup for board
+        cells = (np.uint64(board) >> self._shifts) & np.uint64(0xF)
+        powered = (cells << self._powers) & self._mask
+        return powered.sum(axis=1).astype(np.int64) + self._offsets
+
+    def value(self, board: int) -> float:
+        return float(self.weights[self.indices(board)].sum())
+
+    def update(self, board: int, error: float) -> None:
+        # Move V(board) towards its TD target by LEARNING_RATE * error, spread over the lookups
+        np.add.at(self.weights, self.indices(board), np.float32(self.step * error))
+
+    def save(self) -> None:
+        # Flush the weights and the training counters
+        self.weights.flush()
+        with open(self.path + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+
+
+class NTupleAI():
+    # Learned player: the move maximizing merge score + V(afterstate); 4x4 only
+    name = "ntuple"
+
+    def __init__(self, weights_path: str = DEFAULT_WEIGHTS, network: NTupleNetwork | None = None,
+                 size: int = 4):
+        if size != 4:
+            raise ValueError("the n-tuple player only plays 4x4 boards")
+        self.engine = engine.get_engine(4)
+        self.network = network or NTupleNetwork(weights_path)
+
+    def choose(self, board: int) -> int | None:
+        best_direction = None
+        best_value = float("-inf")
+        for direction in range(4):
+            moved, gained = bitboard.move_with_score(board, direction)
+            if moved != board:
+                value = gained + self.network.value(moved)
+                if value > best_value:
+                    best_value = value
+                    best_direction = direction
+        return best_direction
+
+
+def train_game(network: NTupleNetwork, rng: random.Random) -> dict:
+    # One self-play game with TD(0) updates on afterstates
+    board = bitboard.spawn(bitboard.spawn(0, rng), rng)
+    previous = None  # afterstate of the previous move
+    score = moves = 0
+    while True:
+        best = None
+        for direction in range(4):
+            moved, gained = bitboard.move_with_score(board, direction)
+            if moved != board:
+                value = network.value(moved)
+                if best is None or gained + value > best[0] + best[1]:
+                    best = (gained, value, moved)
+        if best is None:
+            # game over: the previous afterstate leads nowhere
+            if previous is not None:
+                network.update(previous, -network.value(previous))
+            break
+        gained, value, after = best
+        if previous is not None:
+            network.update(previous, gained + value - network.value(previous))
+        previous = after
+        score += gained
+        moves += 1
+        board = bitboard.spawn(after, rng)
+    return {"score": score, "moves": moves, "max_tile": 1 << bitboard.max_exponent(board)}
+
+
+def train(path: str, games: int, network_name: str = "large", seed: int | None = None,
+          report_every: int = 100) -> None:
+    # Train (or resume training) the weights at path, printing one JSON line per report_every games
+    if os.path.exists(path) and os.path.exists(path + ".json"):
+        network = NTupleNetwork(path, writable=True)
+    else:
+        network = NTupleNetwork.create(path, NETWORKS[network_name])
+    rng = random.Random(seed if seed is not None else network.meta["games"])
+    batch = []
+    start = time.perf_counter()
+    try:
+        for i in range(1, games + 1):
+            batch.append(train_game(network, rng))
+            if i % report_every == 0 or i == games:
+                elapsed = time.perf_counter() - start
+                moves = sum(g["moves"] for g in batch)
+                network.meta["games"] += len(batch)
+                network.meta["moves"] += moves
+                print(json.dumps({"games": network.meta["games"],
+                                  "avg_score": round(sum(g["score"] for g in batch) / len(batch), 1),
+                                  "win_rate": round(sum(g["max_tile"] >= 2048 for g in batch) / len(batch), 4),
+                                  "max_tile": max(g["max_tile"] for g in batch),
+                                  "moves_per_sec": round(moves / elapsed) if elapsed else None}), flush=True)
+                network.save()
+                batch = []
+                start = time.perf_counter()
+    finally:
+        if batch:
+            network.meta["games"] += len(batch)
+            network.meta["moves"] += sum(g["moves"] for g in batch)
+        network.save()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Train the n-tuple network 2048 player by TD self-play.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_train = sub.add_parser("train", help="create or resume training the weights")
+    p_train.add_argument("--games", type=int, default=1000)
+    p_train.add_argument("--weights", default=DEFAULT_WEIGHTS, help="weights file (sidecar: <file>.json)")
+    p_train.add_argument("--network", choices=list(NETWORKS), default="large", help="tuples of a new network")
+    p_train.add_argument("--seed", type=int, default=None)
+    p_train.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args(argv)
+    if args.command == "train":
+        train(args.weights, args.games, args.network, args.seed, args.report_every)
+
+
+if __name__ == "__main__":
+    main()
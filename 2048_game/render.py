@@ -0,0 +1,78 @@
+# Terminal rendering for 2048 with rich.
+#
+# TILE_MARKUP maps every tile value to its precomputed cell markup (one dict lookup per
+# cell instead of an if/elif chain). LiveRenderer redraws the board in place through
+# rich's Live display (no screen clearing, no shell) and caps the frame rate: frames
+# requested faster than max_fps are skipped, so a fast AI is not slowed down by drawing.
+import time
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+# Cell markup by tile value (0 = empty); tiles above 2048 use TILE_MARKUP_DEFAULT
+TILE_STYLES: dict[int, str] = {
+    2: "cyan",
+    4: "blue",
+    8: "magenta",
+    16: "green",
+    32: "yellow",
+    64: "red",
+    128: "bright_cyan",
+    256: "bright_magenta",
+    512: "bright_green",
+    1024: "bright_yellow",
+}
+TILE_MARKUP: dict[int, str] = {0: "[dim]-[/dim]"}
+TILE_MARKUP.update({value: f"[{style}]{value}[/{style}]" for value, style in TILE_STYLES.items()})
+TILE_MARKUP[2048] = "[reverse][bold bright_white on bright_red]2048[/bold bright_white on bright_red][/reverse]"
+TILE_MARKUP.update({1 << e: f"[bold white]{1 << e}[/bold white]" for e in range(12, 18)})
+
+
+def tile_markup(cell: int) -> str:
+    # Markup of one cell (lookup, with a fallback for values outside the table)
+    markup = TILE_MARKUP.get(cell)
+    return markup if markup is not None else f"[bold white]{cell}[/bold white]"
+
+
+def board_table(grid: list[list[int]], title: str = "2048 GAME") -> Table:
+    # Rich table of the board with colored tiles
+    table = Table(title=title, style="bold white on black")
+    for _ in range(len(grid[0]) if grid else 4):
+        table.add_column(justify="center", style="bold white")
+    for row in grid:
+        table.add_row(*[tile_markup(cell) for cell in row])
+    return table
+
+
+class LiveRenderer():
+    # In-place board display with a frame-rate cap; use as a context manager:
+    #
+    #   with LiveRenderer(console, max_fps=30) as screen:
+    #       screen.update(layout)              # may be skipped (too soon after the last frame)
+    #       screen.update(layout, force=True)  # always drawn (final position)
+
+    def __init__(self, console: Console | None = None, max_fps: float = 30.0):
+        self.console = console or Console()
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.live = Live(console=self.console, auto_refresh=False)
+        self.last_frame = float("-inf")
+        self.frames = 0
+        self.skipped = 0
+
+    def __enter__(self) -> "LiveRenderer":
+        self.live.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.live.stop()
+
+    def update(self, grid: list[list[int]], force: bool = False) -> bool:
+        # Draw grid unless the previous frame was less than 1/max_fps ago; True if drawn
+        now = time.perf_counter()
+        if not force and now - self.last_frame < self.min_interval:
+            self.skipped += 1
+            return False
+        self.live.update(board_table(grid), refresh=True)
+        self.last_frame = now
+        self.frames += 1
+        return True
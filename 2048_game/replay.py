@@ -0,0 +1,118 @@
+# Compact, deterministic 2048 game recordings.
+#
+# A recording is "<seed>:<moves>", e.g. "1234:aawdsaw...": the seed of the game's
+# random.Random and the keys (w/a/s/d) of every move that changed the board. Boards
+# other than 4x4 are prefixed with their size: "5x5:1234:aawd...". Spawns follow
+# bitboard.spawn (same draws as Game2048.random_cell), so replaying needs no rendering
+# and runs at engine speed.
+#
+#   python replay.py "1234:aawds..."            # final board, score and moves as JSON
+#   python replay.py recordings.txt --repeat 20 # one recording per line, replay speed
+#   python replay.py "1234:aawds..." --show     # render the final board
+import argparse
+import json
+import random
+import time
+import bitboard
+import engine
+
+
+def encode(seed: int | None, moves: str, size: int = 4) -> str:
+    # "seed:moves", or "NxN:seed:moves" for other board sizes
+    # (a game played with an injected rng has no seed to record)
+    if seed is None:
+        raise ValueError("game has no seed (injected rng), it cannot be recorded")
+    return f"{seed}:{moves}" if size == 4 else f"{size}x{size}:{seed}:{moves}"
+
+
+def decode(recording: str) -> tuple[int, str, int]:
+    # (seed, moves, board size) of a recording; ValueError if malformed
+    text = recording.strip()
+    size = 4
+    head, sep, rest = text.partition(":")
+    if "x" in head:
+        n, _, m = head.partition("x")
+        if not (n.isdigit() and n == m):
+            raise ValueError(f"bad board size in recording: {head!r}")
+        size = int(n)
+        text = rest
+    seed, sep, moves = text.partition(":")
+    if not sep or not seed.lstrip("-").isdigit():
+        raise ValueError(f"not a recording: {recording[:40]!r}")
+    bad = set(moves) - set(bitboard.KEY_TO_DIRECTION)
+    if bad:
+        raise ValueError(f"unknown move keys in recording: {''.join(sorted(bad))}")
+    return int(seed), moves, size
+
+
+def start(seed: int, size: int = 4) -> tuple[int, random.Random]:
+    # Starting board of a seeded game (two spawns, like Game2048.__init__) and its rng
+    eng = engine.get_engine(size)
+    rng = random.Random(seed)
+    return eng.spawn(eng.spawn(0, rng), rng), rng
+
+
+def boards(recording: str):
+    # Yield the board before the first move and after every move (spawn included)
+    seed, moves, size = decode(recording)
+    eng = engine.get_engine(size)
+    board, rng = start(seed, size)
+    yield board
+    for i, key in enumerate(moves):
+        moved = eng.move(board, bitboard.KEY_TO_DIRECTION[key])
+        if moved == board:
+            raise ValueError(f"move {i} ({key!r}) does not change the board: recording does not match")
+        board = eng.spawn(moved, rng)
+        yield board
+
+
+def replay(recording: str) -> dict:
+    # Final state of a recorded game: board, score (sum of merged tiles), moves
+    seed, moves, size = decode(recording)
+    eng = engine.get_engine(size)
+    board, rng = start(seed, size)
+    score = 0
+    for i, key in enumerate(moves):
+        moved, gained = eng.move_with_score(board, bitboard.KEY_TO_DIRECTION[key])
+        if moved == board:
+            raise ValueError(f"move {i} ({key!r}) does not change the board: recording does not match")
+        board = eng.spawn(moved, rng)
+        score += gained
+    return {"seed": seed, "size": size, "board": board, "score": score, "moves": len(moves),
+            "max_tile": 1 << eng.max_exponent(board), "over": not eng.can_move(board)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded 2048 games (seed:moves).")
+    parser.add_argument("recording", help="a recording, or a file with one recording per line")
+    parser.add_argument("--repeat", type=int, default=1, help="replay N times and report moves/sec")
+    parser.add_argument("--show", action="store_true", help="render the final board(s)")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    try:
+        with open(args.recording, encoding="utf-8") as f:
+            recordings = [line.strip() for line in f if line.strip()]
+    except OSError:
+        recordings = [args.recording]
+
+    start_time = time.perf_counter()
+    for _ in range(args.repeat):
+        results = [replay(r) for r in recordings]
+    elapsed = time.perf_counter() - start_time
+    total_moves = sum(r["moves"] for r in results) * args.repeat
+    for r in results:
+        r["layout"] = engine.get_engine(r["size"]).to_layout(r.pop("board"))
+    print(json.dumps({"games": results, "seconds": round(elapsed, 4),
+                      "moves_per_sec": round(total_moves / elapsed) if elapsed else None}, indent=2))
+    if args.show:
+        from main import Game2048
+        for r in results:
+            game = Game2048(size=r["size"], seed=r["seed"])
+            game.layout = r["layout"]
+            game.show_layout(game.layout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# Headless 2048 runner: plays seeded games with the AI players of ai.py across a
+# process pool, without rendering, and reports statistics as JSON.
+#
+#   python simulate.py --games 200 --strategies greedy expectimax --time-budget 0.01
+#
+# Game i of a run uses seed (base seed + i), so every strategy plays the same games.
+# Spawns use bitboard.spawn with random.Random(seed), the same draws as Game2048(seed=seed),
+# and --record writes each game as a replay.py recording ("seed:moves").
+#
+# Heuristic weights (heuristics.py) are set with --weights '{"corner": 20}' and tuned with
+#   python simulate.py --tune --strategies greedy --games 200
+# The learned ntuple player (ntuple.py) reads its weights with --ntuple-weights FILE; every
+# worker memory-maps the same file, so the pool shares one copy through the page cache.
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import ai
+import bitboard
+import engine
+import heuristics
+import replay
+
+WIN_TILE = 2048
+
+# Strategies run by default, and the ones scored by heuristics.py (--weights, --tune);
+# ntuple needs trained weights first (python ntuple.py train)
+DEFAULT_STRATEGIES = ("greedy", "expectimax")
+HEURISTIC_STRATEGIES = ("greedy", "expectimax")
+
+# --tune: factors tried on each non-zero weight, and the first value tried for zero weights
+TUNE_FACTORS = (0.5, 2.0)
+TUNE_START = 10.0
+
+
+def play_game(player, seed: int, play_on: bool = False, record: bool = False,
+              win_tile: int = WIN_TILE) -> dict:
+    # One game to the end (or to win_tile unless play_on); score = sum of merged tiles.
+    # The board size is the player's (player.engine, 4x4 if it has none).
+    eng = getattr(player, "engine", None) or engine.get_engine(4)
+    win_exponent = win_tile.bit_length() - 1
+    board, rng = replay.start(seed, eng.size)
+    score = moves = 0
+    keys = []
+    start = time.perf_counter()
+    while True:
+        direction = player.choose(board)
+        if direction is None:
+            break
+        board, gained = eng.move_with_score(board, direction)
+        board = eng.spawn(board, rng)
+        score += gained
+        moves += 1
+        if record:
+            keys.append(bitboard.DIRECTION_KEYS[direction])
+        if not play_on and eng.max_exponent(board) >= win_exponent:
+            break
+        if not eng.can_move(board):
+            break
+    exponent = eng.max_exponent(board)
+    result = {"seed": seed, "won": exponent >= win_exponent, "max_tile": 1 << exponent,
+              "score": score, "moves": moves, "seconds": time.perf_counter() - start}
+    if record:
+        result["recording"] = replay.encode(seed, "".join(keys), eng.size)
+    return result
+
+
+def _play(job: tuple[str, dict, int, bool, bool, int]) -> dict:
+    # Process pool entry point: build the player in the worker and play one game
+    strategy, options, seed, play_on, record, win_tile = job
+    return play_game(ai.PLAYERS[strategy](**options), seed, play_on, record, win_tile)
+
+
+def summarize(results: list[dict]) -> dict:
+    # Aggregate statistics of a list of play_game results
+    games = len(results)
+    moves = sum(r["moves"] for r in results)
+    seconds = sum(r["seconds"] for r in results)
+    tiles: dict[int, int] = {}
+    for r in results:
+        tiles[r["max_tile"]] = tiles.get(r["max_tile"], 0) + 1
+    return {
+        "games": games,
+        "win_rate": round(sum(r["won"] for r in results) / games, 4) if games else 0.0,
+        "max_tile": {str(t): tiles[t] for t in sorted(tiles)},
+        "avg_score": round(sum(r["score"] for r in results) / games, 1) if games else 0.0,
+        "moves_per_game": round(moves / games, 1) if games else 0.0,
+        # per process: total moves over the time spent inside games
+        "moves_per_sec": round(moves / seconds, 1) if seconds else 0.0,
+    }
+
+
+def simulate(strategy: str, games: int, seed: int = 0, workers: int | None = None,
+             options: dict | None = None, play_on: bool = False, record: bool = False,
+             win_tile: int = WIN_TILE) -> dict:
+    # Play games seeded seed..seed+games-1 with ai.PLAYERS[strategy](**options)
+    # (options["size"] sets the board size); record=True adds the list of game
+    # recordings under "recordings"
+    jobs = [(strategy, options or {}, seed + i, play_on, record, win_tile) for i in range(games)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_play(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play, jobs, chunksize=max(1, games // (4 * (workers or os.cpu_count() or 1)))))
+    stats = summarize(results)
+    stats["wall_seconds"] = round(time.perf_counter() - start, 3)
+    if record:
+        stats["recordings"] = [r["recording"] for r in results]
+    return stats
+
+
+def tune(strategy: str, games: int, seed: int = 0, workers: int | None = None,
+         options: dict | None = None, rounds: int = 2) -> dict:
+    # Coordinate search on the heuristic weights: change one weight at a time (x0.5, x2,
+    # or TUNE_START if zero) and keep the change if the same seeded games score higher
+    options = dict(options or {})
+    weights = heuristics.check_weights(options.pop("weights", None))
+    best = simulate(strategy, games, seed, workers, {**options, "weights": weights})
+    trials = [{"weights": dict(weights), "avg_score": best["avg_score"], "win_rate": best["win_rate"]}]
+    for _ in range(rounds):
+        improved = False
+        for name in heuristics.FEATURES:
+            values = [weights[name] * f for f in TUNE_FACTORS] if weights[name] else [TUNE_START]
+            for value in values:
+                candidate = {**weights, name: value}
+                stats = simulate(strategy, games, seed, workers, {**options, "weights": candidate})
+                trials.append({"weights": candidate, "avg_score": stats["avg_score"], "win_rate": stats["win_rate"]})
+                if (stats["avg_score"], stats["win_rate"]) > (best["avg_score"], best["win_rate"]):
+                    weights, best, improved = candidate, stats, True
+        if not improved:
+            break
+    return {"weights": weights, "stats": best, "trials": trials}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Play seeded 2048 games headlessly and print statistics as JSON.")
+    parser.add_argument("--games", type=int, default=100, help="games per strategy")
+    parser.add_argument("--strategies", nargs="+", choices=list(ai.PLAYERS), default=list(DEFAULT_STRATEGIES))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count, 1 = no pool)")
+    parser.add_argument("--time-budget", type=float, default=None, help="expectimax seconds per move")
+    parser.add_argument("--max-depth", type=int, default=None, help="expectimax search depth limit")
+    parser.add_argument("--size", type=int, default=4, choices=range(engine.MIN_SIZE, engine.MAX_SIZE + 1),
+                        metavar="N", help="board size N x N (3-8)")
+    parser.add_argument("--win-tile", type=int, default=WIN_TILE)
+    parser.add_argument("--play-on", action="store_true", help="keep playing after the win tile")
+    parser.add_argument("--out", help="also write the JSON to this file")
+    parser.add_argument("--record", metavar="FILE", help="write every game's recording (one per line)")
+    parser.add_argument("--weights", type=json.loads, default=None,
+                        help='heuristic weights as JSON, e.g. \'{"corner": 20}\' (others keep their defaults)')
+    parser.add_argument("--ntuple-weights", metavar="FILE", default=None,
+                        help="weights file of the ntuple strategy (default: ntuple.DEFAULT_WEIGHTS)")
+    parser.add_argument("--tune", action="store_true", help="search heuristic weights instead of one run")
+    parser.add_argument("--tune-rounds", type=int, default=2)
+    args = parser.parse_args(argv)
+    # same rule as Game2048: the target must be a tile the game can make
+    if args.win_tile < 4 or args.win_tile & (args.win_tile - 1) or args.win_tile > 1 << engine.MAX_EXPONENT:
+        parser.error(f"--win-tile must be a power of two between 4 and {1 << engine.MAX_EXPONENT}")
+    if args.tune and not set(args.strategies) <= set(HEURISTIC_STRATEGIES):
+        parser.error(f"--tune only applies to {', '.join(HEURISTIC_STRATEGIES)}")
+    if args.weights is not None:
+        try:
+            heuristics.check_weights(args.weights)
+        except (ValueError, TypeError, AttributeError) as e:
+            parser.error(f"--weights: {e}")
+
+    report = {}
+    for strategy in args.strategies:
+        options = {"size": args.size} if args.size != 4 else {}
+        if args.weights is not None and strategy in HEURISTIC_STRATEGIES:
+            options["weights"] = args.weights
+        if strategy == "ntuple" and args.ntuple_weights is not None:
+            options["weights_path"] = args.ntuple_weights
+        if strategy == "expectimax":
+            if args.time_budget is not None:
+                options["time_budget"] = args.time_budget
+            if args.max_depth is not None:
+                options["max_depth"] = args.max_depth
+        if args.tune:
+            report[strategy] = tune(strategy, args.games, args.seed, args.workers, options, args.tune_rounds)
+            continue
+        try:
+            report[strategy] = simulate(strategy, args.games, args.seed, args.workers, options, args.play_on,
+                                        record=bool(args.record), win_tile=args.win_tile)
+        except (FileNotFoundError, ValueError) as e:
+            # missing ntuple weights, or a board size the player does not support
+            parser.error(f"{strategy}: {e}")
+    if args.record and not args.tune:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for stats in report.values():
+                f.writelines(r + "\n" for r in stats.pop("recordings"))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
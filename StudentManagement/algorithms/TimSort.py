@@ -1,5 +1,7 @@
 from models.student import Student
+from utils import perf
 from typing import List, Callable, Any, TypeVar, Tuple
+from array import array
 import unicodedata
 
 T = TypeVar('T')  # Generic type for items to sort
@@ -11,7 +13,10 @@ TimSort (simplified) implementation.
 Module summary:
 - tim_sort: a small stable in-place sort implementation (insertion + merge) used as a wrapper.
 - sort_students: convenience wrapper used by SystemManager.
-- key helpers: gpa_key, name_key, birth_year_key, id_key, major_key.
+- order_snapshot / restore_order: compact array('I') permutations of Student.ordinal values
+  used to restore the "original" order after a column sort (4 bytes per row).
+- key helpers: gpa_key, name_key, birth_year_key, id_key, major_key (SORT_KEYS maps column names to them);
+  score_key(subject) builds a key for any subject of the schema.
 
 Notes:
 - This is a simplified TimSort-like approach (runs of min_run sorted by insertion, then merged).
@@ -131,8 +136,41 @@ def tim_sort(arr: List[T], key: Callable[[T], Any], reverse: bool = False) -> No
 
 
 def sort_students(students: List["Student"], key: Callable[["Student"], Any], reverse: bool = False) -> None:
-    """Public wrapper used by SystemManager to sort student lists using the specified key."""
-    tim_sort(students, key, reverse)
+    """
+    Public wrapper used by SystemManager to sort student lists using the specified key.
+    With utils.perf enabled, records the duration and the number of key() calls.
+    """
+    if not perf.is_enabled():
+        tim_sort(students, key, reverse)
+        return
+    counted = perf.counting(key, "sort_students.key_calls")
+    with perf.span("sort_students"):
+        tim_sort(students, counted, reverse)
+    counted.flush()
+    perf.count("sort_students.rows", len(students))
+
+
+def order_snapshot(students: List["Student"]) -> array:
+    """Return the current order of students as a compact array of their insertion ordinals."""
+    return array("I", (s.ordinal for s in students))
+
+
+def restore_order(students: List["Student"], snapshot: array) -> None:
+    """
+    Reorder students in-place to follow snapshot (O(n), no comparisons).
+
+    Students not present in the snapshot (added after it was taken) keep their
+    relative order and go last; ordinals of deleted students are skipped.
+    """
+    by_ordinal = {s.ordinal: s for s in students}
+    ordered = []
+    for o in snapshot:
+        s = by_ordinal.pop(o, None)
+        if s is not None:
+            ordered.append(s)
+    if by_ordinal:
+        ordered.extend(s for s in students if s.ordinal in by_ordinal)
+    students[:] = ordered
 
 
 # -----------------------
@@ -268,4 +306,21 @@ def id_key(student: "Student") -> str:
 
 def major_key(student: "Student") -> str:
     """Return student's major lowercased for case-insensitive comparison."""
-    return student.major.lower()
\ No newline at end of file
+    return student.major.lower()
+
+
+def score_key(subject: str) -> Callable[["Student"], float]:
+    """Return a key function extracting one subject score (works for any subject schema)."""
+    def key(student: "Student") -> float:
+        return student.get_score(subject)
+    return key
+
+
+# Column / CLI name -> key function
+SORT_KEYS = {
+    "gpa": gpa_key,
+    "name": name_key,
+    "id": id_key,
+    "major": major_key,
+    "birth": birth_year_key,
+}
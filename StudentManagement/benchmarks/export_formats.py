@@ -0,0 +1,66 @@
+"""
+Benchmark every registered exporter (utils.exporters) and, where possible, reloading.
+
+Run from the StudentManagement folder:
+
+    python -m benchmarks.export_formats                       # 100k rows, all formats
+    python -m benchmarks.export_formats --rows 1000000 --formats csv scol csv.gz
+
+The synthetic roster is generated once; each export then consumes a fresh iterator
+over it, so the timings cover serialization (and compression) only. For loadable
+formats the file is read back with load_students. Results are printed as JSON:
+rows/sec for export and reload, and the file size.
+"""
+from benchmarks.synthetic import make_students
+from utils import exporters, file_io
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+
+def bench(n: int, formats, n_subjects=None) -> dict:
+    students = make_students(n, n_subjects=n_subjects)
+    tmpdir = tempfile.mkdtemp(prefix="export-bench-")
+    result = {}
+    try:
+        for name in formats:
+            exp = exporters.EXPORTERS[name]
+            path = os.path.join(tmpdir, "roster" + exp.suffixes[0])
+            t0 = time.perf_counter()
+            try:
+                rows = exporters.export_students(path, iter(students), fmt=name)
+            except ImportError as e:
+                result[name] = {"skipped": str(e)}
+                continue
+            elapsed = time.perf_counter() - t0
+            entry = {"export_seconds": round(elapsed, 3),
+                     "export_rows_per_sec": round(rows / elapsed) if elapsed else None,
+                     "file_mb": round(os.path.getsize(path) / 2 ** 20, 2)}
+            if exp.loadable:
+                t0 = time.perf_counter()
+                loaded = len(file_io.load_students(path))
+                elapsed = time.perf_counter() - t0
+                entry["reload_seconds"] = round(elapsed, 3)
+                entry["reload_rows_per_sec"] = round(loaded / elapsed) if elapsed else None
+            result[name] = entry
+            os.unlink(path)
+        return result
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--formats", nargs="+", choices=list(exporters.EXPORTERS),
+                        default=list(exporters.EXPORTERS))
+    parser.add_argument("--subjects", type=int, default=None, help="schema width (default: 4 default subjects)")
+    args = parser.parse_args(argv)
+    print(json.dumps({str(n): bench(n, args.formats, args.subjects) for n in args.rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from typing import Iterator, List, Optional, Sequence
+from models.student import Student
+from models.score_matrix import ScoreMatrix
+import random
+
+"""
+Synthetic roster generator shared by the benchmark scripts.
+
+Rows look like data/Students.csv (Vietnamese names, a handful of majors,
+subject scores in 0..10) and are reproducible for a given seed. The subject list
+defaults to Student.DEFAULT_SUBJECTS; pass n_subjects for wider schemas.
+"""
+
+FAMILY = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ"]
+MIDDLE = ["Văn", "Thị", "Minh", "Quang", "Thu", "Ngọc", "Đức", "Thanh"]
+GIVEN = ["An", "Bích", "Vinh", "Tâm", "Dũng", "Lan", "Yến", "Quỳnh", "Sĩ", "Lệ", "Thái", "Khánh", "Trang"]
+MAJORS = ["Software Engineering", "Cybersecurity", "Information Technology", "Data Science",
+          "Artificial Intelligence", "Computer Engineering"]
+
+
+def subject_names(n_subjects: Optional[int] = None) -> Sequence[str]:
+    """DEFAULT_SUBJECTS, or SUB01..SUBnn when n_subjects is given."""
+    if n_subjects is None:
+        return Student.DEFAULT_SUBJECTS
+    return [f"SUB{j:02d}" for j in range(1, n_subjects + 1)]
+
+
+def iter_students(n: int, seed: int = 0, n_subjects: Optional[int] = None) -> Iterator[Student]:
+    """Yield n reproducible synthetic students sharing one ScoreMatrix."""
+    rng = random.Random(seed)
+    matrix = ScoreMatrix(subject_names(n_subjects))
+    for i in range(n):
+        s = Student(f"SV{i:08d}",
+                    f"{rng.choice(FAMILY)} {rng.choice(MIDDLE)} {rng.choice(GIVEN)}",
+                    rng.randint(1998, 2008),
+                    rng.choice(MAJORS),
+                    matrix=matrix)
+        for subj in matrix.subjects:
+            s.set_score(subj, round(rng.uniform(4.0, 10.0), 2))
+        yield s
+
+
+def make_students(n: int, seed: int = 0, n_subjects: Optional[int] = None) -> List[Student]:
+    """Return a list of n reproducible synthetic students."""
+    return list(iter_students(n, seed, n_subjects))
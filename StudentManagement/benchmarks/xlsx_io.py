@@ -0,0 +1,92 @@
+"""
+Benchmark streaming Excel export/import (utils.file_io.export_xlsx / iter_students_xlsx).
+
+Run from the StudentManagement folder:
+
+    python -m benchmarks.xlsx_io                 # 100k and 1M rows
+    python -m benchmarks.xlsx_io --rows 20000
+
+For each size it reports rows/sec and peak resident memory for:
+  export  - students generated lazily and streamed into a write-only workbook
+  import  - iter_students_xlsx consumed without keeping the Students (pure streaming)
+  load    - load_students (materializes the list of Students, as the GUI does)
+Every phase runs in a fresh worker process so its peak RSS is not polluted by the
+previous one; "baseline_rss_mb" is the peak of an idle worker for comparison.
+Results are printed as JSON.
+"""
+from benchmarks.synthetic import iter_students
+from utils import file_io
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, report timings only
+    resource = None
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _idle(path: str, n: int) -> int:
+    return 0
+
+
+def _export(path: str, n: int) -> int:
+    file_io.export_xlsx(path, iter_students(n))
+    return n
+
+
+def _import(path: str, n: int) -> int:
+    return sum(1 for _ in file_io.iter_students_xlsx(path))
+
+
+def _load(path: str, n: int) -> int:
+    return len(file_io.load_students(path))
+
+
+def _timed(phase, path: str, n: int):
+    t0 = time.perf_counter()
+    rows = phase(path, n)
+    return rows, time.perf_counter() - t0, _peak_rss_mb()
+
+
+def _run_isolated(phase, path: str, n: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        rows, elapsed, rss = pool.apply(_timed, (phase, path, n))
+    return {"rows": rows, "seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed) if elapsed else None,
+            "peak_rss_mb": rss}
+
+
+def bench(n: int) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        result = {"baseline_rss_mb": _run_isolated(_idle, path, n)["peak_rss_mb"]}
+        for name, phase in (("export", _export), ("import", _import), ("load", _load)):
+            result[name] = _run_isolated(phase, path, n)
+        result["file_mb"] = round(os.path.getsize(path) / 2 ** 20, 1)
+        return result
+    finally:
+        os.unlink(path)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args(argv)
+    print(json.dumps({str(n): bench(n) for n in args.rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
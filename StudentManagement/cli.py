@@ -0,0 +1,317 @@
+"""
+Headless command-line interface for StudentManagement (no Tk required).
+
+Run from the StudentManagement folder:
+
+    python -m cli load    data/Students.csv
+    python -m cli filter  data/Students.csv --major "data" --gpa 7-9 --score CSI106=8
+    python -m cli sort    data/Students.csv --by name --format jsonl
+    python -m cli sort    data/Students.csv --by CSI106 --desc
+    python -m cli top-k   data/Students.csv -k 10 --by gpa
+    python -m cli stats   data/Students.csv --major "Data Science"
+    python -m cli export  data/Students.csv -o out.xlsx --major "data"
+    python -m cli export  data/Students.csv -o out.csv.gz --by gpa --desc
+    python -m cli merge   class_a.csv class_b.xlsx --policy score-max --workers 4 --report conflicts.json
+    python -m cli validate data/Students.csv --report problems.json
+
+Every subcommand accepts the filter options (same grammar as the filter popup),
+so filter -> sort -> top-k can be done in one call. --by takes a column name or any
+subject of the file's header. Student rows are streamed to stdout as CSV (default,
+same header as save_students) or JSON Lines; stats are JSON. validate checks the raw
+file (duplicate ids, out-of-range scores/birth years, GPA mismatches, ...) and exits
+with status 1 when it finds problems.
+Use --timing to print per-stage durations to stderr, or --perf FILE to write the
+hot-path timers and counters (utils.perf: load, sort incl. key calls, ...) as JSON.
+"""
+from typing import Callable, Iterable, List, Optional, Sequence
+from models.student import Student
+from services.system_manager import SystemManager, MERGE_POLICIES
+from services.student_filter import build_criteria, iter_matches
+from services.roster_validator import validate_file, DETAIL_LIMIT
+from algorithms.TimSort import sort_students, score_key, SORT_KEYS
+from utils import exporters, file_io, perf
+import argparse
+import heapq
+import json
+import sys
+import time
+import csv
+
+# Keys ranked descending unless --asc/--desc says otherwise (top-k default);
+# subject scores rank descending too
+_DESC_BY_DEFAULT = {"gpa"}
+
+
+class _Timer:
+    """Collect named stage durations and report them to stderr when enabled."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        if self.enabled:
+            print(f"[timing] {stage}: {(now - self._last) * 1000:.1f} ms", file=sys.stderr)
+        self._last = now
+
+
+def write_students(students: Iterable[Student], fmt: str, out=None,
+                   subjects: Optional[Sequence[str]] = None) -> int:
+    """
+    Stream students to `out` (stdout by default) as CSV or JSON Lines. Returns row count.
+    subjects: subject columns / JSON keys (default Student.DEFAULT_SUBJECTS).
+    """
+    out = out or sys.stdout
+    subjects = tuple(subjects or Student.DEFAULT_SUBJECTS)
+    n = 0
+    if fmt == "jsonl":
+        for s in students:
+            out.write(json.dumps(s.to_dict(subjects), ensure_ascii=False) + "\n")
+            n += 1
+    else:
+        writer = csv.writer(out)
+        writer.writerow(file_io.roster_header(subjects))
+        for s in students:
+            writer.writerow(s.to_row(subjects))
+            n += 1
+    return n
+
+
+def _parse_scores(items: Optional[List[str]]) -> dict:
+    """Turn repeated --score SUBJECT=RANGE options into {subject: range_text}."""
+    scores = {}
+    for item in items or []:
+        subj, sep, rng = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--score expects SUBJECT=RANGE, got {item!r}")
+        scores[subj.strip()] = rng
+    return scores
+
+
+def _criteria(args) -> dict:
+    return build_criteria(
+        first_name=args.first_name or "",
+        birth_year=args.birth_year or "",
+        major=args.major or "",
+        subjects=_parse_scores(args.score),
+        gpa=args.gpa or "",
+    )
+
+
+def _reverse(args) -> bool:
+    if args.desc:
+        return True
+    if args.asc:
+        return False
+    return args.command == "top-k" and (args.by in _DESC_BY_DEFAULT or args.by not in SORT_KEYS)
+
+
+def _sort_key(sm: SystemManager, by: str) -> Callable[[Student], object]:
+    """Key function for --by: a SORT_KEYS column or a subject of the roster's schema."""
+    if by in SORT_KEYS:
+        return SORT_KEYS[by]
+    if by in sm.scores.index:
+        return score_key(by)
+    raise SystemExit(f"--by: unknown column or subject {by!r} "
+                     f"(choose from {', '.join(sorted(SORT_KEYS))}, {', '.join(sm.subjects)})")
+
+
+def _selected(sm: SystemManager, args, timer: _Timer) -> Iterable[Student]:
+    """Apply filter, sort and top-k options to the loaded roster."""
+    rows: Iterable[Student] = iter_matches(sm.students, _criteria(args))
+    by = getattr(args, "by", None)
+    if args.command == "top-k":
+        key = _sort_key(sm, by)
+        pick = heapq.nlargest if _reverse(args) else heapq.nsmallest
+        rows = pick(args.k, rows, key=key)
+        timer.mark("top-k")
+    elif by:
+        rows = list(rows)
+        timer.mark("filter")
+        sort_students(rows, key=_sort_key(sm, by), reverse=_reverse(args))
+        timer.mark("sort")
+    return rows
+
+
+def cmd_rows(sm: SystemManager, args, timer: _Timer) -> int:
+    """load / filter / sort / top-k: stream selected rows to stdout."""
+    n = write_students(_selected(sm, args, timer), args.format, subjects=sm.subjects)
+    timer.mark(f"write ({n} rows)")
+    return 0
+
+
+def cmd_stats(sm: SystemManager, args, timer: _Timer) -> int:
+    """stats: JSON aggregates for the (optionally filtered) roster."""
+    criteria = _criteria(args)
+    if criteria:
+        sm.stats.rebuild(iter_matches(sm.students, criteria))
+        timer.mark("filter+stats")
+    result = {"overall": sm.stats.summary(),
+              "majors": {m: sm.stats.summary(m) for m in sm.stats.major_names()}}
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    timer.mark("write")
+    return 0
+
+
+def cmd_export(sm: SystemManager, args, timer: _Timer) -> int:
+    """export: stream selected rows into any format of utils.exporters (chosen by suffix or --to)."""
+    try:
+        n = exporters.export_students(args.output, _selected(sm, args, timer), fmt=args.to,
+                                      subjects=sm.subjects)
+    except ImportError as e:
+        print(f"{e}. Install the missing package (e.g. pip install openpyxl)", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    timer.mark("export")
+    print(f"Exported {n} students to {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_merge(sm: SystemManager, args, timer: _Timer) -> int:
+    """merge: upsert the remaining inputs into the first one, stream (or save) the result."""
+    base = args.inputs[0]
+    report = sm.merge_files(args.inputs[1:], args.policy, workers=args.workers)
+    timer.mark("merge")
+    for c in report["conflicts"]:
+        for k in ("kept", "dropped"):
+            if c[k] == "memory":
+                c[k] = base
+    summary = {k: v for k, v in report.items() if k != "conflicts"}
+    summary["conflicts"] = len(report["conflicts"])
+    print(json.dumps(summary), file=sys.stderr)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.output:
+        if not file_io.save_students(args.output, sm.students, subjects=sm.subjects):
+            return 1
+    else:
+        write_students(sm.students, args.format, subjects=sm.subjects)
+    timer.mark("write")
+    return 0
+
+
+def cmd_validate(args, timer: _Timer) -> int:
+    """validate: check the raw file and print the report (summary to stderr, JSON to stdout or --report)."""
+    try:
+        report = validate_file(args.input, limit=args.limit)
+    except ImportError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Validation failed: {e}", file=sys.stderr)
+        return 1
+    timer.mark(f"validate ({report.rows} rows)")
+    print("\n".join(report.summary_lines()), file=sys.stderr)
+    if args.report:
+        if not report.dump(args.report):
+            return 1
+    else:
+        json.dump(report.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    return 0 if report.ok else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Headless student roster processing.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("input", help="CSV or Excel roster file")
+    common.add_argument("--timing", action="store_true", help="print stage durations to stderr")
+    common.add_argument("--perf", metavar="FILE", help="write hot-path timers/counters as JSON to FILE")
+    flt = common.add_argument_group("filter (same grammar as the filter popup)")
+    flt.add_argument("--first-name", help="given name (last token), exact match")
+    flt.add_argument("--birth-year", help="year or range, e.g. 1998 or 1990-1995")
+    flt.add_argument("--major", help="case-insensitive substring")
+    flt.add_argument("--score", action="append", metavar="SUBJECT=RANGE",
+                     help="subject score, e.g. CSI106=8 or CSI106=7-9 (repeatable)")
+    flt.add_argument("--gpa", help="single value or range, e.g. 7 or 6.5-8")
+
+    fmt = argparse.ArgumentParser(add_help=False)
+    fmt.add_argument("--format", choices=("csv", "jsonl"), default="csv", help="output format (default csv)")
+
+    order = argparse.ArgumentParser(add_help=False)
+    order.add_argument("--asc", action="store_true", help="ascending order")
+    order.add_argument("--desc", action="store_true", help="descending order")
+
+    sub.add_parser("load", parents=[common, fmt], help="stream the whole roster")
+    sub.add_parser("filter", parents=[common, fmt], help="stream students matching the filter")
+    p = sub.add_parser("sort", parents=[common, fmt, order], help="stream students sorted by a column")
+    p.add_argument("--by", metavar="KEY", required=True,
+                   help=f"{'/'.join(sorted(SORT_KEYS))} or a subject name (name uses Vietnamese given-name order)")
+    p = sub.add_parser("top-k", parents=[common, fmt, order], help="stream the first k students by a column")
+    p.add_argument("-k", type=int, default=10, help="number of students (default 10)")
+    p.add_argument("--by", metavar="KEY", default="gpa",
+                   help="ranking key: column or subject name (default gpa; gpa/subjects rank descending)")
+    sub.add_parser("stats", parents=[common], help="print roster statistics as JSON")
+    p = sub.add_parser("export", parents=[common], help="write (filtered) students to a file")
+    p.add_argument("-o", "--output", required=True,
+                   help="destination; the format follows the suffix: "
+                        + ", ".join(s for e in exporters.EXPORTERS.values() for s in e.suffixes))
+    p.add_argument("--to", choices=list(exporters.EXPORTERS), help="format (overrides the suffix)")
+    p.add_argument("--by", metavar="KEY", help="optional sort key (column or subject name)")
+    p.add_argument("--asc", action="store_true", help=argparse.SUPPRESS)
+    p.add_argument("--desc", action="store_true", help="descending order")
+
+    p = sub.add_parser("merge", parents=[fmt], help="merge several shards (hash join on student_id)")
+    p.add_argument("inputs", nargs="+", help="CSV/XLSX shards; the first one is the base roster")
+    p.add_argument("--policy", choices=MERGE_POLICIES, default="upsert", help="conflict policy (default upsert)")
+    p.add_argument("--workers", type=int, default=None, help="parse shards in N processes")
+    p.add_argument("-o", "--output", help="save merged roster to this CSV instead of stdout")
+    p.add_argument("--report", help="write the full conflict report (JSON) to this file")
+    p.add_argument("--timing", action="store_true", help="print stage durations to stderr")
+    p.add_argument("--perf", metavar="FILE", help="write hot-path timers/counters as JSON to FILE")
+
+    p = sub.add_parser("validate", help="check the raw file for duplicate ids, out-of-range values, ...")
+    p.add_argument("input", help="CSV or Excel roster file")
+    p.add_argument("--report", help="write the JSON report to this file instead of stdout")
+    p.add_argument("--limit", type=int, default=DETAIL_LIMIT,
+                   help=f"details kept per problem type (default {DETAIL_LIMIT})")
+    p.add_argument("--timing", action="store_true", help="print stage durations to stderr")
+    p.add_argument("--perf", metavar="FILE", help="write hot-path timers/counters as JSON to FILE")
+    return parser
+
+
+COMMANDS = {
+    "load": cmd_rows,
+    "filter": cmd_rows,
+    "sort": cmd_rows,
+    "top-k": cmd_rows,
+    "stats": cmd_stats,
+    "export": cmd_export,
+    "merge": cmd_merge,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    timer = _Timer(args.timing)
+    if args.perf:
+        perf.enable()
+    if args.command == "validate":
+        # works on the raw file: no roster to load
+        try:
+            return cmd_validate(args, timer)
+        finally:
+            if args.perf:
+                perf.dump(args.perf)
+    sm = SystemManager(args.inputs[0] if args.command == "merge" else args.input)
+    timer.mark(f"load ({len(sm.students)} students)")
+    try:
+        return COMMANDS[args.command](sm, args, timer)
+    except BrokenPipeError:
+        # downstream closed early (e.g. `| head`): not an error for a pipeline stage
+        sys.stderr.close()
+        return 0
+    finally:
+        if args.perf:
+            perf.dump(args.perf)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
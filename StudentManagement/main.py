@@ -1,14 +1,37 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from services.system_manager import SystemManager
+from services.system_manager import SystemManager, MERGE_POLICIES
+from services import roster_validator
+from services.student_filter import (build_criteria, student_matches, criteria_contains,
+                                     parse_year_range, parse_numeric_range)
 from models.student import Student
-from utils import file_io
+from utils import columnar, exporters, file_io, perf
+from utils.background import BackgroundTask
+from utils.file_watcher import FileWatcher
 import os
-import math
-from algorithms.TimSort import (sort_students, gpa_key, name_key,
-                                birth_year_key, id_key, major_key)
+from functools import partial
+from algorithms.TimSort import sort_students, order_snapshot, restore_order, SORT_KEYS
+
+# Widgets that handle Ctrl+Z / Ctrl+Y themselves (ttk.Combobox and ttk.Spinbox are ttk.Entry)
+TEXT_INPUTS = (tk.Entry, ttk.Entry, tk.Text, tk.Spinbox)
+
 
 class StudentApp(ttk.Frame):
+    # Views with more rows than this are rendered virtually:
+    # only the visible window (+ overscan) lives in the Treeview.
+    VIRTUAL_THRESHOLD = 2000
+    # Extra rows rendered below the visible window in virtual mode
+    VIRTUAL_OVERSCAN = 5
+    # Subject entries per column in the add/edit and filter popups (more columns for wide schemas)
+    SCORE_ROWS_PER_COLUMN = 5
+    # Timers shown in the status-bar debug panel: (utils.perf name, short label)
+    PERF_PANEL_TIMERS = (("load_students", "load"), ("save_students", "save"), ("sort_students", "sort"),
+                         ("apply_filter", "filter"), ("search_student", "search"), ("refresh_table", "refresh"))
+    # How often the roster file is checked for external edits (one stat() per tick)
+    WATCH_INTERVAL_MS = 1000
+    # File deltas touching at most this many students patch the table row by row
+    WATCH_PATCH_LIMIT = 50
+
     def __init__(self, root)    :
         super().__init__(root, padding=10)
         self.root = root
@@ -30,17 +53,38 @@ class StudentApp(ttk.Frame):
         self.view_students = list(self.sm.students)
         # whether view is currently filtered (True => view_students is a filtered subset)
         self.is_filtered = False
+        # criteria that produced the current filtered view (None => unknown / must rescan)
+        self._active_criteria = None
 
         # initialize search state early so refresh_table and other methods can access them
-        self.search_matches = []   # list of tree iids that match current search
+        self.search_matches = []   # list of student_ids that match current search
         self.search_index = -1     # current index into search_matches
 
+        # Virtual table state (see refresh_table / _render_window)
+        self.virtual = False       # True => Treeview only holds the visible window of rows
+        self._vtop = 0             # index in view_students of the first rendered row
+        self._vslots = []          # reusable Treeview items for the rendered window
+        self._vselected = None     # student_id selected in virtual mode (may be scrolled out)
+
+        # Normal mode: stable Treeview iids keyed by student_id (id(Student) -> iid)
+        self._row_iid = {}
+        # Lowest row index whose number/stripe is stale after a row removal (None => all good)
+        self._renumber_from = None
+
+        # Background file I/O (load/save) in flight, or None
+        self._io_task = None
+        self._io_callbacks = None  # (label, on_done, on_error) for the task in flight
+
+        # External edits of the roster file (see _watch / _watch_tick)
+        self.watcher = None        # FileWatcher of sm.filepath
+        self._watch_task = None    # background snapshot/read_changes in flight, or None
+
         # Sorting state per-column:
         # None -> original order, "asc" -> ascending, "desc" -> descending
         self._sort_state = {c: None for c in ("no", "id", "name", "birth", "major", "gpa")}
-        # snapshot of canonical students before a sort so we can restore "original" order
+        # order of canonical students before a sort (array('I') of ordinals) so we can restore "original" order
         self._canon_snapshot = None
-        # snapshots for filtered views per-column
+        # order snapshots (array('I') of ordinals) for filtered views per-column
         self._view_snapshots = {}
 
         self.pack(fill="both", expand=True)
@@ -67,16 +111,18 @@ class StudentApp(ttk.Frame):
         self.add_btn.pack(side="left", padx=8)
         ttk.Button(toolbar, text="✏️ Edit", command=self.edit_selected).pack(side="left", padx=4)
         ttk.Button(toolbar, text="🗑️ Delete", command=self.delete_selected).pack(side="left", padx=4)
+        ttk.Button(toolbar, text="↶ Undo", command=self.undo).pack(side="left", padx=4)
+        ttk.Button(toolbar, text="↷ Redo", command=self.redo).pack(side="left", padx=4)
         ttk.Button(toolbar, text="📂 Load", command=self.load_file).pack(side="left", padx=4)
         ttk.Button(toolbar, text="💾 Save", command=self.save).pack(side="left", padx=4)
         ttk.Button(toolbar, text="💾 Save As...", command=self.save_as).pack(side="left", padx=4)
+        ttk.Button(toolbar, text="🔀 Merge", command=self.merge_files_popup).pack(side="left", padx=4)
+        ttk.Button(toolbar, text="🩺 Validate", command=self.validate_roster).pack(side="left", padx=4)
         # Filter controls
         ttk.Button(toolbar, text="🔎 Filter", command=self.open_filter_popup).pack(side="left", padx=8)
         ttk.Button(toolbar, text="❌ Clear Filter", command=self.clear_filter).pack(side="left", padx=4)
 
         # Treeview
-        self.subjects = ["CSI106", "PFP191", "MAD101", "MAE101"]
-
         # Create and configure the main Treeview table.
         self._create_table()
 
@@ -103,6 +149,20 @@ class StudentApp(ttk.Frame):
         self._build_context_menu()
         self.refresh_table()
 
+        self._watch(self.sm.filepath)
+        self.after(self.WATCH_INTERVAL_MS, self._watch_tick)
+
+    @property
+    def subjects(self):
+        """Subject schema of the loaded roster (read from the file header)."""
+        return self.sm.subjects
+
+    def _score_grid(self):
+        """Return (rows, columns) used to lay out one entry per subject in popups."""
+        n = len(self.subjects)
+        rows = min(max(n, 1), self.SCORE_ROWS_PER_COLUMN)
+        return rows, max(1, -(-n // rows))
+
     # ---------- UI helpers ----------
     def _create_table(self):
         """
@@ -116,7 +176,12 @@ class StudentApp(ttk.Frame):
         """
         # Define columns (no subject columns - they're only shown in edit dialog)
         columns = ("no", "id", "name", "birth", "major", "gpa")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="browse")
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill="both", expand=True, padx=6, pady=6)
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings", selectmode="browse")
+        # Scrollbar is driven by the Treeview normally, and by the logical row count in virtual mode
+        self.vsb = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.vsb.set)
 
         # Configure column headings with sort callbacks
         for col in columns:
@@ -131,15 +196,38 @@ class StudentApp(ttk.Frame):
         self.tree.tag_configure("oddrow", background="#edebeb")
         self.tree.tag_configure("evenrow", background="#ffffff")
 
-        self.tree.pack(fill="both", expand=True, padx=6, pady=6)
+        self.vsb.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
 
     def _create_status_bar(self):
-        """Create bottom status bar showing student count and save state."""
+        """Create bottom status bar showing student count, save state and a GPA stats panel."""
         status = ttk.Frame(self)
         status.pack(fill="x", side="bottom")
         self.status_var = tk.StringVar()
         self.status_label = ttk.Label(status, textvariable=self.status_var, anchor="w")
-        self.status_label.pack(fill="x", padx=6)
+        self.status_label.pack(side="left", fill="x", expand=True, padx=6)
+
+        # File I/O progress (shown only while a background load/save runs)
+        self.io_frame = ttk.Frame(status)
+        self.io_var = tk.StringVar()
+        ttk.Label(self.io_frame, textvariable=self.io_var).pack(side="left", padx=(6, 4))
+        self.io_progress = ttk.Progressbar(self.io_frame, length=180, mode="determinate", maximum=100)
+        self.io_progress.pack(side="left", padx=4)
+        ttk.Button(self.io_frame, text="Cancel", command=self._cancel_io).pack(side="left", padx=4)
+
+        # Debug panel (F12 or STUDENT_PERF=1): last duration of each instrumented hot path
+        self.perf_frame = ttk.Frame(status)
+        self.perf_var = tk.StringVar()
+        ttk.Label(self.perf_frame, textvariable=self.perf_var, foreground="#6b7280").pack(side="left", padx=(6, 4))
+        ttk.Button(self.perf_frame, text="⏱", width=3, command=self.open_perf_popup).pack(side="left", padx=4)
+        if perf.is_enabled():
+            self.perf_frame.pack(side="left", padx=6)
+            self.after(500, self._poll_perf)
+
+        # Stats panel (right side): overall GPA aggregates + button for per-major details
+        ttk.Button(status, text="📊 Stats", command=self.open_stats_popup).pack(side="right", padx=6)
+        self.stats_var = tk.StringVar()
+        ttk.Label(status, textvariable=self.stats_var, anchor="e").pack(side="right", padx=6)
 
     def _setup_bindings(self):
         """Setup keyboard shortcuts and window event handlers."""
@@ -147,9 +235,22 @@ class StudentApp(ttk.Frame):
         self.tree.bind("<Double-1>", self._on_double_click)
         self.tree.bind("<Button-3>", self._on_right_click)
 
+        # Virtual table: scrolling, keyboard navigation and selection tracking
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self._on_mouse_wheel)
+        self.tree.bind("<Up>", lambda e: self._on_arrow_key(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow_key(1))
+        self.tree.bind("<Prior>", lambda e: self._on_arrow_key(-self._visible_rows()))
+        self.tree.bind("<Next>", lambda e: self._on_arrow_key(self._visible_rows()))
+        self.tree.bind("<Configure>", self._on_tree_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
         # Window-level bindings
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)  # handle window close
         self.root.bind_all("<Control-s>", self.save)           # Ctrl+S to save
+        self.root.bind_all("<Control-z>", self.undo)           # Ctrl+Z to undo last edit
+        self.root.bind_all("<Control-y>", self.redo)           # Ctrl+Y to redo
+        self.root.bind_all("<F12>", self.toggle_perf)          # F12 to show/hide timing panel
 
     def _build_context_menu(self):
         """Create right-click context menu for table rows."""
@@ -180,14 +281,7 @@ class StudentApp(ttk.Frame):
         state = self._sort_state.get(col)
 
         # map column to key function
-        key_map = {
-            "gpa": gpa_key,
-            "name": name_key,
-            "id": id_key,
-            "major": major_key,
-            "birth": birth_year_key
-        }
-        key = key_map.get(col)
+        key = SORT_KEYS.get(col)
 
         # If unsupported column (e.g., "no") just ignore
         if key is None:
@@ -195,30 +289,25 @@ class StudentApp(ttk.Frame):
 
         # Determine next state and act accordingly
         if state is None:
-            # store snapshot to allow "original" restore
+            # store order snapshot (4 bytes per row) to allow "original" restore
             if self.is_filtered:
-                self._view_snapshots[col] = list(self.view_students)
+                self._view_snapshots[col] = order_snapshot(self.view_students)
             else:
-                self._canon_snapshot = list(self.sm.students)
+                self._canon_snapshot = order_snapshot(self.sm.students)
             reverse = False  # ascending first
             self._sort_state[col] = "asc"
         elif state == "asc":
             reverse = True   # descending
             self._sort_state[col] = "desc"
         else:
-            # restore original order
+            # restore original order (reorders current members, so edits/adds/deletes are kept)
             if self.is_filtered:
                 orig = self._view_snapshots.pop(col, None)
                 if orig is not None:
-                    self.view_students = orig
+                    restore_order(self.view_students, orig)
             else:
                 if self._canon_snapshot is not None:
-                    self.sm.students = self._canon_snapshot
-                    # rebuild index after replacing canonical list
-                    try:
-                        self.sm._build_index()
-                    except Exception:
-                        pass
+                    restore_order(self.sm.students, self._canon_snapshot)
                     self.view_students = list(self.sm.students)
                 self._canon_snapshot = None
             # clear this column state and leave others cleared too
@@ -251,27 +340,46 @@ class StudentApp(ttk.Frame):
         total = len(self.sm.students)
         unsaved = " (unsaved)" if self.sm.unsaved_changes else ""
         self.status_var.set(f"Students: {total}{unsaved}")
+        # O(1): aggregates are maintained incrementally by SystemManager
+        st = self.sm.stats.summary()
+        if st["count"]:
+            self.stats_var.set(f"GPA mean {st['mean']:.2f} | median {st['median']:.2f} | std {st['std']:.2f}")
+        else:
+            self.stats_var.set("")
 
+    @perf.timed()
     def refresh_table(self):
         """
         Rebuild entire table contents from current view (self.view_students).
 
-        - Clears and repopulates all rows
+        - Small views: clears and repopulates all rows
+        - Views above VIRTUAL_THRESHOLD: only the visible window is rendered (virtual mode)
         - Applies row striping
-        - Resets search state (since row IDs change)
+        - Resets search state
         - Updates status bar
         """
-        # Clear existing rows
-        for r in self.tree.get_children():
-            self.tree.delete(r)
-
-        # Use view_students (may be filtered) instead of self.sm.students
-        for i, s in enumerate(self.view_students, start=1):
-            tag = "evenrow" if i % 2 == 0 else "oddrow"
-            row = (i, s.student_id, s.name, s.birth_year, s.major, f"{s.gpa:.2f}")
-            self.tree.insert("", "end", values=row, tags=(tag,))
-
-        # Reset search state since row IDs changed
+        # Clear existing rows (single Tk call)
+        self.tree.delete(*self.tree.get_children())
+        self._vslots = []
+        self._row_iid = {}
+        self._renumber_from = None
+
+        self.virtual = len(self.view_students) > self.VIRTUAL_THRESHOLD
+        if self.virtual:
+            # We own the scrollbar: it reflects the logical row count, not the widget content
+            self.tree.configure(yscrollcommand="")
+            self.vsb.configure(command=self._on_virtual_scroll)
+            self._render_window()
+        else:
+            self.tree.configure(yscrollcommand=self.vsb.set)
+            self.vsb.configure(command=self.tree.yview)
+            self._vtop = 0
+            # Use view_students (may be filtered) instead of self.sm.students
+            for i, s in enumerate(self.view_students, start=1):
+                self._insert_row(s, i)
+            perf.count("refresh_table.rows", len(self.view_students))
+
+        # Reset search state since rows changed
         self.search_matches = []
         self.search_index = -1
         self.prev_btn.configure(state="disabled")
@@ -279,6 +387,222 @@ class StudentApp(ttk.Frame):
 
         self._update_status()
 
+    # ---------- incremental row updates ----------
+    def _insert_row(self, s: Student, no: int):
+        """Normal mode: append a row for `s` (1-based row number `no`) with a stable iid."""
+        iid = s.student_id
+        if self.tree.exists(iid):
+            # duplicate ids in a loaded file: key the extra rows by their unique ordinal, in a
+            # namespace no real id can reach (ids are stripped, so never start with a space)
+            iid = f" dup{s.ordinal}"
+        self.tree.insert("", "end", iid=iid, values=self._row_values(no, s), tags=(self._row_tag(no),))
+        self._row_iid[id(s)] = iid
+
+    def _patch_student(self, s: Student):
+        """Repaint a single edited student in place (no full refresh)."""
+        if self.virtual:
+            self._render_window()
+        else:
+            iid = self._row_iid.get(id(s))
+            if iid is not None and self.tree.exists(iid):
+                no = self.tree.index(iid) + 1
+                self.tree.item(iid, values=self._row_values(no, s))
+        self._update_status()
+
+    def _append_student(self, s: Student):
+        """Show a student just appended to view_students."""
+        if self.virtual:
+            self._render_window()
+        elif len(self.view_students) > self.VIRTUAL_THRESHOLD:
+            # crossed the threshold: switch to virtual mode
+            self.refresh_table()
+        else:
+            self._insert_row(s, len(self.view_students))
+        self._update_status()
+
+    def _remove_student(self, s: Student):
+        """Drop a student from view_students and the table; renumber following rows lazily."""
+        for idx, v in enumerate(self.view_students):
+            if v is s:
+                del self.view_students[idx]
+                break
+        else:
+            idx = None
+        if s.student_id in self.search_matches:
+            pos = self.search_matches.index(s.student_id)
+            self.search_matches.remove(s.student_id)
+            if pos <= self.search_index:
+                self.search_index -= 1
+            if len(self.search_matches) < 2:
+                self.prev_btn.configure(state="disabled")
+                self.next_btn.configure(state="disabled")
+        if self.virtual:
+            self._render_window()
+        else:
+            iid = self._row_iid.pop(id(s), None)
+            if iid is not None and self.tree.exists(iid):
+                self.tree.delete(iid)
+            if idx is not None:
+                self._schedule_renumber(idx)
+        self._update_status()
+
+    def _schedule_renumber(self, start: int):
+        """Mark rows from `start` on as stale and fix numbers/stripes once Tk is idle."""
+        if self._renumber_from is None:
+            self.after_idle(self._renumber_rows)
+            self._renumber_from = start
+        else:
+            self._renumber_from = min(self._renumber_from, start)
+
+    def _renumber_rows(self):
+        """Rewrite row number and stripe tag of rows after the first removal point."""
+        start, self._renumber_from = self._renumber_from, None
+        if start is None or self.virtual:
+            return
+        children = self.tree.get_children()
+        for i in range(start, len(children)):
+            no = i + 1
+            self.tree.set(children[i], "no", no)
+            self.tree.item(children[i], tags=(self._row_tag(no),))
+
+    @staticmethod
+    def _row_values(no: int, s: Student) -> tuple:
+        """Return Treeview values for a student displayed at 1-based row number `no`."""
+        return (no, s.student_id, s.name, s.birth_year, s.major, f"{s.gpa:.2f}")
+
+    @staticmethod
+    def _row_tag(no: int) -> str:
+        return "evenrow" if no % 2 == 0 else "oddrow"
+
+    # ---------- virtual table ----------
+    def _visible_rows(self) -> int:
+        """Number of rows that fit in the Treeview (estimate before the widget is mapped)."""
+        h = self.tree.winfo_height()
+        if h <= 1:
+            return 30
+        try:
+            row_h = int(self.style.lookup("Treeview", "rowheight") or 25)
+        except (TypeError, ValueError):
+            row_h = 25
+        # subtract the heading row
+        return max(1, (h - row_h) // row_h)
+
+    @perf.timed()
+    def _render_window(self):
+        """
+        Virtual mode: show view_students[_vtop : _vtop + visible + overscan].
+
+        Treeview items are reused as slots (only values/tags change while scrolling),
+        and the scrollbar is set from the logical row count.
+        """
+        n = len(self.view_students)
+        visible = self._visible_rows()
+        self._vtop = max(0, min(self._vtop, n - visible))
+        top = self._vtop
+        count = max(0, min(n - top, visible + self.VIRTUAL_OVERSCAN))
+
+        while len(self._vslots) < count:
+            self._vslots.append(self.tree.insert("", "end"))
+        while len(self._vslots) > count:
+            self.tree.delete(self._vslots.pop())
+
+        selected_slot = None
+        for k, slot in enumerate(self._vslots):
+            no = top + k + 1
+            s = self.view_students[top + k]
+            self.tree.item(slot, values=self._row_values(no, s), tags=(self._row_tag(no),))
+            if s.student_id == self._vselected:
+                selected_slot = slot
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        self.tree.yview_moveto(0)
+        if n:
+            self.vsb.set(top / n, min(1.0, (top + visible) / n))
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def _scroll_to(self, top: int, force: bool = False):
+        """Virtual mode: move the window so row `top` is first, re-rendering if it moved."""
+        max_top = max(0, len(self.view_students) - self._visible_rows())
+        top = max(0, min(int(top), max_top))
+        if force or top != self._vtop:
+            self._vtop = top
+            self._render_window()
+
+    def _on_virtual_scroll(self, *args):
+        """Scrollbar command in virtual mode ('moveto' fraction or 'scroll' n units|pages)."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * len(self.view_students))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= self._visible_rows()
+            self._scroll_to(self._vtop + step)
+
+    def _on_mouse_wheel(self, event):
+        if not self.virtual:
+            return None
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_to(self._vtop - 3)
+        else:
+            self._scroll_to(self._vtop + 3)
+        return "break"
+
+    def _on_arrow_key(self, delta: int):
+        """Virtual mode: move the logical selection, scrolling the window at its edges."""
+        if not self.virtual or not self.view_students:
+            return None
+        sel = self.tree.selection()
+        if sel and sel[0] in self._vslots:
+            idx = self._vtop + self._vslots.index(sel[0]) + delta
+        else:
+            idx = self._vtop
+        self._reveal_index(max(0, min(idx, len(self.view_students) - 1)))
+        return "break"
+
+    def _on_tree_resize(self, event=None):
+        if self.virtual:
+            self._render_window()
+
+    def _on_select(self, event=None):
+        """Remember the selected student_id so virtual mode can keep it across scrolling."""
+        sel = self.tree.selection()
+        if sel:
+            vals = self.tree.item(sel[0])["values"]
+            if len(vals) > 1:
+                self._vselected = str(vals[1])
+
+    def _reveal_index(self, idx: int):
+        """Select and scroll to the row at index idx of view_students (both table modes)."""
+        if not (0 <= idx < len(self.view_students)):
+            return
+        if self.virtual:
+            self._vselected = self.view_students[idx].student_id
+            visible = self._visible_rows()
+            top = self._vtop
+            if idx < top:
+                top = idx
+            elif idx >= top + visible:
+                top = idx - visible + 1
+            self._scroll_to(top, force=True)
+        else:
+            children = self.tree.get_children()
+            if idx < len(children):
+                self.tree.selection_set(children[idx])
+                self.tree.see(children[idx])
+
+    def _reveal(self, student_id: str):
+        """Select and scroll to a student in the current view (no-op if not shown)."""
+        for idx, s in enumerate(self.view_students):
+            if s.student_id == student_id:
+                self._reveal_index(idx)
+                return
+
     def _get_selected_id(self):
         """
         Get student_id from currently selected table row.
@@ -287,15 +611,20 @@ class StudentApp(ttk.Frame):
         """
         sel = self.tree.selection()
         if not sel:
-            return None
+            # virtual mode keeps the selection even when its row is scrolled out of the window
+            return self._vselected if self.virtual else None
         vals = self.tree.item(sel[0])["values"]
         return str(vals[1])  # student_id is second column
 
     # ---------- CRUD UI ----------
     def add_student_popup(self):
+        if self._io_busy():
+            return
         self._edit_popup(mode="add")
 
     def edit_selected(self):
+        if self._io_busy():
+            return
         sid = self._get_selected_id()
         if not sid:
             messagebox.showinfo("Edit", "Select a student first.")
@@ -316,7 +645,8 @@ class StudentApp(ttk.Frame):
         popup.grab_set()
         popup.title("Edit Student" if is_edit else "Add Student")
         popup.resizable(False, False)
-        popup.geometry("480x420")
+        rows, cols = self._score_grid()
+        popup.geometry(f"{480 + 170 * (cols - 1)}x{420 + 34 * max(0, rows - 4)}")
 
         frm = ttk.Frame(popup, padding=12)
         frm.pack(fill="both", expand=True)
@@ -354,10 +684,11 @@ class StudentApp(ttk.Frame):
 
         subj_vars = {}
         for i, subj in enumerate(self.subjects):
-            ttk.Label(scores_frame, text=f"{subj}:", font=lbl_font).grid(row=i, column=0, sticky="e", padx=6, pady=4)
+            r, c = i % rows, 2 * (i // rows)
+            ttk.Label(scores_frame, text=f"{subj}:", font=lbl_font).grid(row=r, column=c, sticky="e", padx=6, pady=4)
             v = tk.StringVar()
             ent = ttk.Entry(scores_frame, textvariable=v, width=12)
-            ent.grid(row=i, column=1, sticky="w", padx=6, pady=4)
+            ent.grid(row=r, column=c + 1, sticky="w", padx=6, pady=4)
             subj_vars[subj] = v
 
         # Fill values when editing
@@ -420,38 +751,39 @@ class StudentApp(ttk.Frame):
             mj = major_var.get().strip()
 
             try:
+                # one popup save = one undo step
+                with self.sm.history.transaction(f"{mode} {sid}"):
+                    if is_edit:
+                        ok = self.sm.update_student(sid, name, birth_i, mj)
+                        if not ok:
+                            messagebox.showerror("Error", "Student not found.", parent=popup)
+                            return
+                        # update scores
+                        for subj, val in scores.items():
+                            self.sm.add_score(sid, subj, val)
+                    else:
+                        # check the id before the Student takes a row of the shared matrix:
+                        # a rejected add would leave that row dead
+                        if self.sm.find_by_id(sid) is not None:
+                            raise ValueError(f"Student with ID '{sid}' already exists")
+                        new = Student(sid, name, birth_i, mj, matrix=self.sm.scores)
+                        self.sm.add_student(new)
+                        for subj, val in scores.items():
+                            self.sm.add_score(sid, subj, val)
+                # Patch only the affected row (edited Student objects are updated in place)
+                saved = self.sm.find_by_id(sid)
                 if is_edit:
-                    ok = self.sm.update_student(sid, name, birth_i, mj)
-                    if not ok:
-                        messagebox.showerror("Error", "Student not found.", parent=popup)
-                        return
-                    # update scores
-                    for subj, val in scores.items():
-                        self.sm.add_score(sid, subj, val)
+                    if self.is_filtered:
+                        # edited row may no longer match: next filter must rescan everything
+                        self._active_criteria = None
+                    self._patch_student(saved)
                 else:
-                    new = Student(sid, name, birth_i, mj)
-                    self.sm.add_student(new)
-                    for subj, val in scores.items():
-                        self.sm.add_score(sid, subj, val)
-                # If we're showing a filtered view, ensure view is consistent:
-                if not self.is_filtered:
-                    self.view_students = list(self.sm.students)
-                else:
-                    # For edit: update item in current filtered view; for add: append if it matches filter is left to user
-                    if is_edit:
-                        for idx, s in enumerate(self.view_students):
-                            if s.student_id == sid:
-                                self.view_students[idx] = self.sm.find_by_id(sid)
-                                break
-                self.refresh_table()
+                    # adding is only enabled in the unfiltered view, which mirrors sm.students
+                    self.view_students.append(saved)
+                    self._append_student(saved)
 
                 # select and focus the saved student
-                for iid in self.tree.get_children():
-                    vals = self.tree.item(iid)["values"]
-                    if len(vals) > 1 and str(vals[1]) == sid:
-                        self.tree.selection_set(iid)
-                        self.tree.see(iid)
-                        break
+                self._reveal(sid)
 
                 popup.destroy()
             except ValueError as e:
@@ -474,6 +806,8 @@ class StudentApp(ttk.Frame):
             id_entry.focus_set()
 
     def delete_selected(self):
+        if self._io_busy():
+            return
         sid = self._get_selected_id()
         if not sid:
             messagebox.showinfo("Delete", "Select a student first.")
@@ -482,16 +816,59 @@ class StudentApp(ttk.Frame):
             return
         deleted = self.sm.delete_student(sid)
         if deleted:
-            # remove from current view as well if present (handles filtered view)
-            self.view_students = [s for s in self.view_students if s.student_id != sid]
-            # if not filtered, ensure view shows canonical list
+            # remove every row with that id (a loaded file may repeat it) from the view and the table
+            for s in deleted:
+                self._remove_student(s)
+        else:
+            messagebox.showinfo("Delete", "Student not found.")
+
+    # ---------- Undo / Redo ----------
+    def undo(self, event=None):
+        """Revert the last add/edit/delete (Ctrl+Z)."""
+        self._replay_history(event, self.sm.undo)
+
+    def redo(self, event=None):
+        """Re-apply the last undone step (Ctrl+Y)."""
+        self._replay_history(event, self.sm.redo)
+
+    def _replay_history(self, event, step):
+        # shortcuts are bound app-wide: ignore them while a popup (e.g. the edit form) has focus
+        # or a text field (e.g. the search box) does, so Ctrl+Z there stays a text edit
+        if event is not None:
+            widget = event.widget
+            # Tk-internal widgets can report a plain path string instead of a widget object
+            if not isinstance(widget, tk.Misc) or isinstance(widget, TEXT_INPUTS):
+                return
+            if widget.winfo_toplevel() is not self.root:
+                return
+        if self._io_busy():
+            return
+        changes = step()
+        if not changes:
+            return
+        if all(kind == "restore" for kind, _ in changes):
+            # field edits only: patch the affected rows in place
+            if self.is_filtered:
+                self._active_criteria = None
+            for _, s in changes:
+                self._patch_student(s)
+        else:
             if not self.is_filtered:
                 self.view_students = list(self.sm.students)
+            else:
+                for kind, s in changes:
+                    if kind == "remove":
+                        self.view_students = [v for v in self.view_students if v is not s]
+                    elif kind == "insert" and (self._active_criteria is None
+                                               or student_matches(s, self._active_criteria)):
+                        self.view_students.append(s)
             self.refresh_table()
-        else:
-            messagebox.showinfo("Delete", "Student not found.")
+        kind, s = changes[-1]
+        if kind != "remove":
+            self._reveal(s.student_id)
 
     # ---------- Search / Load / Save ----------
+    @perf.timed()
     def search_student(self):
         """
         Search for students by ID or complete name tokens (case-insensitive).
@@ -504,33 +881,32 @@ class StudentApp(ttk.Frame):
         key = self.search_var.get().strip()
         if not key:
             self.tree.selection_remove(*self.tree.selection())
+            self._vselected = None
             self.search_matches = []
             self.search_index = -1
             self.prev_btn.configure(state="disabled")
             self.next_btn.configure(state="disabled")
             return
 
-        # Find all matching rows
+        # Find all matching students in the current view (works for virtual mode too)
         key_l = key.lower()
         matches = []
-        for iid in self.tree.get_children():
-            vals = self.tree.item(iid)["values"]
-
+        for s in self.view_students:
             # Always match exact student ID
-            if str(vals[1]).lower() == key_l:
-                matches.append(iid)
+            if s.student_id.lower() == key_l:
+                matches.append(s.student_id)
                 continue
 
             # For names, split into tokens and match complete words only
-            name = str(vals[2])
-            name_tokens = [token.lower() for token in name.split()]
+            name_tokens = [token.lower() for token in (s.name or "").split()]
 
             # Check if search key matches any complete name token
             if key_l in name_tokens:
-                matches.append(iid)
+                matches.append(s.student_id)
 
         if not matches:
             self.tree.selection_remove(*self.tree.selection())
+            self._vselected = None
             self.search_matches = []
             self.search_index = -1
             self.prev_btn.configure(state="disabled")
@@ -541,9 +917,7 @@ class StudentApp(ttk.Frame):
         # Select first match and enable navigation if multiple matches
         self.search_matches = matches
         self.search_index = 0
-        iid = self.search_matches[self.search_index]
-        self.tree.selection_set(iid)
-        self.tree.see(iid)
+        self._reveal(self.search_matches[self.search_index])
 
         if len(self.search_matches) > 1:
             self.prev_btn.configure(state="normal")
@@ -556,35 +930,245 @@ class StudentApp(ttk.Frame):
         if not self.search_matches:
             return
         self.search_index = (self.search_index + 1) % len(self.search_matches)
-        iid = self.search_matches[self.search_index]
-        self.tree.selection_set(iid)
-        self.tree.see(iid)
+        self._reveal(self.search_matches[self.search_index])
 
     def prev_match(self):
         if not self.search_matches:
             return
         self.search_index = (self.search_index - 1) % len(self.search_matches)
-        iid = self.search_matches[self.search_index]
-        self.tree.selection_set(iid)
-        self.tree.see(iid)
+        self._reveal(self.search_matches[self.search_index])
+
+    # ---------- Background file I/O ----------
+    def _io_busy(self) -> bool:
+        """Return True (and tell the user) while a background load/save is running."""
+        if self._io_task is None:
+            return False
+        messagebox.showinfo("Busy", "Please wait for the current file operation to finish (or cancel it).")
+        return True
+
+    def _start_io(self, label: str, fn, args: tuple, on_done, on_error=None):
+        """
+        Run fn(*args, progress=...) in a worker thread while the UI stays responsive.
+
+        Progress and the final result come back through a queue polled with after();
+        on_done(result) / on_error(exc) then run on the Tk main thread.
+        """
+        self._io_task = BackgroundTask(fn, *args).start()
+        self._io_callbacks = (label, on_done, on_error)
+        self.io_var.set(f"{label}...")
+        self.io_progress.configure(mode="indeterminate", value=0)
+        self.io_progress.start(15)
+        self.io_frame.pack(side="left", padx=6)
+        self.after(50, self._poll_io)
+
+    def _poll_io(self):
+        task = self._io_task
+        if task is None:
+            return
+        label, on_done, on_error = self._io_callbacks
+        for msg in task.poll():
+            kind = msg[0]
+            if kind == "progress":
+                done, total = msg[1], msg[2]
+                if total:
+                    if str(self.io_progress.cget("mode")) != "determinate":
+                        self.io_progress.stop()
+                        self.io_progress.configure(mode="determinate")
+                    self.io_progress.configure(value=100.0 * done / total)
+                    self.io_var.set(f"{label}... {done}/{total}")
+                continue
+            # terminal message: tear down progress UI before running callbacks
+            self._io_task = None
+            self.io_progress.stop()
+            self.io_frame.pack_forget()
+            if kind == "done":
+                on_done(msg[1])
+            elif kind == "error":
+                if on_error is not None:
+                    on_error(msg[1])
+                else:
+                    messagebox.showerror(label, f"{label} failed:\n{msg[1]}")
+            else:
+                self.status_var.set(f"{label} cancelled.")
+            return
+        self.after(50, self._poll_io)
+
+    def _cancel_io(self):
+        if self._io_task is not None:
+            self._io_task.cancel()
+
+    # ---------- Watching the roster file for external edits ----------
+    def _watch(self, path: str):
+        """Watch path for external edits; its rows are hashed as the baseline in the background."""
+        # the watcher reads CSV/Excel rows; columnar files are only rewritten by us
+        watchable = path and not path.lower().endswith(columnar.SUFFIX)
+        self.watcher = FileWatcher(path) if watchable else None
+        self._watch_task = None
+        if self.watcher is not None:
+            self._run_watch(self.watcher.snapshot, self.watcher.commit)
+
+    def _run_watch(self, fn, on_done):
+        """Run a watcher method in a worker thread; on_done(result) runs on the Tk thread."""
+        watcher = self.watcher
+        task = BackgroundTask(fn).start()
+        self._watch_task = task
+
+        def poll():
+            if self._watch_task is not task:
+                return  # superseded: another file was loaded or saved meanwhile
+            for msg in task.poll():
+                if msg[0] == "progress":
+                    continue
+                self._watch_task = None
+                if msg[0] == "done" and self.watcher is watcher:
+                    on_done(msg[1])
+                elif msg[0] == "error":
+                    print(f"Error reading {watcher.path}: {msg[1]}")
+                return
+            self.after(50, poll)
+
+        self.after(50, poll)
+
+    def _watch_tick(self):
+        """Timer: read the file's changes once its (mtime, size) signature moved."""
+        self.after(self.WATCH_INTERVAL_MS, self._watch_tick)
+        watcher = self.watcher
+        # never race our own load/save: they re-baseline the watcher when done
+        if watcher is None or self._watch_task is not None or self._io_task is not None:
+            return
+        if watcher.changed():
+            self._run_watch(watcher.read_changes, lambda delta: self._apply_file_delta(watcher, delta))
+
+    def _apply_file_delta(self, watcher: FileWatcher, delta):
+        """Merge rows changed on disk into the roster, keeping filter, sort and selection."""
+        if delta and self.sm.unsaved_changes and not messagebox.askyesno(
+                "File Changed",
+                f"{os.path.basename(watcher.path)} was changed by another program.\n"
+                "Apply those changes? Your unsaved edits to the same students will be replaced."):
+            watcher.commit(delta)  # keep our version; do not ask again for this one
+            return
+        if self.watcher is not watcher:
+            return
+        watcher.commit(delta)
+        if not delta:
+            return
+
+        selected = self._get_selected_id()
+        if delta.reload:
+            # subject columns changed: rebuild the roster, then re-apply filter and sort
+            unsaved = self.sm.unsaved_changes
+            self.sm.set_students(delta.upserts, watcher.path)
+            self.sm.unsaved_changes = unsaved
+            changes = {"added": self.sm.students, "updated": [], "removed": []}
+        else:
+            changes = self.sm.apply_delta(delta.upserts, delta.deleted)
+        counts = tuple(len(changes[k]) for k in ("added", "updated", "removed"))
+
+        if delta.reload or not self._patch_view(changes):
+            self._resync_view(reload=delta.reload)
+            self.refresh_table()
+            if selected is not None:
+                self._reveal(selected)
+        self.status_var.set(f"Reloaded from disk: +{counts[0]} ~{counts[1]} -{counts[2]}")
+
+    def _patch_view(self, changes: dict) -> bool:
+        """
+        Patch a few changed rows in place (table rows, filter membership).
+        Returns False without touching the view when a full resync is needed instead:
+        large deltas, an active sort, or an edited student that now enters a filtered view.
+        """
+        total = sum(len(v) for v in changes.values())
+        if total > self.WATCH_PATCH_LIMIT or any(self._sort_state.values()):
+            return False
+        crit = self._active_criteria if self.is_filtered else None
+        shown = {id(s) for s in self.view_students}
+        if crit is not None and any(id(s) not in shown and student_matches(s, crit)
+                                    for s in changes["updated"]):
+            return False
+
+        for s in changes["removed"]:
+            self._remove_student(s)
+        for s in changes["updated"]:
+            if id(s) not in shown:
+                continue
+            if crit is not None and not student_matches(s, crit):
+                self._remove_student(s)
+            else:
+                self._patch_student(s)
+        for s in changes["added"]:
+            # filtered views with unknown criteria (after a merge) only keep their members
+            if not self.is_filtered or (crit is not None and student_matches(s, crit)):
+                self.view_students.append(s)
+                self._append_student(s)
+        return True
+
+    def _resync_view(self, reload: bool = False):
+        """Rebuild view_students from the roster under the active filter and sort."""
+        col = next((c for c, state in self._sort_state.items() if state), None)
+        if reload:
+            # ordinals were reassigned: old "original order" snapshots are meaningless
+            self._canon_snapshot = None
+            self._view_snapshots.clear()
+            if self.is_filtered and self._active_criteria is None:
+                self.is_filtered = False
+                try:
+                    self.add_btn.configure(state="normal")
+                except Exception:
+                    pass
+
+        if self.is_filtered:
+            crit = self._active_criteria
+            alive = {id(s) for s in self.sm.students}
+            view = [s for s in self.view_students
+                    if id(s) in alive and (crit is None or student_matches(s, crit))]
+            if crit is not None:
+                shown = {id(s) for s in view}
+                view.extend(s for s in self.sm.students if id(s) not in shown and student_matches(s, crit))
+            self.view_students = view
+
+        if col is not None:
+            target = self.view_students if self.is_filtered else self.sm.students
+            if reload:
+                # file order becomes the "original" order restored by the third heading click
+                if self.is_filtered:
+                    self._view_snapshots[col] = order_snapshot(target)
+                else:
+                    self._canon_snapshot = order_snapshot(target)
+            sort_students(target, key=SORT_KEYS[col], reverse=self._sort_state[col] == "desc")
+        if not self.is_filtered:
+            self.view_students = list(self.sm.students)
 
     def load_file(self):
+        if self._io_busy():
+            return
         p = filedialog.askopenfilename(
             title="Select Student File",
             initialdir=os.getcwd(),
             filetypes=[
                 ("CSV files", "*.csv"),
                 ("Excel files", "*.xlsx *.xlsm"),
+                ("Columnar binary", f"*{columnar.SUFFIX}"),
                 ("All files", "*.*")
             ]
         )
         if not p:
             return
+
+        def on_error(e):
+            messagebox.showerror("Load Error", f"Failed to load file:\n{e}")
+
+        # parse in a worker thread; the roster is swapped in on the main thread
+        self._start_io("Loading", file_io.load_students, (p,),
+                       on_done=lambda loaded: self._finish_load(p, loaded), on_error=on_error)
+
+    def _finish_load(self, path: str, loaded: list):
+        """Install students parsed by the background loader and reset view state."""
         try:
-            loaded_count = self.sm.load_from_file(p)
+            loaded_count = self.sm.set_students(loaded or [], path)
             # refresh view to new data and reset filters
             self.view_students = list(self.sm.students)
             self.is_filtered = False
+            self._active_criteria = None
             # reset any stored sort snapshots / states when loading new data
             self._sort_state = {c: None for c in ("no", "id", "name", "birth", "major", "gpa")}
             self._canon_snapshot = None
@@ -595,6 +1179,7 @@ class StudentApp(ttk.Frame):
             except Exception:
                 pass
             self.refresh_table()
+            self._watch(self.sm.filepath)
             if loaded_count:
                 messagebox.showinfo("Load", f"Loaded {loaded_count} students from file.")
             else:
@@ -602,58 +1187,343 @@ class StudentApp(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Load Error", f"Failed to load file:\n{e}")
 
-    def save(self, event=None):
-        """Save to current manager filepath (students.csv by default)."""
-        ok = self.sm.save()
-        if ok:
-            messagebox.showinfo("Save", "Saved successfully.")
+    def merge_files_popup(self):
+        """
+        Merge several CSV/XLSX shards into the current roster.
+
+        Files are parsed in parallel worker processes (background task); the hash join
+        against the roster then runs on the main thread via SystemManager.merge_students.
+        """
+        if self._io_busy():
+            return
+        paths = filedialog.askopenfilenames(
+            title="Select Files to Merge",
+            initialdir=os.getcwd(),
+            filetypes=[
+                ("Student files", f"*.csv *.xlsx *.xlsm *{columnar.SUFFIX}"),
+                ("All files", "*.*")
+            ]
+        )
+        if not paths:
+            return
+
+        popup = tk.Toplevel(self.root)
+        popup.transient(self.root)
+        popup.grab_set()
+        popup.title("Merge Files")
+        popup.resizable(False, False)
+        frm = ttk.Frame(popup, padding=12)
+        frm.pack(fill="both", expand=True)
+        ttk.Label(frm, text=f"{len(paths)} file(s) selected.").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 8))
+        ttk.Label(frm, text="On duplicate ID:").grid(row=1, column=0, sticky="e", padx=6)
+        policy_var = tk.StringVar(value=MERGE_POLICIES[0])
+        ttk.Combobox(frm, textvariable=policy_var, values=MERGE_POLICIES, state="readonly", width=16).grid(
+            row=1, column=1, sticky="w", padx=6)
+
+        def do_merge(event=None):
+            policy = policy_var.get()
+            popup.destroy()
+            ordered = self.sm.merge_order(paths, policy)
+            workers = min(len(ordered), os.cpu_count() or 1)
+            self._start_io("Merging", file_io.load_shards, (ordered, workers),
+                           on_done=lambda shards: self._finish_merge(shards, policy))
+
+        btns = ttk.Frame(frm)
+        btns.grid(row=2, column=0, columnspan=2, sticky="e", pady=(12, 0))
+        ttk.Button(btns, text="Merge", command=do_merge, style="Accent.TButton").pack(side="right", padx=6)
+        ttk.Button(btns, text="Cancel", command=popup.destroy).pack(side="right", padx=6)
+        popup.bind("<Return>", do_merge)
+        popup.bind("<Escape>", lambda e: popup.destroy())
+
+    def _finish_merge(self, shards: list, policy: str):
+        """Join parsed shards into the roster, refresh the view and show the merge report."""
+        report = self.sm.merge_students(shards, policy)
+        if not self.is_filtered:
+            self.view_students = list(self.sm.students)
         else:
-            messagebox.showerror("Save", "Save failed. Check console for details.")
-        self._update_status()
+            # updated students changed in place and may no longer match the filter
+            self._active_criteria = None
+        self.refresh_table()
+        lines = [
+            f"Rows read: {report['rows']}",
+            f"Added: {report['added']}",
+            f"Updated: {report['updated']}",
+            f"Unchanged: {report['unchanged']}",
+            f"Conflicts: {len(report['conflicts'])}",
+        ]
+        for c in report["conflicts"][:10]:
+            lines.append(f"  {c['student_id']}: kept {os.path.basename(c['kept'])} "
+                         f"({', '.join(c['fields'])})")
+        if len(report["conflicts"]) > 10:
+            lines.append(f"  ... and {len(report['conflicts']) - 10} more")
+        messagebox.showinfo("Merge", "\n".join(lines))
+
+    def validate_roster(self):
+        """
+        Check the roster for duplicate ids, out-of-range scores / birth years and GPA
+        mismatches in the background, then show the report.
+
+        The file on disk is checked as written (before the loader normalizes it); with
+        unsaved edits the roster in memory is checked instead.
+        """
+        if self._io_busy():
+            return
+        path = self.sm.filepath
+        if self.sm.unsaved_changes or not path or not os.path.exists(path):
+            fn, args = roster_validator.validate_students, (list(self.sm.students), self.subjects)
+        else:
+            fn, args = roster_validator.validate_file, (path,)
+
+        def on_error(e):
+            messagebox.showerror("Validate", f"Validation failed:\n{e}")
+
+        self._start_io("Validating", fn, args, on_done=self._show_validation, on_error=on_error)
+
+    def _show_validation(self, report):
+        """Popup listing a ValidationReport; double-click a problem to select that student."""
+        popup = tk.Toplevel(self.root)
+        popup.transient(self.root)
+        popup.title("Validation Report")
+        popup.geometry("760x460")
+
+        frm = ttk.Frame(popup, padding=12)
+        frm.pack(fill="both", expand=True)
+        ttk.Label(frm, text="\n".join(report.summary_lines()), justify="left").pack(anchor="w", pady=(0, 8))
+
+        cols = ("problem", "row", "id", "details")
+        tree = ttk.Treeview(frm, columns=cols, show="headings", height=12)
+        for col, text, width in (("problem", "Problem", 120), ("row", "Row", 70),
+                                 ("id", "Student ID", 120), ("details", "Details", 400)):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor="w", stretch=(col == "details"))
+        vsb = ttk.Scrollbar(frm, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=vsb.set)
+        vsb.pack(side="right", fill="y")
+        tree.pack(fill="both", expand=True)
+        for code, details in report.issues.items():
+            for d in details:
+                extra = ", ".join(f"{k}={v}" for k, v in d.items() if k not in ("row", "student_id"))
+                tree.insert("", "end", values=(code, d["row"], d["student_id"], extra))
+
+        def reveal(event=None):
+            sel = tree.selection()
+            if sel:
+                sid = str(tree.item(sel[0])["values"][2])
+                if sid:
+                    self._reveal(sid)
+
+        def do_dump():
+            path = filedialog.asksaveasfilename(
+                parent=popup,
+                title="Save Report",
+                defaultextension=".json",
+                initialfile="validation.json",
+                filetypes=[("JSON", "*.json")]
+            )
+            if path and report.dump(path):
+                messagebox.showinfo("Validate", f"Saved report to {path}", parent=popup)
+
+        tree.bind("<Double-1>", reveal)
+        btns = ttk.Frame(frm)
+        btns.pack(fill="x", pady=(8, 0))
+        if any(len(v) < n for v, n in zip(report.issues.values(), report.counts.values())):
+            ttk.Label(btns, text=f"(first {report.limit} rows per problem shown)").pack(side="left")
+        ttk.Button(btns, text="Close", command=popup.destroy).pack(side="right", padx=6)
+        ttk.Button(btns, text="Save JSON...", command=do_dump).pack(side="right", padx=6)
+        popup.bind("<Escape>", lambda e: popup.destroy())
+
+    def save(self, event=None):
+        """Save to current manager filepath (students.csv by default) in the background."""
+        if self._io_busy():
+            return
+
+        def on_done(ok):
+            if ok:
+                self.sm.unsaved_changes = False
+                # our own write: take it as the new baseline instead of reloading it
+                self._watch(self.sm.filepath)
+                messagebox.showinfo("Save", "Saved successfully.")
+            else:
+                messagebox.showerror("Save", "Save failed. Check console for details.")
+            self._update_status()
+
+        # snapshot the list so sorting while saving cannot disturb the writer
+        students = list(self.sm.students)
+        # the roster schema, not the students' (an empty roster would fall back to the default subjects);
+        # the writer follows the file suffix, the same dispatch as SystemManager.save on exit
+        self._start_io("Saving", partial(exporters.save_roster, subjects=self.sm.scores.subjects),
+                       (self.sm.filepath, students), on_done=on_done)
 
     def save_as(self):
         """
-        Save As dialog — export to .csv or .xlsx.
-        - For .csv uses utils.file_io.save_students (CSV 9-column).
-        - For .xlsx uses openpyxl if available.
-        On success updates SystemManager.filepath so future Save goes to this file.
+        Save As dialog — export to any format of utils.exporters (written by a background worker).
+        - CSV, Excel (needs openpyxl) and columnar binary can be loaded again: on success
+          SystemManager.filepath is updated so future Save goes to this file.
+        - JSON Lines and compressed CSV are exports only: the current file stays as it is.
         """
+        if self._io_busy():
+            return
         f = filedialog.asksaveasfilename(
             title="Save As",
             initialdir=os.getcwd(),
             defaultextension=".csv",
-            filetypes=[
-                ("CSV file", "*.csv"),
-                ("Excel workbook", "*.xlsx"),
-                ("All files", "*.*"),
-            ],
+            filetypes=exporters.filetypes() + [("All files", "*.*")],
         )
         if not f:
             return
 
-        try:
-            if f.lower().endswith(".xlsx"):
-                # export to xlsx
-                try:
-                    file_io.export_xlsx(f, self.sm.students)
-                except ImportError:
-                    messagebox.showerror("Save As", "openpyxl is required to export .xlsx.\nInstall with: pip install openpyxl")
-                    return
-            else:
-                # default CSV
-                ok = file_io.save_students(f, self.sm.students)
-                if not ok:
-                    messagebox.showerror("Save As", "Failed to save CSV. See console for details.")
-                    return
+        exporter = exporters.exporter_for(f) or exporters.EXPORTERS["csv"]
 
+        def on_done(rows):
+            if not exporter.loadable:
+                messagebox.showinfo("Save As", f"Exported {rows} students.")
+                return
             # update manager filepath so Save uses this file by default
             self.sm.filepath = f
             self.sm.filename = os.path.basename(f)
             self.sm.unsaved_changes = False
+            self._watch(f)
             self._update_status()
             messagebox.showinfo("Save As", "Export completed.")
-        except Exception as e:
-            messagebox.showerror("Save As Error", f"Failed to export file:\n{e}")
+
+        def on_error(e):
+            if isinstance(e, ImportError):
+                messagebox.showerror("Save As", "openpyxl is required to export .xlsx.\nInstall with: pip install openpyxl")
+            else:
+                messagebox.showerror("Save As Error", f"Failed to export file:\n{e}")
+
+        self._start_io("Saving", partial(exporters.export_students, subjects=self.sm.scores.subjects),
+                       (f, list(self.sm.students), exporter.name), on_done=on_done, on_error=on_error)
+
+    # ---------- Statistics ----------
+    def open_stats_popup(self):
+        """
+        Show roster statistics for the whole roster or a single major:
+        count, mean/median/stddev GPA, per-subject means, score histograms and birth years.
+        """
+        popup = tk.Toplevel(self.root)
+        popup.transient(self.root)
+        popup.title("Roster Statistics")
+        popup.geometry("560x520")
+
+        frm = ttk.Frame(popup, padding=12)
+        frm.pack(fill="both", expand=True)
+
+        top = ttk.Frame(frm)
+        top.pack(fill="x", pady=(0, 8))
+        ttk.Label(top, text="Group:").pack(side="left", padx=(0, 6))
+        all_label = "All students"
+        group_var = tk.StringVar(value=all_label)
+        groups = [all_label] + self.sm.stats.major_names()
+        combo = ttk.Combobox(top, textvariable=group_var, values=groups, state="readonly", width=36)
+        combo.pack(side="left")
+
+        text = tk.Text(frm, font=("Consolas", 10), wrap="none")
+        text.pack(fill="both", expand=True)
+
+        def render(event=None):
+            g = group_var.get()
+            st = self.sm.stats.summary(None if g == all_label else g)
+            lines = [
+                f"Students: {st['count']}",
+                f"GPA  mean {st['mean']:.2f}   median {st['median']:.2f}   std {st['std']:.2f}",
+                "",
+                "Subject means:",
+            ]
+            for subj, mean in st["subject_means"].items():
+                lines.append(f"  {subj:<8} {mean:5.2f}")
+            lines.append("")
+            lines.append("Score histograms (bins 0-1 ... 9-10):")
+            for subj, hist in st["histograms"].items():
+                lines.append(f"  {subj:<8} " + " ".join(f"{c:>4}" for c in hist))
+            lines.append("")
+            lines.append("Birth years:")
+            peak = max(st["birth_years"].values(), default=0)
+            for year, cnt in st["birth_years"].items():
+                bar = "#" * max(1, round(30 * cnt / peak)) if peak else ""
+                lines.append(f"  {year:<6} {cnt:>5} {bar}")
+            text.configure(state="normal")
+            text.delete("1.0", "end")
+            text.insert("1.0", "\n".join(lines))
+            text.configure(state="disabled")
+
+        combo.bind("<<ComboboxSelected>>", render)
+        render()
+        popup.bind("<Escape>", lambda e: popup.destroy())
+
+    # ---------- Instrumentation ----------
+    def toggle_perf(self, event=None):
+        """Turn hot-path instrumentation (utils.perf) and its status-bar panel on/off (F12)."""
+        if perf.is_enabled():
+            perf.enable(False)
+            self.perf_frame.pack_forget()
+        else:
+            perf.enable()
+            self.perf_frame.pack(side="left", padx=6)
+            self._poll_perf()
+
+    def _poll_perf(self):
+        """Refresh the debug panel text twice a second while instrumentation is on."""
+        if not perf.is_enabled():
+            return
+        timers = perf.snapshot()["timers"]
+        parts = [f"{label} {timers[name]['last_ms']:.1f} ms"
+                 for name, label in self.PERF_PANEL_TIMERS if name in timers]
+        self.perf_var.set(" | ".join(parts) or "timing on")
+        self.after(500, self._poll_perf)
+
+    def open_perf_popup(self):
+        """Show all recorded timers and counters, with Reset and JSON dump actions."""
+        popup = tk.Toplevel(self.root)
+        popup.transient(self.root)
+        popup.title("Performance")
+        popup.geometry("640x420")
+
+        frm = ttk.Frame(popup, padding=12)
+        frm.pack(fill="both", expand=True)
+        text = tk.Text(frm, wrap="none", font=("Consolas", 10), height=18)
+        text.pack(fill="both", expand=True)
+
+        def render():
+            snap = perf.snapshot()
+            lines = [f"{'timer':<24}{'count':>7}{'last ms':>11}{'mean ms':>11}{'max ms':>11}{'total ms':>12}"]
+            for name, t in snap["timers"].items():
+                lines.append(f"{name:<24}{t['count']:>7}{t['last_ms']:>11.2f}{t['mean_ms']:>11.2f}"
+                             f"{t['max_ms']:>11.2f}{t['total_ms']:>12.2f}")
+            lines.append("")
+            lines.append(f"{'counter':<32}{'value':>12}")
+            for name, v in snap["counters"].items():
+                lines.append(f"{name:<32}{v:>12}")
+            if not snap["enabled"]:
+                lines.append("\n(instrumentation is off: press F12 to start recording)")
+            text.configure(state="normal")
+            text.delete("1.0", "end")
+            text.insert("end", "\n".join(lines))
+            text.configure(state="disabled")
+
+        def do_reset():
+            perf.reset()
+            render()
+
+        def do_dump():
+            path = filedialog.asksaveasfilename(
+                parent=popup,
+                title="Save Timings",
+                defaultextension=".json",
+                initialfile="perf.json",
+                filetypes=[("JSON", "*.json")]
+            )
+            if path and perf.dump(path):
+                messagebox.showinfo("Performance", f"Saved timings to {path}", parent=popup)
+
+        btns = ttk.Frame(frm)
+        btns.pack(fill="x", pady=(8, 0))
+        ttk.Button(btns, text="Close", command=popup.destroy).pack(side="right", padx=6)
+        ttk.Button(btns, text="Dump JSON...", command=do_dump).pack(side="right", padx=6)
+        ttk.Button(btns, text="Reset", command=do_reset).pack(side="right", padx=6)
+        ttk.Button(btns, text="Refresh", command=render).pack(side="right", padx=6)
+        popup.bind("<Escape>", lambda e: popup.destroy())
+        render()
 
     # ---------- exit handling ----------
     def _on_close(self):
@@ -661,6 +1531,8 @@ class StudentApp(ttk.Frame):
         Handle window close event.
         Prompts to save if there are unsaved changes.
         """
+        if self._io_busy():
+            return
         if self.sm.unsaved_changes:
             res = messagebox.askyesnocancel("Exit", "Save changes before exit?")
             if res is None:  # Cancel
@@ -687,7 +1559,8 @@ class StudentApp(ttk.Frame):
         popup.transient(self.root)
         popup.grab_set()
         popup.title("Filter Students")
-        popup.geometry("650x500")
+        rows, cols = self._score_grid()
+        popup.geometry(f"{650 + 220 * max(0, cols - 2)}x{500 + 34 * max(0, rows - 4)}")
         popup.resizable(False, False)
 
         main_frame = ttk.Frame(popup, padding=16)
@@ -725,11 +1598,13 @@ class StudentApp(ttk.Frame):
         ttk.Label(scores_frame, text="Enter single value (e.g., 8.5) or range (e.g., 7-9)", 
                   font=("Segoe UI", 9, "italic")).pack(anchor="w", padx=8, pady=(0, 8))
 
+        subj_grid = ttk.Frame(scores_frame)
+        subj_grid.pack(fill="x")
         subj_vars = {}
         for i, subj in enumerate(self.subjects):
-            subj_frame = ttk.Frame(scores_frame)
-            subj_frame.pack(fill="x", padx=4, pady=2)
-            
+            subj_frame = ttk.Frame(subj_grid)
+            subj_frame.grid(row=i % rows, column=i // rows, sticky="w", padx=4, pady=2)
+
             ttk.Label(subj_frame, text=f"{subj}:", font=label_font, width=10).pack(side="left", padx=(8, 4))
             v = tk.StringVar()
             ttk.Entry(subj_frame, textvariable=v, width=15).pack(side="left", padx=4)
@@ -751,29 +1626,14 @@ class StudentApp(ttk.Frame):
 
 
         def do_apply(event=None):
-            # Build criteria dict
-            criteria = {}
-            fn = first_var.get().strip()
-            if fn:
-                criteria["first_name"] = fn.lower()
-            by = self.parse_year_range(birth_var.get())
-            if by:
-                criteria["birth_year"] = by
-            mj = major_var.get().strip()
-            if mj:
-                criteria["major"] = mj.lower()
-
-            subj_criteria = {}
-            for subj, var in subj_vars.items():
-                r = self.parse_numeric_range(var.get())
-                if r:
-                    subj_criteria[subj] = r
-            if subj_criteria:
-                criteria["subjects"] = subj_criteria
-
-            gpa_r = self.parse_numeric_range(gpa_var.get())
-            if gpa_r:
-                criteria["gpa"] = gpa_r
+            # Build criteria dict (same grammar as the CLI filter options)
+            criteria = build_criteria(
+                first_name=first_var.get(),
+                birth_year=birth_var.get(),
+                major=major_var.get(),
+                subjects={subj: var.get() for subj, var in subj_vars.items()},
+                gpa=gpa_var.get(),
+            )
 
             # Apply filter
             self.apply_filter(criteria)
@@ -794,9 +1654,12 @@ class StudentApp(ttk.Frame):
         y = self.root.winfo_y() + (self.root.winfo_height() - popup.winfo_height()) // 2
         popup.geometry(f"+{x}+{y}")
 
+    @perf.timed()
     def apply_filter(self, criteria: dict):
         """
         Filter self.sm.students according to criteria and set self.view_students.
+        When the new criteria narrow (or loosen) the active ones, only the current
+        view (or the students outside it) is re-evaluated instead of the full roster.
 
         criteria keys:
          - first_name: lowercase string that must match given name (last token)
@@ -807,50 +1670,29 @@ class StudentApp(ttk.Frame):
         All criteria combine with AND.
         """
         def matches(s: Student) -> bool:
-            # first name (exact token match of last token)
-            fn = criteria.get("first_name")
-            if fn:
-                parts = [p for p in (s.name or "").split() if p]
-                given = parts[-1].lower() if parts else ""
-                if given != fn:
-                    return False
-
-            # birth year
-            by = criteria.get("birth_year")
-            if by:
-                if not (by[0] <= (s.birth_year or 0) <= by[1]):
-                    return False
-
-            # major
-            mj = criteria.get("major")
-            if mj:
-                if mj not in (s.major or "").lower():
-                    return False
-
-            # subjects
-            subs = criteria.get("subjects", {})
-            for subj, (lo, hi) in subs.items():
-                val = float(s.get_score(subj))
-                if not (lo <= val <= hi):
-                    return False
-
-            # gpa
-            gpa_r = criteria.get("gpa")
-            if gpa_r:
-                g = float(s.gpa)
-                if not (gpa_r[0] <= g <= gpa_r[1]):
-                    return False
-
-            return True
+            return student_matches(s, criteria)
 
         # If no criteria provided, clear filter.
         if not criteria:
             self.clear_filter()
             return
 
-        filtered = [s for s in self.sm.students if matches(s)]
+        prev = self._active_criteria if self.is_filtered else None
+        if prev is not None and criteria_contains(prev, criteria):
+            # Narrowing: every match is already in the current view, so only rescan the view.
+            filtered = [s for s in self.view_students if matches(s)]
+            perf.count("apply_filter.rows_scanned", len(self.view_students))
+        elif prev is not None and criteria_contains(criteria, prev):
+            # Loosening: current view still matches, only evaluate students outside it.
+            kept = {id(s) for s in self.view_students}
+            filtered = [s for s in self.sm.students if id(s) in kept or matches(s)]
+            perf.count("apply_filter.rows_scanned", len(self.sm.students) - len(kept))
+        else:
+            filtered = [s for s in self.sm.students if matches(s)]
+            perf.count("apply_filter.rows_scanned", len(self.sm.students))
         self.view_students = filtered
         self.is_filtered = True
+        self._active_criteria = criteria
         # disable adding while filtered (user requested)
         try:
             self.add_btn.configure(state="disabled")
@@ -862,6 +1704,7 @@ class StudentApp(ttk.Frame):
         """Reset view to all students and refresh table."""
         self.view_students = list(self.sm.students)
         self.is_filtered = False
+        self._active_criteria = None
         try:
             self.add_btn.configure(state="normal")
         except Exception:
@@ -870,47 +1713,11 @@ class StudentApp(ttk.Frame):
 
     def parse_year_range(self, text: str):
         """Parse birth year input -> (min_year, max_year) or None."""
-        t = text.strip()
-        if not t:
-            return None
-        if "-" in t:
-            parts = t.split("-", 1)
-            try:
-                lo = int(parts[0].strip())
-                hi = int(parts[1].strip())
-                return (min(lo, hi), max(lo, hi))
-            except Exception:
-                return None
-        else:
-            try:
-                y = int(t)
-                return (y, y)
-            except Exception:
-                return None
+        return parse_year_range(text)
 
     def parse_numeric_range(self, text: str):
         """Parse single numeric or range 'min-max'."""
-        t = text.strip()
-        if not t:
-            return None
-        if "-" in t:
-            parts = t.split("-", 1)
-            try:
-                a = float(parts[0].strip())
-                b = float(parts[1].strip())
-                lo = min(a, b)
-                hi = max(a, b) + 0.99
-                return (lo, hi)
-            except Exception:
-                return None
-        else:
-            try:
-                v = float(t)
-                lo = math.floor(v)
-                hi = lo + 0.99
-                return (float(lo), float(hi))
-            except Exception:
-                return None
+        return parse_numeric_range(text)
 
 def main():
     root = tk.Tk()
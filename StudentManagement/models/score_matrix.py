@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: only as_numpy() needs it
+    np = None
+
+
+class ScoreMatrix:
+    """
+    Dense row-major float matrix of subject scores shared by every Student of a roster.
+
+    Responsibilities:
+    - own the subject schema (ordered subject names, read from the file header)
+    - store all scores in one flat array('d'): score of (row r, subject j) at r * width + j
+    - hand out rows to Students (add_row) and give NumPy a zero-copy (rows, width) view
+
+    Notes / invariants:
+    - Rows are append-only and never reused: a Student removed from the roster (and kept
+      by the undo log) still owns a valid row. SystemManager compacts by copying live
+      students into a fresh matrix (Student.move_to), leaving old rows to their owners.
+    - The schema is immutable; a roster that needs extra subjects moves to a wider matrix.
+      There is no "absent" cell: a subject a student never had is stored (and averaged) as 0.0,
+      and Student.move_to recomputes GPA whenever a student changes schema.
+    """
+
+    __slots__ = ("subjects", "index", "width", "data", "rows")
+
+    def __init__(self, subjects: Sequence[str]):
+        self.subjects: Tuple[str, ...] = tuple(str(s).strip() for s in subjects)
+        # subject name -> column position
+        self.index: Dict[str, int] = {s: j for j, s in enumerate(self.subjects)}
+        if len(self.index) != len(self.subjects):
+            raise ValueError("Duplicate subject names in schema")
+        self.width = len(self.subjects)
+        self.data = array("d")
+        self.rows = 0
+
+    def add_row(self, values: Optional[Iterable[float]] = None) -> int:
+        """Append a row (zeros, or exactly `width` values) and return its index."""
+        if values is None:
+            self.data.extend(array("d", bytes(8 * self.width)))
+        else:
+            start = len(self.data)
+            self.data.extend(values)
+            if len(self.data) - start != self.width:
+                del self.data[start:]
+                raise ValueError(f"Expected {self.width} scores")
+        self.rows += 1
+        return self.rows - 1
+
+    def get(self, row: int, col: int) -> float:
+        return self.data[row * self.width + col]
+
+    def set(self, row: int, col: int, value: float) -> None:
+        self.data[row * self.width + col] = value
+
+    def row(self, row: int) -> array:
+        """Return a copy of one row (array('d'), in schema order)."""
+        start = row * self.width
+        return self.data[start:start + self.width]
+
+    def set_row(self, row: int, values: Sequence[float]) -> None:
+        start = row * self.width
+        self.data[start:start + self.width] = array("d", values)
+
+    def row_mean(self, row: int) -> float:
+        """Arithmetic mean of one row over every subject, 0.0 cells included (0.0 for an empty schema)."""
+        if not self.width:
+            return 0.0
+        start = row * self.width
+        return sum(self.data[start:start + self.width]) / self.width
+
+    def as_numpy(self):
+        """
+        Zero-copy (rows, width) float64 view of the matrix (requires NumPy).
+        Drop the view before adding rows: an array cannot grow while NumPy holds its buffer.
+        """
+        if np is None:
+            raise ImportError("numpy is required for ScoreMatrix.as_numpy")
+        return np.frombuffer(self.data, dtype=np.float64).reshape(self.rows, self.width)
+
+    def same_schema(self, subjects: Sequence[str]) -> bool:
+        return self.subjects == tuple(subjects)
+
+    def __repr__(self):
+        return f"<ScoreMatrix {self.rows}x{self.width} {list(self.subjects)}>"
+
+
+def subjects_from_header(header: Sequence[object]) -> Optional[List[str]]:
+    """
+    Return the subject names of a roster header row, or None if it is not a header.
+
+    Layout: student_id, name, birth_year, major, <subject columns...>, gpa
+    (the gpa column is optional; subjects are every column between major and gpa).
+    """
+    cells = ["" if c is None else str(c).strip() for c in header]
+    lowered = [c.lower() for c in cells]
+    if len(cells) < 4 or not any(h in ("student_id", "id", "name", "birth", "birth year", "major", "gpa")
+                                 for h in lowered):
+        return None
+    end = len(cells)
+    while end > 4 and not cells[end - 1]:
+        end -= 1
+    if end > 4 and lowered[end - 1] == "gpa":
+        end -= 1
+    return [c or f"Subject{k}" for k, c in enumerate(cells[4:end], start=1)]
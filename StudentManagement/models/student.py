@@ -1,4 +1,5 @@
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence
+from models.score_matrix import ScoreMatrix
 
 class Student:
     """
@@ -6,19 +7,23 @@ class Student:
 
     Responsibilities:
     - store immutable id and editable fields: name, birth_year, major
-    - maintain subject scores in a private dict (subject -> float)
-    - compute GPA as arithmetic mean of DEFAULT_SUBJECTS scores
-    - provide lightweight CSV-compatible serialization helpers (to_row / from_row)
+    - own one row of a shared ScoreMatrix (subject scores indexed by schema position)
+    - compute GPA as arithmetic mean of the row's scores
+    - provide lightweight CSV-compatible serialization helpers (to_row / from_row / to_dict)
 
     Notes / invariants:
-    - DEFAULT_SUBJECTS defines the 4 expected subject columns in file I/O.
+    - The subject list comes from the matrix schema (read from the file header);
+      DEFAULT_SUBJECTS is only the schema for new rosters and files without a header.
     - Scores and GPA are floats; scores are clamped at minimum 0.0 by set_score.
     - from_row attempts to be permissive for malformed input but will raise if student_id is missing.
     """
 
     DEFAULT_SUBJECTS: List[str] = ["CSI106", "PFP191", "MAD101", "MAE101"]
 
-    def __init__(self, student_id: str, name: str, birth_year: int, major: str, gpa: float = 0.0):
+    __slots__ = ("__student_id", "__name", "__birth_year", "__major", "__gpa", "__matrix", "__row", "ordinal")
+
+    def __init__(self, student_id: str, name: str, birth_year: int, major: str, gpa: float = 0.0,
+                 matrix: Optional[ScoreMatrix] = None):
         # Validate required id and normalize inputs
         if not student_id:
             raise ValueError("student_id is required")
@@ -34,9 +39,31 @@ class Student:
         except (TypeError, ValueError):
             self.__gpa = 0.0
 
-        # Private scores dict: subject -> float
-        # Initialized with DEFAULT_SUBJECTS set to 0.0 so UI can show consistent columns.
-        self.__scores: Dict[str, float] = {subj: 0.0 for subj in self.DEFAULT_SUBJECTS}
+        # Scores live in a row of a (usually roster-wide) matrix, initialized to 0.0.
+        # A standalone Student gets a private one-row matrix with DEFAULT_SUBJECTS.
+        self.__matrix = matrix if matrix is not None else ScoreMatrix(self.DEFAULT_SUBJECTS)
+        self.__row = self.__matrix.add_row()
+
+        # Stable insertion ordinal assigned by SystemManager (used to restore original order)
+        self.ordinal: int = 0
+
+    @classmethod
+    def bound(cls, matrix: ScoreMatrix, row: int, student_id: str, name: str, birth_year: int,
+              major: str, gpa: float) -> "Student":
+        """
+        Wrap an existing row of matrix without re-validating the fields (fast path for
+        trusted, already normalized data such as a columnar file written by this program).
+        """
+        s = cls.__new__(cls)
+        s.__student_id = student_id
+        s.__name = name
+        s.__birth_year = birth_year
+        s.__major = major
+        s.__gpa = gpa
+        s.__matrix = matrix
+        s.__row = row
+        s.ordinal = 0
+        return s
 
     # --- properties ---
     @property
@@ -66,13 +93,33 @@ class Student:
 
     @property
     def scores(self) -> Dict[str, float]:
-        """Return a shallow copy of the scores dict to prevent external mutation of internals."""
-        return dict(self.__scores)
+        """Return scores as a new {subject: score} dict (schema order)."""
+        return dict(zip(self.__matrix.subjects, self.__matrix.row(self.__row)))
+
+    @property
+    def subjects(self) -> Sequence[str]:
+        """Return the subject names of this student's schema (in column order)."""
+        return self.__matrix.subjects
+
+    @property
+    def matrix(self) -> ScoreMatrix:
+        """Return the ScoreMatrix holding this student's scores."""
+        return self.__matrix
+
+    @property
+    def row_index(self) -> int:
+        """Return this student's row in matrix."""
+        return self.__row
 
     # convenience getter
     def get_score(self, subject: str) -> float:
         """Return numeric score for subject, default 0.0 when missing."""
-        return float(self.__scores.get(subject, 0.0))
+        j = self.__matrix.index.get(subject)
+        return 0.0 if j is None else self.__matrix.get(self.__row, j)
+
+    def score_values(self) -> List[float]:
+        """Return all scores in schema order."""
+        return self.__matrix.row(self.__row).tolist()
 
     # convenience setter (keeps GPA recalculated)
     def set_score(self, subject: str, score: float):
@@ -89,7 +136,10 @@ class Student:
             raise ValueError("Score must be a number")
         if val < 0:
             val = 0.0
-        self.__scores[str(subject).strip()] = val
+        j = self.__matrix.index.get(str(subject).strip())
+        if j is None:
+            raise ValueError(f"Unknown subject '{subject}'")
+        self.__matrix.set(self.__row, j, val)
         self.__calculate_gpa()
 
     # --- operations ---
@@ -109,10 +159,46 @@ class Student:
         if major is not None:
             self.__major = str(major).strip()
 
+    def assign_from(self, other: "Student") -> None:
+        """
+        Copy profile fields, scores and GPA from another Student (keeps own id and ordinal).
+        Scores are matched by subject name; subjects missing in `other` become 0.0.
+        """
+        self.__name = other.name
+        self.__birth_year = other.birth_year
+        self.__major = other.major
+        self.__set_scores(other.scores)
+        self.__gpa = other.gpa
+
+    def move_to(self, matrix: ScoreMatrix) -> None:
+        """
+        Copy this student's scores (by subject name) into a new row of matrix and use it from now on.
+        Subjects the student has no score for count as 0.0; if the schema changed, GPA is
+        recomputed over the new row so it matches what the next score edit would produce.
+        """
+        scores = self.scores
+        self.__matrix = matrix
+        self.__row = matrix.add_row([scores.get(subj, 0.0) for subj in matrix.subjects])
+        if len(scores) != matrix.width or any(subj not in scores for subj in matrix.subjects):
+            self.__calculate_gpa()
+
+    def edit_state(self) -> tuple:
+        """Return the editable fields as a small immutable tuple (used by the undo log)."""
+        return (self.__name, self.__birth_year, self.__major, tuple(self.scores.items()), self.__gpa)
+
+    def restore_state(self, state: tuple) -> None:
+        """Restore fields previously captured by edit_state (GPA is restored as stored, not recomputed)."""
+        self.__name, self.__birth_year, self.__major, scores, self.__gpa = state
+        self.__set_scores(dict(scores))
+
+    def __set_scores(self, scores: Dict[str, float]) -> None:
+        """Overwrite the whole row from a {subject: score} dict (missing subjects -> 0.0)."""
+        self.__matrix.set_row(self.__row, [scores.get(subj, 0.0) for subj in self.__matrix.subjects])
+
     def __calculate_gpa(self):
-        """Compute GPA as mean of present scores; keep previous GPA if no scores exist."""
-        if self.__scores:
-            self.__gpa = sum(self.__scores.values()) / len(self.__scores)
+        """Compute GPA as mean of the row's scores; keep previous GPA if the schema has no subjects."""
+        if self.__matrix.width:
+            self.__gpa = self.__matrix.row_mean(self.__row)
         else:
             try:
                 self.__gpa = float(self.__gpa)
@@ -120,13 +206,19 @@ class Student:
                 self.__gpa = 0.0
 
     # --- serialization helpers (CSV-friendly) ---
-    def to_row(self) -> List[str]:
+    def to_row(self, subjects: Optional[Sequence[str]] = None) -> List[str]:
         """
-        Return a CSV row (list of values) with 9 columns:
-        [student_id, name, birth_year, major, subj1, subj2, subj3, subj4, gpa]
+        Return a CSV row (list of values) with 5 + <subject count> columns:
+        [student_id, name, birth_year, major, subj1, ..., subjN, gpa]
         Values are strings or numbers (csv.writer will convert/quote as needed).
+
+        subjects: column order to write (default: this student's schema); subjects
+        missing from the schema are written as 0.00.
         """
-        subj_vals = [f"{self.get_score(s):.2f}" for s in self.DEFAULT_SUBJECTS]
+        if subjects is None or subjects == self.__matrix.subjects:
+            subj_vals = [f"{v:.2f}" for v in self.__matrix.row(self.__row)]
+        else:
+            subj_vals = [f"{self.get_score(s):.2f}" for s in subjects]
         return [
             self.student_id,
             self.name,
@@ -136,12 +228,38 @@ class Student:
             f"{self.gpa:.2f}"
         ]
 
+    def to_dict(self, subjects: Optional[Sequence[str]] = None) -> Dict[str, object]:
+        """
+        Return a JSON-friendly dict with the same fields as to_row:
+        {student_id, name, birth_year, major, <subject>: score..., gpa}
+
+        subjects: subject keys to write, in order (default: this student's schema); subjects
+        missing from the schema are written as 0.0.
+        """
+        d: Dict[str, object] = {
+            "student_id": self.student_id,
+            "name": self.name,
+            "birth_year": self.birth_year,
+            "major": self.major,
+        }
+        if subjects is None or subjects == self.__matrix.subjects:
+            for s, v in zip(self.__matrix.subjects, self.__matrix.row(self.__row)):
+                d[s] = round(v, 2)
+        else:
+            for s in subjects:
+                d[s] = round(self.get_score(s), 2)
+        d["gpa"] = round(self.gpa, 2)
+        return d
+
     @classmethod
-    def from_row(cls, row: List[str]):
+    def from_row(cls, row: List[str], matrix: Optional[ScoreMatrix] = None):
         """
         Create Student from a CSV row (list-like).
-        Accepts rows with >=9 elements; missing values are treated as empty/zero.
-        Subject columns are mapped to DEFAULT_SUBJECTS in order.
+
+        matrix: the roster's ScoreMatrix; its schema gives the subject columns, which
+        start at position 4 and are followed by GPA (default: a private matrix with
+        DEFAULT_SUBJECTS, i.e. the classic 9-column layout). Missing values are treated
+        as empty/zero.
 
         GPA handling:
         - If GPA column exists and all subject scores are zero: keep provided GPA
@@ -149,8 +267,11 @@ class Student:
         - If GPA column missing: calculate from available subject scores
         - Missing subject scores default to 0.0
         """
-        # ensure at least 9 elements
-        cells = list(row) + [""] * max(0, 9 - len(row))
+        if matrix is None:
+            matrix = ScoreMatrix(cls.DEFAULT_SUBJECTS)
+        m = matrix.width
+        # ensure at least 5 + m elements
+        cells = list(row) + [""] * max(0, 5 + m - len(row))
         sid = str(cells[0]).strip() if cells[0] is not None else ""
         name = str(cells[1]).strip() if cells[1] is not None else ""
         try:
@@ -159,43 +280,36 @@ class Student:
             birth_i = 0
         major = str(cells[3]).strip() if cells[3] is not None else ""
 
-        # subject columns are at positions 4..7
+        # subject columns are at positions 4..4+m-1 (negative scores clamp to 0 like set_score)
         subj_vals = []
-        for i in range(4, 8):
+        for i in range(4, 4 + m):
             v = cells[i]
             try:
-                subj_vals.append(float(v) if v not in (None, "") else 0.0)
+                subj_vals.append(max(float(v), 0.0) if v not in (None, "") else 0.0)
             except Exception:
                 subj_vals.append(0.0)
 
-        # Get GPA from column 8 if present
+        # Get GPA from the column after the subjects if present
         file_gpa = None
         try:
-            if cells[8] not in (None, ""):
-                file_gpa = float(cells[8])
+            if cells[4 + m] not in (None, ""):
+                file_gpa = float(cells[4 + m])
         except Exception:
             file_gpa = None
 
         if not sid:
             raise ValueError("Missing student_id in row")
 
-        # Create student with temporary 0 GPA
-        student = cls(sid, name, birth_i, major, 0.0)
-        
-        # Set available subject scores (this will calculate initial GPA)
-        for subj_name, val in zip(cls.DEFAULT_SUBJECTS, subj_vals):
-            try:
-                student.set_score(subj_name, val)
-            except Exception:
-                pass
+        # Create student with its row in the shared matrix; write all scores at once
+        student = cls(sid, name, birth_i, major, 0.0, matrix=matrix)
+        matrix.set_row(student.row_index, subj_vals)
+        calculated_gpa = sum(subj_vals) / m if m else 0.0
+        student._Student__gpa = calculated_gpa
 
         # GPA decision logic:
         if file_gpa is not None:
-            # Calculate expected GPA from scores
-            calculated_gpa = sum(student.get_score(s) for s in cls.DEFAULT_SUBJECTS) / len(cls.DEFAULT_SUBJECTS)
-            
             # If all scores are 0 but file has GPA, use file's GPA
-            if all(student.get_score(s) == 0.0 for s in cls.DEFAULT_SUBJECTS):
+            if not any(subj_vals):
                 student._Student__gpa = file_gpa
             # If calculated GPA doesn't match file (within rounding), use calculated
             elif abs(calculated_gpa - file_gpa) > 0.01:
@@ -0,0 +1,94 @@
+from typing import Deque, List, Optional, Tuple
+from collections import deque
+from contextlib import contextmanager
+
+# One undoable step: (label, [inverse ops in the order they were recorded])
+Entry = Tuple[str, List[tuple]]
+
+
+class EditHistory:
+    """
+    Bounded undo/redo log of inverse operations.
+
+    Responsibilities:
+    - record(op): store the op that undoes one primitive edit
+    - transaction(label): group every op recorded inside the block into a single undo step
+    - pop_undo / pop_redo / push_undo / push_redo: used by SystemManager.undo / redo
+
+    Notes:
+    - Ops are small tuples built by SystemManager (old field values, or a removed Student
+      with its list position), so memory per step does not depend on roster size.
+    - At most `limit` steps are kept; the oldest are dropped first (deque maxlen).
+    - Recording a new edit clears the redo stack.
+    """
+
+    DEFAULT_LIMIT = 200
+
+    def __init__(self, limit: int = DEFAULT_LIMIT):
+        self.limit = limit
+        self._undo: Deque[Entry] = deque(maxlen=limit)
+        self._redo: Deque[Entry] = deque(maxlen=limit)
+        self._pending: Optional[List[tuple]] = None
+        self._pending_label = ""
+        self._depth = 0
+
+    def record(self, op: tuple, label: str = "") -> None:
+        """Store an inverse op (as its own step unless a transaction is open)."""
+        if self._pending is not None:
+            self._pending.append(op)
+            return
+        self._undo.append((label, [op]))
+        self._redo.clear()
+
+    @contextmanager
+    def transaction(self, label: str = ""):
+        """Group nested edits into one undo step (the outermost label wins)."""
+        if self._depth == 0:
+            self._pending = []
+            self._pending_label = label
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                ops, self._pending = self._pending, None
+                if ops:
+                    self._undo.append((self._pending_label, ops))
+                    self._redo.clear()
+
+    def clear(self) -> None:
+        """Forget all steps (after a load or bulk merge replaced the roster)."""
+        self._undo.clear()
+        self._redo.clear()
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo_label(self) -> Optional[str]:
+        """Label of the step Ctrl+Z would revert, or None."""
+        return self._undo[-1][0] if self._undo else None
+
+    def redo_label(self) -> Optional[str]:
+        """Label of the step Ctrl+Y would re-apply, or None."""
+        return self._redo[-1][0] if self._redo else None
+
+    def pop_undo(self) -> Optional[Entry]:
+        return self._undo.pop() if self._undo else None
+
+    def pop_redo(self) -> Optional[Entry]:
+        return self._redo.pop() if self._redo else None
+
+    def push_undo(self, entry: Entry) -> None:
+        self._undo.append(entry)
+
+    def push_redo(self, entry: Entry) -> None:
+        self._redo.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._undo)
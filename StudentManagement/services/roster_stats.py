@@ -0,0 +1,308 @@
+from typing import Dict, List, Optional, Iterable, Sequence, Tuple
+from collections import Counter
+import heapq
+import math
+from models.student import Student
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: the incremental path below works without it
+    np = None
+
+# Score histogram bins: one bin per point, [0,1), [1,2), ..., [9,10] (10 is folded into the last bin)
+HIST_BINS = 10
+
+
+def _score_bin(score: float) -> int:
+    """Return histogram bin index for a score (clamped to 0..HIST_BINS-1)."""
+    b = int(math.floor(score))
+    return min(max(b, 0), HIST_BINS - 1)
+
+
+class _MedianHeaps:
+    """
+    Running median of a multiset of floats: O(log n) add/remove, O(1) median.
+
+    The lower half lives in a max-heap (`low`, values negated), the upper half in a
+    min-heap (`high`), with len(lower) == len(upper) or one more. Removed values are
+    deleted lazily: counted per heap in `_gone_*` and popped once they reach a top, so
+    both tops are always live. Each heap is compacted when its dead entries outnumber
+    the live ones.
+    """
+
+    __slots__ = ("low", "high", "n_low", "n_high", "_gone_low", "_gone_high")
+
+    def __init__(self, ordered: Sequence[float] = ()):
+        """Start from values already sorted ascending (O(n), no heap pushes)."""
+        mid = (len(ordered) + 1) // 2
+        # negated reversed prefix is ascending, and a sorted list is a valid heap
+        self.low: List[float] = [-v for v in reversed(ordered[:mid])]
+        self.high: List[float] = list(ordered[mid:])
+        self.n_low, self.n_high = mid, len(ordered) - mid
+        self._gone_low: Counter = Counter()
+        self._gone_high: Counter = Counter()
+
+    def __len__(self) -> int:
+        return self.n_low + self.n_high
+
+    def add(self, value: float) -> None:
+        if not self.n_low or value <= -self.low[0]:
+            heapq.heappush(self.low, -value)
+            self.n_low += 1
+        else:
+            heapq.heappush(self.high, value)
+            self.n_high += 1
+        self._rebalance()
+
+    def remove(self, value: float) -> None:
+        """Remove one occurrence of value (it must have been added)."""
+        # a value <= max(lower half) always has a live copy in the lower half
+        if self.n_low and value <= -self.low[0]:
+            self.n_low -= 1
+            self._gone_low[-value] += 1
+            self._prune(self.low, self._gone_low)
+        else:
+            self.n_high -= 1
+            self._gone_high[value] += 1
+            self._prune(self.high, self._gone_high)
+        self._rebalance()
+
+    def median(self) -> float:
+        """Median of the live values (0.0 when empty)."""
+        if not self.n_low:
+            return 0.0
+        if self.n_low > self.n_high:
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+
+    def _rebalance(self) -> None:
+        if self.n_low > self.n_high + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.n_low -= 1
+            self.n_high += 1
+            self._prune(self.low, self._gone_low)
+        elif self.n_low < self.n_high:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.n_high -= 1
+            self.n_low += 1
+            self._prune(self.high, self._gone_high)
+        if len(self.low) > 2 * self.n_low + 16:
+            self._compact(self.low, self._gone_low)
+        if len(self.high) > 2 * self.n_high + 16:
+            self._compact(self.high, self._gone_high)
+
+    @staticmethod
+    def _prune(heap: List[float], gone: Counter) -> None:
+        # pop dead entries off the top so heap[0] is live
+        while heap and gone[heap[0]] > 0:
+            gone[heap[0]] -= 1
+            if not gone[heap[0]]:
+                del gone[heap[0]]
+            heapq.heappop(heap)
+
+    @staticmethod
+    def _compact(heap: List[float], gone: Counter) -> None:
+        # drop every dead entry at once (in place) and re-heapify
+        live = []
+        for v in heap:
+            if gone[v] > 0:
+                gone[v] -= 1
+            else:
+                live.append(v)
+        gone.clear()
+        heap[:] = live
+        heapq.heapify(heap)
+
+
+class _Group:
+    """Running aggregates for one group of students (whole roster or a single major)."""
+
+    __slots__ = ("count", "gpa_sum", "gpa_sq_sum", "gpas", "subject_sums", "score_hist", "birth_years")
+
+    def __init__(self, n_subjects: int):
+        self.count = 0
+        self.gpa_sum = 0.0
+        self.gpa_sq_sum = 0.0
+        # GPA multiset as two heaps: O(log n) per add/remove, O(1) median
+        self.gpas = _MedianHeaps()
+        self.subject_sums: List[float] = [0.0] * n_subjects
+        self.score_hist: List[List[int]] = [[0] * HIST_BINS for _ in range(n_subjects)]
+        self.birth_years: Counter = Counter()
+
+    def apply(self, gpa: float, scores: Tuple[float, ...], birth: int, sign: int) -> None:
+        """Add (sign=+1) or remove (sign=-1) one student's contribution."""
+        self.count += sign
+        self.gpa_sum += sign * gpa
+        self.gpa_sq_sum += sign * gpa * gpa
+        if sign > 0:
+            self.gpas.add(gpa)
+        else:
+            self.gpas.remove(gpa)
+        for j, v in enumerate(scores):
+            self.subject_sums[j] += sign * v
+            self.score_hist[j][_score_bin(v)] += sign
+        self.birth_years[birth] += sign
+        if self.birth_years[birth] <= 0:
+            del self.birth_years[birth]
+
+
+class RosterStats:
+    """
+    Incrementally maintained per-major and overall roster statistics.
+
+    Responsibilities:
+    - rebuild(students): full recomputation (vectorized with NumPy when available)
+    - add / remove / update: O(subjects + log n) running-sum maintenance after a single edit
+    - summary(major): count, mean/median/stddev GPA, per-subject means,
+      score histograms and birth-year distribution for one group
+
+    Notes:
+    - Each student's last contribution is remembered (keyed by object identity) so
+      update() can be called *after* the Student was mutated.
+    - The median uses two heaps per group with lazy deletion (see _MedianHeaps).
+    """
+
+    def __init__(self, subjects: Optional[List[str]] = None):
+        self.subjects: List[str] = list(subjects or Student.DEFAULT_SUBJECTS)
+        self._schema = tuple(self.subjects)
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all aggregates."""
+        self.overall = _Group(len(self.subjects))
+        self.majors: Dict[str, _Group] = {}
+        # id(student) -> (major, gpa, scores, birth_year) as last added
+        self._contrib: Dict[int, Tuple[str, float, Tuple[float, ...], int]] = {}
+
+    def _scores(self, s: Student) -> Tuple[float, ...]:
+        if s.subjects == self._schema:
+            return tuple(s.matrix.row(s.row_index))
+        return tuple(s.get_score(subj) for subj in self.subjects)
+
+    def _snapshot(self, s: Student) -> Tuple[str, float, Tuple[float, ...], int]:
+        return (s.major, s.gpa, self._scores(s), s.birth_year)
+
+    def _apply(self, snap: Tuple[str, float, Tuple[float, ...], int], sign: int) -> None:
+        major, gpa, scores, birth = snap
+        self.overall.apply(gpa, scores, birth, sign)
+        grp = self.majors.get(major)
+        if grp is None:
+            grp = self.majors[major] = _Group(len(self.subjects))
+        grp.apply(gpa, scores, birth, sign)
+        if grp.count <= 0:
+            del self.majors[major]
+
+    # --- incremental maintenance ---
+    def add(self, s: Student) -> None:
+        """Account for a newly added student."""
+        snap = self._snapshot(s)
+        self._contrib[id(s)] = snap
+        self._apply(snap, +1)
+
+    def remove(self, s: Student) -> None:
+        """Remove a student's last recorded contribution (no-op if unknown)."""
+        snap = self._contrib.pop(id(s), None)
+        if snap is not None:
+            self._apply(snap, -1)
+
+    def update(self, s: Student) -> None:
+        """Re-account a student after its fields or scores changed."""
+        snap = self._snapshot(s)
+        old = self._contrib.get(id(s))
+        if old == snap:
+            return
+        if old is not None:
+            self._apply(old, -1)
+        self._contrib[id(s)] = snap
+        self._apply(snap, +1)
+
+    # --- full recomputation ---
+    def rebuild(self, students: Iterable[Student]) -> None:
+        """Recompute all aggregates from scratch (NumPy column operations when available)."""
+        students = list(students)
+        self.reset()
+        if np is None or not students:
+            for s in students:
+                self.add(s)
+            return
+
+        n, m = len(students), len(self.subjects)
+        majors = [s.major for s in students]
+        gpa = np.fromiter((s.gpa for s in students), dtype=np.float64, count=n)
+        births = np.fromiter((s.birth_year for s in students), dtype=np.int64, count=n)
+        matrix = students[0].matrix
+        if matrix.subjects == self._schema and all(s.matrix is matrix for s in students):
+            # gather the students' rows straight from the shared dense matrix (one copy)
+            rows = np.fromiter((s.row_index for s in students), dtype=np.intp, count=n)
+            scores = matrix.as_numpy()[rows]
+        else:
+            scores = np.array([self._scores(s) for s in students], dtype=np.float64).reshape(n, m)
+
+        names, inverse = np.unique(np.array(majors, dtype=object).astype(str), return_inverse=True)
+        g = len(names)
+        counts = np.bincount(inverse, minlength=g)
+        gpa_sums = np.bincount(inverse, weights=gpa, minlength=g)
+        gpa_sq = np.bincount(inverse, weights=gpa * gpa, minlength=g)
+        bins = np.clip(np.floor(scores), 0, HIST_BINS - 1).astype(np.int64)
+        order = np.lexsort((gpa, inverse))
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+
+        groups: List[_Group] = []
+        for k in range(g):
+            grp = _Group(m)
+            mask = inverse == k
+            grp.count = int(counts[k])
+            grp.gpa_sum = float(gpa_sums[k])
+            grp.gpa_sq_sum = float(gpa_sq[k])
+            grp.gpas = _MedianHeaps(gpa[order[bounds[k]:bounds[k + 1]]].tolist())
+            grp.subject_sums = scores[mask].sum(axis=0).tolist()
+            grp.score_hist = [np.bincount(bins[mask, j], minlength=HIST_BINS).tolist() for j in range(m)]
+            yrs, cnt = np.unique(births[mask], return_counts=True)
+            grp.birth_years = Counter(dict(zip(yrs.tolist(), cnt.tolist())))
+            groups.append(grp)
+        self.majors = {str(name): grp for name, grp in zip(names, groups)}
+
+        ov = self.overall
+        ov.count = n
+        ov.gpa_sum = float(gpa.sum())
+        ov.gpa_sq_sum = float((gpa * gpa).sum())
+        ov.gpas = _MedianHeaps(np.sort(gpa).tolist())
+        ov.subject_sums = scores.sum(axis=0).tolist()
+        ov.score_hist = [np.bincount(bins[:, j], minlength=HIST_BINS).tolist() for j in range(m)]
+        yrs, cnt = np.unique(births, return_counts=True)
+        ov.birth_years = Counter(dict(zip(yrs.tolist(), cnt.tolist())))
+
+        score_rows = map(tuple, scores.tolist())
+        self._contrib = {id(s): (mj, gp, sc, by) for s, mj, gp, sc, by
+                         in zip(students, majors, gpa.tolist(), score_rows, births.tolist())}
+
+    # --- queries ---
+    def summary(self, major: Optional[str] = None) -> dict:
+        """
+        Return aggregates for the whole roster (major=None) or a single major.
+
+        Keys: count, mean, median, std (population), subject_means {subject: mean},
+        histograms {subject: [count per bin]}, birth_years {year: count}.
+        """
+        grp = self.overall if major is None else self.majors.get(major)
+        if grp is None or grp.count <= 0:
+            return {"count": 0, "mean": 0.0, "median": 0.0, "std": 0.0,
+                    "subject_means": {s: 0.0 for s in self.subjects},
+                    "histograms": {s: [0] * HIST_BINS for s in self.subjects},
+                    "birth_years": {}}
+        n = grp.count
+        mean = grp.gpa_sum / n
+        var = max(0.0, grp.gpa_sq_sum / n - mean * mean)
+        return {
+            "count": n,
+            "mean": mean,
+            "median": grp.gpas.median(),
+            "std": math.sqrt(var),
+            "subject_means": {s: grp.subject_sums[j] / n for j, s in enumerate(self.subjects)},
+            "histograms": {s: list(grp.score_hist[j]) for j, s in enumerate(self.subjects)},
+            "birth_years": dict(sorted(grp.birth_years.items())),
+        }
+
+    def major_names(self) -> List[str]:
+        """Return majors currently present, sorted case-insensitively."""
+        return sorted(self.majors, key=str.lower)
@@ -0,0 +1,332 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from pathlib import Path
+import csv
+import datetime
+import json
+from models.student import Student
+from models.score_matrix import subjects_from_header
+from utils import columnar, perf
+from utils.file_io import EXCEL_SUFFIXES, PROGRESS_EVERY, ProgressCallback
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional for the app, but validation needs it
+    np = None
+
+SCORE_MIN, SCORE_MAX = 0.0, 10.0
+BIRTH_MIN = 1900
+# Same tolerance Student.from_row uses before it replaces a file GPA by the score mean
+GPA_TOLERANCE = 0.01
+# Details kept per issue code (counts are always exact)
+DETAIL_LIMIT = 1000
+
+# code -> description, in report order
+ISSUE_CODES = {
+    "missing_id": "row without student_id (skipped when loading)",
+    "bad_number": "non-numeric birth year, score or GPA (read as 0 / recomputed when loading)",
+    "duplicate_id": "student_id used by several rows (the id index keeps only the last one)",
+    "score_range": f"score outside {SCORE_MIN:g}-{SCORE_MAX:g}",
+    "birth_year": f"birth year missing or outside {BIRTH_MIN}-current year",
+    "gpa_range": f"GPA outside {SCORE_MIN:g}-{SCORE_MAX:g}",
+    "gpa_mismatch": f"GPA differs from the mean of the scores by more than {GPA_TOLERANCE:g}",
+}
+
+
+class ValidationReport:
+    """
+    Structured result of a validation pass.
+
+    - source: file name or "<roster>"
+    - rows: number of data rows checked
+    - counts: {code: number of problems} for every code of ISSUE_CODES
+    - issues: {code: [detail dict, ...]}, at most `limit` details per code
+
+    Every detail has "row" (1-based data row, numbered like the loader's "Skipping
+    malformed row" messages; roster position for in-memory rosters) and "student_id",
+    plus the offending values.
+    """
+
+    def __init__(self, source: str, rows: int, subjects: Sequence[str], limit: int = DETAIL_LIMIT):
+        self.source = source
+        self.rows = rows
+        self.subjects = list(subjects)
+        self.limit = limit
+        self.counts: Dict[str, int] = {code: 0 for code in ISSUE_CODES}
+        self.issues: Dict[str, List[dict]] = {code: [] for code in ISSUE_CODES}
+
+    def add(self, code: str, count: int, details) -> None:
+        """Record count problems for code; details is an iterable of dicts (consumed up to limit)."""
+        self.counts[code] += count
+        room = self.limit - len(self.issues[code])
+        for d in details:
+            if room <= 0:
+                break
+            self.issues[code].append(d)
+            room -= 1
+
+    @property
+    def ok(self) -> bool:
+        return not any(self.counts.values())
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def to_dict(self) -> dict:
+        return {"source": self.source, "rows": self.rows, "subjects": self.subjects,
+                "ok": self.ok, "counts": dict(self.counts), "issues": self.issues}
+
+    def dump(self, filename: str) -> bool:
+        """Write the report as JSON. Returns True on success."""
+        try:
+            with open(filename, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+                f.write("\n")
+            return True
+        except Exception as ex:
+            print(f"Error writing {filename}: {ex}")
+            return False
+
+    def summary_lines(self) -> List[str]:
+        """Headline plus one line per code with problems."""
+        lines = [f"{self.source}: {self.rows} rows checked, {self.total} problem(s)"]
+        for code, desc in ISSUE_CODES.items():
+            if self.counts[code]:
+                lines.append(f"  {code}: {self.counts[code]} - {desc}")
+        return lines
+
+    def __repr__(self):
+        found = {c: n for c, n in self.counts.items() if n}
+        return f"<ValidationReport {self.source} rows={self.rows} {found or 'ok'}>"
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("numpy is required for roster validation. Install with: pip install numpy")
+
+
+def _float_column(cells: List) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Parse one column of cells to float64 (NaN for empty cells).
+    Returns (values, bad) where bad marks non-empty cells that are not numbers.
+    """
+    n = len(cells)
+    try:
+        # fast path: every cell is a number (or numeric text)
+        return np.array(cells, dtype=np.float64), np.zeros(n, dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    # empty or bad cells present: convert one by one
+    values = np.empty(n, dtype=np.float64)
+    bad = np.zeros(n, dtype=bool)
+    for i, c in enumerate(cells):
+        if c is None or c == "":
+            values[i] = np.nan
+            continue
+        try:
+            values[i] = float(c)
+        except (TypeError, ValueError):
+            values[i] = np.nan
+            bad[i] = not str(c).isspace()
+    return values, bad
+
+
+@perf.timed("validate")
+def _check(report: ValidationReport, ids: List[str], birth, scores, gpa,
+           row_no: Optional[List[int]] = None) -> ValidationReport:
+    """
+    Run every check on column data.
+
+    ids: list of student_id strings ("" = missing); birth, gpa: float64 (n,) with NaN for
+    empty cells; scores: float64 (n, m) with NaN for empty cells; row_no: reported row
+    number of each entry (default position + 1).
+    """
+    n = len(ids)
+    num = row_no.__getitem__ if row_no is not None else (lambda i: i + 1)
+    # --- single hash pass: missing and duplicate ids ---
+    first: Dict[str, int] = {}
+    dups: Dict[str, List[int]] = {}
+    missing: List[int] = []
+    for i, sid in enumerate(ids):
+        if not sid:
+            missing.append(i)
+            continue
+        j = first.setdefault(sid, i)
+        if j != i:
+            rows = dups.get(sid)
+            if rows is None:
+                dups[sid] = [j, i]
+            else:
+                rows.append(i)
+    report.add("missing_id", len(missing), ({"row": num(i), "student_id": ""} for i in missing))
+    report.add("duplicate_id", sum(len(r) - 1 for r in dups.values()),
+               ({"row": num(rows[-1]), "student_id": sid, "rows": [num(r) for r in rows]}
+                for sid, rows in dups.items()))
+
+    # rows without id never reach the roster: leave them out of the value checks
+    valid = np.ones(n, dtype=bool)
+    valid[missing] = False
+
+    def add_rows(code, mask, detail):
+        idx = np.flatnonzero(mask & valid)
+        report.add(code, len(idx), (detail(i) for i in idx[:report.limit].tolist()))
+
+    # --- column checks ---
+    # NaN compares False, so empty cells never count as out of range
+    out = ((scores < SCORE_MIN) | (scores > SCORE_MAX)) & valid[:, None]
+    r, c = np.nonzero(out)
+    subjects = report.subjects
+    report.add("score_range", len(r),
+               ({"row": num(i), "student_id": ids[i], "subject": subjects[j], "value": float(scores[i, j])}
+                for i, j in zip(r[:report.limit].tolist(), c[:report.limit].tolist())))
+
+    years = np.nan_to_num(birth, nan=0.0)
+    this_year = datetime.date.today().year
+    add_rows("birth_year", (years < BIRTH_MIN) | (years > this_year),
+             lambda i: {"row": num(i), "student_id": ids[i], "value": float(years[i])})
+
+    add_rows("gpa_range", (gpa < SCORE_MIN) | (gpa > SCORE_MAX),
+             lambda i: {"row": num(i), "student_id": ids[i], "value": float(gpa[i])})
+
+    # the loader clamps negative scores to 0 and reads empty ones as 0 before averaging
+    filled = np.clip(np.nan_to_num(scores, nan=0.0), 0.0, None)
+    if filled.shape[1]:
+        mean = filled.mean(axis=1)
+        # all-zero rows keep the file GPA when loading, so they cannot mismatch
+        mismatch = ~np.isnan(gpa) & filled.any(axis=1) & (np.abs(mean - np.nan_to_num(gpa)) > GPA_TOLERANCE)
+        add_rows("gpa_mismatch", mismatch,
+                 lambda i: {"row": num(i), "student_id": ids[i], "value": float(gpa[i]),
+                            "expected": round(float(mean[i]), 4)})
+    return report
+
+
+def validate_rows(rows: Sequence[Sequence], subjects: Sequence[str], source: str = "<rows>",
+                  limit: int = DETAIL_LIMIT) -> ValidationReport:
+    """
+    Validate raw data rows (header excluded) laid out as
+    student_id, name, birth_year, major, <subjects...>, gpa.
+    Cells may be strings (CSV) or numbers / None (Excel). Blank rows are ignored like
+    in load_students but keep their row number.
+    """
+    _require_numpy()
+    m = len(subjects)
+    width = 5 + m
+    row_no: List[int] = []
+    fixed = []
+    for n, r in enumerate(rows, start=1):
+        # a row with an id is never blank: only scan the cells of the others
+        if not r or (not r[0] and all(c is None or not str(c).strip() for c in r)):
+            continue
+        row_no.append(n)
+        fixed.append(r if len(r) == width else (list(r) + [""] * (width - len(r)))[:width])
+    report = ValidationReport(source, len(fixed), subjects, limit)
+    if not fixed:
+        return report
+
+    ids = ["" if r[0] is None else str(r[0]).strip() for r in fixed]
+    # one array per column: a (rows, width) str array would be as wide as the longest name
+    cols = {}
+    bad_any = np.zeros(len(fixed), dtype=bool)
+    bad_cols: List[Tuple[str, "np.ndarray"]] = []
+    for name, j in [("birth_year", 2)] + [(s, 4 + k) for k, s in enumerate(subjects)] + [("gpa", 4 + m)]:
+        values, bad = _float_column([r[j] for r in fixed])
+        cols[name] = values
+        if bad.any():
+            bad_any |= bad
+            bad_cols.append((name, bad))
+
+    if bad_cols:
+        valid = np.array([bool(sid) for sid in ids])
+        idx = np.flatnonzero(bad_any & valid)
+
+        def details():
+            for i in idx[:limit].tolist():
+                yield {"row": row_no[i], "student_id": ids[i],
+                       "columns": [name for name, bad in bad_cols if bad[i]]}
+        report.add("bad_number", len(idx), details())
+
+    scores = (np.column_stack([cols[s] for s in subjects]) if m
+              else np.empty((len(fixed), 0), dtype=np.float64))
+    return _check(report, ids, cols["birth_year"], scores, cols["gpa"], row_no)
+
+
+def _read_raw(path: Path, progress: ProgressCallback = None) -> Tuple[Optional[list], List[Sequence]]:
+    """Return (header row or None, data rows) of a CSV or Excel roster, without parsing."""
+    rows: List[Sequence] = []
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        import openpyxl
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            source = wb.active.iter_rows(values_only=True)
+            for n, row in enumerate(source, start=1):
+                if progress and n % PROGRESS_EVERY == 0:
+                    progress(n, 0)
+                rows.append(row)
+        finally:
+            wb.close()
+    else:
+        with path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            if progress is None:
+                return _split_header(list(reader))
+            for n, row in enumerate(reader, start=1):
+                if n % PROGRESS_EVERY == 0:
+                    progress(n, 0)
+                rows.append(row)
+    return _split_header(rows)
+
+
+def _split_header(rows: List[Sequence]) -> Tuple[Optional[list], List[Sequence]]:
+    if rows and subjects_from_header(rows[0]) is not None:
+        return list(rows[0]), rows[1:]
+    return None, rows
+
+
+def validate_file(filename: str, progress: ProgressCallback = None,
+                  limit: int = DETAIL_LIMIT) -> ValidationReport:
+    """
+    Validate a roster file as it is on disk (before the loader normalizes anything).
+    Raises ImportError without numpy (or openpyxl for Excel files), OSError if unreadable.
+    """
+    path = Path(filename)
+    if path.suffix.lower() == columnar.SUFFIX:
+        # binary rosters hold normalized Students: check them like an in-memory roster
+        report = validate_students(columnar.read_columnar(path), progress=progress, limit=limit)
+        report.source = path.name
+        return report
+    header, rows = _read_raw(path, progress)
+    subjects = subjects_from_header(header) if header is not None else list(Student.DEFAULT_SUBJECTS)
+    report = validate_rows(rows, subjects, source=path.name, limit=limit)
+    if progress:
+        progress(report.rows, report.rows)
+    return report
+
+
+def validate_students(students: Sequence[Student], subjects: Optional[Sequence[str]] = None,
+                      progress: ProgressCallback = None, limit: int = DETAIL_LIMIT) -> ValidationReport:
+    """
+    Validate an in-memory roster (e.g. SystemManager.students, including unsaved edits).
+
+    Parsing already normalized these students (negative scores clamped, GPA recomputed),
+    so this mostly finds duplicate ids, impossible birth years and scores above the maximum.
+    """
+    _require_numpy()
+    students = list(students)
+    subjects = list(subjects or (students[0].subjects if students else Student.DEFAULT_SUBJECTS))
+    n, m = len(students), len(subjects)
+    report = ValidationReport("<roster>", n, subjects, limit)
+    if not students:
+        return report
+    ids = [s.student_id for s in students]
+    birth = np.fromiter((s.birth_year for s in students), dtype=np.float64, count=n)
+    gpa = np.fromiter((s.gpa for s in students), dtype=np.float64, count=n)
+    matrix = students[0].matrix
+    if matrix.subjects == tuple(subjects) and all(s.matrix is matrix for s in students):
+        rows = np.fromiter((s.row_index for s in students), dtype=np.intp, count=n)
+        scores = matrix.as_numpy()[rows]
+    else:
+        scores = np.array([[s.get_score(subj) for subj in subjects] for s in students],
+                          dtype=np.float64).reshape(n, m)
+    if progress:
+        progress(n, n)
+    return _check(report, ids, birth, scores, gpa)
@@ -0,0 +1,178 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models.student import Student
+import math
+
+"""
+Filter criteria grammar shared by the Tk filter popup and the headless CLI.
+
+criteria dict keys (all optional, combined with AND):
+ - first_name: lowercase string that must match given name (last token)
+ - birth_year: (min_year, max_year) inclusive
+ - major: lowercase substring to match in major
+ - subjects: dict {subject: (lo, hi)}
+ - gpa: (lo, hi)
+
+Text inputs use the same syntax as the popup fields:
+ - birth year: "1998" or "1990-1995"
+ - scores / GPA: single value "8.5" (-> floor..floor+0.99) or range "7-9" (-> 7..9.99)
+"""
+
+
+def parse_year_range(text: str) -> Optional[Tuple[int, int]]:
+    """Parse birth year input -> (min_year, max_year) or None."""
+    t = (text or "").strip()
+    if not t:
+        return None
+    if "-" in t:
+        parts = t.split("-", 1)
+        try:
+            lo = int(parts[0].strip())
+            hi = int(parts[1].strip())
+            return (min(lo, hi), max(lo, hi))
+        except Exception:
+            return None
+    else:
+        try:
+            y = int(t)
+            return (y, y)
+        except Exception:
+            return None
+
+
+def parse_numeric_range(text: str) -> Optional[Tuple[float, float]]:
+    """Parse single numeric or range 'min-max'."""
+    t = (text or "").strip()
+    if not t:
+        return None
+    if "-" in t:
+        parts = t.split("-", 1)
+        try:
+            a = float(parts[0].strip())
+            b = float(parts[1].strip())
+            lo = min(a, b)
+            hi = max(a, b) + 0.99
+            return (lo, hi)
+        except Exception:
+            return None
+    else:
+        try:
+            v = float(t)
+            lo = math.floor(v)
+            hi = lo + 0.99
+            return (float(lo), float(hi))
+        except Exception:
+            return None
+
+
+def build_criteria(first_name: str = "", birth_year: str = "", major: str = "",
+                   subjects: Optional[Dict[str, str]] = None, gpa: str = "") -> dict:
+    """
+    Build a criteria dict from raw text inputs (popup fields or CLI options).
+    Empty or unparsable inputs are ignored.
+    """
+    criteria = {}
+    fn = (first_name or "").strip()
+    if fn:
+        criteria["first_name"] = fn.lower()
+    by = parse_year_range(birth_year)
+    if by:
+        criteria["birth_year"] = by
+    mj = (major or "").strip()
+    if mj:
+        criteria["major"] = mj.lower()
+
+    subj_criteria = {}
+    for subj, txt in (subjects or {}).items():
+        r = parse_numeric_range(txt)
+        if r:
+            subj_criteria[subj] = r
+    if subj_criteria:
+        criteria["subjects"] = subj_criteria
+
+    gpa_r = parse_numeric_range(gpa)
+    if gpa_r:
+        criteria["gpa"] = gpa_r
+    return criteria
+
+
+def student_matches(s: Student, criteria: dict) -> bool:
+    """Return True if the student satisfies every criterion."""
+    # first name (exact token match of last token)
+    fn = criteria.get("first_name")
+    if fn:
+        parts = [p for p in (s.name or "").split() if p]
+        given = parts[-1].lower() if parts else ""
+        if given != fn:
+            return False
+
+    # birth year
+    by = criteria.get("birth_year")
+    if by:
+        if not (by[0] <= (s.birth_year or 0) <= by[1]):
+            return False
+
+    # major
+    mj = criteria.get("major")
+    if mj:
+        if mj not in (s.major or "").lower():
+            return False
+
+    # subjects
+    subs = criteria.get("subjects", {})
+    for subj, (lo, hi) in subs.items():
+        val = float(s.get_score(subj))
+        if not (lo <= val <= hi):
+            return False
+
+    # gpa
+    gpa_r = criteria.get("gpa")
+    if gpa_r:
+        g = float(s.gpa)
+        if not (gpa_r[0] <= g <= gpa_r[1]):
+            return False
+
+    return True
+
+
+def iter_matches(students: Iterable[Student], criteria: dict) -> Iterator[Student]:
+    """Lazily yield students matching criteria (all students when criteria is empty)."""
+    if not criteria:
+        yield from students
+        return
+    for s in students:
+        if student_matches(s, criteria):
+            yield s
+
+
+def filter_students(students: Iterable[Student], criteria: dict) -> List[Student]:
+    """Return a new list of students matching criteria."""
+    return list(iter_matches(students, criteria))
+
+
+def criteria_contains(outer: dict, inner: dict) -> bool:
+    """
+    Return True if every student matching `inner` also matches `outer`,
+    i.e. `inner` is the same as or a refinement of `outer`.
+
+    - first_name must be identical
+    - ranges (birth_year, gpa, subjects) of inner must lie within outer's
+    - inner major must contain outer major as substring
+    """
+    def _within(o, i) -> bool:
+        if not o:
+            return True
+        return bool(i) and o[0] <= i[0] and i[1] <= o[1]
+
+    fn = outer.get("first_name")
+    if fn and inner.get("first_name") != fn:
+        return False
+    if not _within(outer.get("birth_year"), inner.get("birth_year")):
+        return False
+    mj = outer.get("major")
+    if mj and mj not in (inner.get("major") or ""):
+        return False
+    inner_subs = inner.get("subjects", {})
+    for subj, rng in outer.get("subjects", {}).items():
+        if not _within(rng, inner_subs.get(subj)):
+            return False
+    return _within(outer.get("gpa"), inner.get("gpa"))
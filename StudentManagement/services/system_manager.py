@@ -1,10 +1,22 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterable, Tuple
 from pathlib import Path
+import os
 from models.student import Student
-from utils import file_io
+from models.score_matrix import ScoreMatrix
+from utils import exporters, file_io
+from services.roster_stats import RosterStats
+from services.edit_history import EditHistory
 from algorithms.TimSort import (sort_students, gpa_key, name_key,
                                 birth_year_key, id_key, major_key)
 
+# Conflict resolution policies for merge_files / merge_students:
+# - upsert:      incoming rows overwrite existing ones (later files win)
+# - keep-first:  the first record seen wins (in-memory roster, then files in order)
+# - keep-latest: like upsert, but files are applied oldest -> newest by modification time
+# - score-max:   the record with the higher GPA wins (ties keep the current one)
+MERGE_POLICIES = ("upsert", "keep-first", "keep-latest", "score-max")
+
+
 class SystemManager:
     """
     High-level manager for Student objects.
@@ -12,15 +24,25 @@ class SystemManager:
     Responsibilities:
     - Maintain canonical list self.students (order matters for Save/SaveAs and canonical view).
     - Maintain an O(1) lookup cache self._index mapping student_id -> Student for fast operations.
+    - Own the roster-wide ScoreMatrix self.scores (subject schema + dense score rows of every student).
     - Provide CRUD ops (add/update/delete), score updates, file load/save, and convenience sorting wrappers.
+    - Keep self.stats (RosterStats) in sync on every edit so aggregates never need a rescan.
+    - Record the inverse of every add/update/delete in self.history for undo()/redo().
 
     Behavior notes / edge-cases:
     - add_student raises ValueError if ID already exists.
-    - delete_student rebuilds the index after removal.
+    - delete_student removes every row with that id and drops it from the index.
+    - Students joining the roster (add, merge, undo of a delete) are moved into self.scores;
+      unknown subjects widen the schema (every student moves to a wider matrix). A subject a
+      student has no score for counts as 0.0, and GPAs are recomputed on the new schema.
     - Sorting helpers call the algorithms.TimSort wrapper and then rebuild the index to keep lookups consistent.
-    - load_from_file replaces the entire canonical list (no merge).
+    - load_from_file replaces the entire canonical list; merge_files upserts several files into it.
+      Both are bulk operations: they clear the undo history instead of recording into it.
     """
 
+    # Compaction threshold for dead ScoreMatrix rows (see _maybe_compact)
+    COMPACT_MIN_ROWS = 1024
+
     def __init__(self, filename: str = "students.csv"):
         """
         Initialize SystemManager.
@@ -38,10 +60,23 @@ class SystemManager:
         # Load students from disk into a Python list. Each element is a Student instance.
         self.students: List[Student] = file_io.load_students(self.filepath) or []
 
+        # Next insertion ordinal; every Student gets a unique, increasing one when it joins.
+        self._next_ordinal = 0
+        self._assign_ordinals(self.students)
+
         # Cached index mapping student_id -> Student object for O(1) retrieval.
         self._index: Dict[str, Student] = {}
         self._build_index()
 
+        # Roster-wide score matrix (schema from the file header) and running per-major /
+        # overall aggregates, updated incrementally on every edit.
+        self.scores: ScoreMatrix = ScoreMatrix(Student.DEFAULT_SUBJECTS)
+        self.stats = RosterStats(self.scores.subjects)
+        self._bind_matrix()
+
+        # Bounded undo/redo log of inverse operations (see _apply_op for the op formats).
+        self.history = EditHistory()
+
         # Flag indicating whether in-memory data differs from file on disk.
         self.unsaved_changes = False
 
@@ -55,6 +90,61 @@ class SystemManager:
         """
         self._index = {s.student_id: s for s in self.students}
 
+    def _assign_ordinals(self, students: List[Student]) -> None:
+        """Give students stable insertion ordinals in list order (original order = ordinal order)."""
+        for s in students:
+            s.ordinal = self._next_ordinal
+            self._next_ordinal += 1
+
+    @property
+    def subjects(self) -> Tuple[str, ...]:
+        """Subject schema of the roster (column order of the score matrix and of saved files)."""
+        return self.scores.subjects
+
+    def _bind_matrix(self) -> None:
+        """
+        Make every student use one roster ScoreMatrix and rebuild the aggregates.
+        A freshly loaded file already shares one matrix, which is reused as is.
+        """
+        first = self.students[0].matrix if self.students else None
+        if first is not None and all(s.matrix is first for s in self.students):
+            self.scores = first
+        else:
+            subjects = list(first.subjects) if first is not None else list(Student.DEFAULT_SUBJECTS)
+            for s in self.students:
+                subjects.extend(x for x in s.subjects if x not in subjects)
+            self._relayout(subjects)
+            return
+        self.stats = RosterStats(self.scores.subjects)
+        self.stats.rebuild(self.students)
+
+    def _relayout(self, subjects: List[str]) -> None:
+        """Move every student into a new matrix with `subjects` (widen or compact), then rebuild stats."""
+        matrix = ScoreMatrix(subjects)
+        for s in self.students:
+            s.move_to(matrix)
+        self.scores = matrix
+        self.stats = RosterStats(matrix.subjects)
+        self.stats.rebuild(self.students)
+
+    def _adopt(self, student: Student) -> None:
+        """
+        Move a student joining the roster into self.scores. Subjects the roster lacks widen
+        the schema only if the student actually has a (non-zero) score for them.
+        """
+        if student.matrix is self.scores:
+            return
+        missing = [x for x, v in student.scores.items() if v and x not in self.scores.index]
+        if missing:
+            self._relayout(list(self.scores.subjects) + missing)
+        student.move_to(self.scores)
+
+    def _maybe_compact(self) -> None:
+        """Drop dead matrix rows (left by deletes) once they outnumber the live ones."""
+        dead = self.scores.rows - len(self.students)
+        if dead > max(self.COMPACT_MIN_ROWS, len(self.students)):
+            self._relayout(list(self.scores.subjects))
+
     def _exists_id(self, student_id: str) -> bool:
         """Return True if student_id exists in cached index."""
         return student_id in self._index
@@ -68,26 +158,33 @@ class SystemManager:
         """
         if self._exists_id(student.student_id):
             raise ValueError(f"Student with ID '{student.student_id}' already exists")
+        self._adopt(student)
         self.students.append(student)
+        self._assign_ordinals([student])
         # Keep cache updated incrementally to avoid full rebuild.
         self._index[student.student_id] = student
+        self.stats.add(student)
+        self.history.record(("remove", student), f"add {student.student_id}")
         self.unsaved_changes = True
 
-    def delete_student(self, student_id: str) -> bool:
+    def delete_student(self, student_id: str) -> List[Student]:
         """
-        Remove a student by ID.
+        Remove every student with this ID.
 
-        Returns True if a student was removed, False if not found.
-        After removal we rebuild the cache to ensure consistency.
+        Returns the removed Student objects (more than one when a loaded file repeats the id),
+        an empty list if not found. Each one is logged with its position so undo can put it back.
         """
-        before = len(self.students)
-        self.students = [s for s in self.students if s.student_id != student_id]
-        changed = len(self.students) != before
-        if changed:
-            # Rebuild cache from updated list. Fast for typical class sizes.
-            self._build_index()
-            self.unsaved_changes = True
-        return changed
+        if student_id not in self._index:
+            return []
+        # a loaded file may contain the id more than once: remove (and log) the last one first
+        positions = [i for i, s in enumerate(self.students) if s.student_id == student_id]
+        removed = [self.students[pos] for pos in positions]
+        with self.history.transaction(f"delete {student_id}"):
+            for pos in reversed(positions):
+                self.history.record(self._apply_op(("remove", self.students[pos])))
+        self._maybe_compact()
+        self.unsaved_changes = True
+        return removed
 
     def find_by_id(self, student_id: str) -> Optional[Student]:
         """
@@ -108,7 +205,10 @@ class SystemManager:
         s = self.find_by_id(student_id)
         if not s:
             return False
+        old = s.edit_state()
         s.update_info(name, birth_year, major)
+        self._record_edit(s, old, f"edit {student_id}")
+        self.stats.update(s)
         self.unsaved_changes = True
         return True
 
@@ -121,10 +221,81 @@ class SystemManager:
         s = self.find_by_id(student_id)
         if not s:
             return False
+        old = s.edit_state()
         s.add_score(subject, score)
+        self._record_edit(s, old, f"score {student_id}")
+        self.stats.update(s)
         self.unsaved_changes = True
         return True
 
+    def _record_edit(self, s: Student, old: tuple, label: str) -> None:
+        """Log the pre-edit state of s unless the edit changed nothing."""
+        if s.edit_state() != old:
+            self.history.record(("restore", s, old), label)
+
+    # --- undo / redo ---
+    def _apply_op(self, op: tuple) -> tuple:
+        """
+        Apply one primitive op and return its inverse.
+
+        Op formats (all hold a Student reference plus O(1) extra data):
+          ("insert",  student, position)   put a removed student back at position
+          ("remove",  student)             take a student out of the list
+          ("restore", student, state)      reset fields to a Student.edit_state() tuple
+        """
+        kind, s = op[0], op[1]
+        if kind == "insert":
+            pos = min(op[2], len(self.students))
+            self._adopt(s)
+            self.students.insert(pos, s)
+            self._index[s.student_id] = s
+            self.stats.add(s)
+            return ("remove", s)
+        if kind == "remove":
+            pos = next(i for i, v in enumerate(self.students) if v is s)
+            del self.students[pos]
+            if self._index.get(s.student_id) is s:
+                del self._index[s.student_id]
+            self.stats.remove(s)
+            return ("insert", s, pos)
+        if kind == "restore":
+            current = s.edit_state()
+            s.restore_state(op[2])
+            self.stats.update(s)
+            return ("restore", s, current)
+        raise ValueError(f"Unknown history op '{kind}'")
+
+    def _replay(self, entry, push) -> List[Tuple[str, Student]]:
+        """Apply an entry's ops newest-first, push the inverse entry, and report what changed."""
+        label, ops = entry
+        inverse = []
+        changes = []
+        for op in reversed(ops):
+            inverse.append(self._apply_op(op))
+            changes.append((op[0], op[1]))
+        push((label, inverse))
+        self.unsaved_changes = True
+        return changes
+
+    def undo(self) -> List[Tuple[str, Student]]:
+        """
+        Revert the most recent edit step.
+
+        Returns [(kind, student), ...] with kind "insert" / "remove" / "restore" describing
+        what happened to each student, or [] when there is nothing to undo.
+        """
+        entry = self.history.pop_undo()
+        if entry is None:
+            return []
+        return self._replay(entry, self.history.push_redo)
+
+    def redo(self) -> List[Tuple[str, Student]]:
+        """Re-apply the most recently undone step (same return value as undo)."""
+        entry = self.history.pop_redo()
+        if entry is None:
+            return []
+        return self._replay(entry, self.history.push_undo)
+
     # Sorting helpers: delegate to algorithms.TimSort functions with key extractors.
     def sort_by_gpa(self):
         """Sort students in-place by GPA descending (highest first)."""
@@ -171,12 +342,160 @@ class SystemManager:
         self.unsaved_changes = True
         return True
 
+    def merge_files(self, paths: List[str], policy: str = "upsert", workers: Optional[int] = None) -> dict:
+        """
+        Merge several CSV/XLSX shards into the current roster (hash join on student_id).
+
+        - Shards are streamed row by row, or parsed in parallel processes when workers > 1.
+        - Conflicts (same id, different data) are resolved by `policy` (see MERGE_POLICIES).
+        - Cost is linear in the total number of rows: one dict lookup per incoming row.
+
+        Returns the merge report (see merge_students).
+        """
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"Unknown merge policy '{policy}'")
+        return self.merge_students(file_io.iter_shards(self.merge_order(paths, policy), workers), policy)
+
+    @staticmethod
+    def merge_order(paths: Iterable[str], policy: str) -> List[str]:
+        """Return paths in the order shards must be applied for policy (mtime order for keep-latest)."""
+        paths = [str(p) for p in paths]
+        if policy == "keep-latest":
+            paths.sort(key=os.path.getmtime)
+        return paths
+
+    def merge_students(self, shards: Iterable[Tuple[str, Iterable[Student]]], policy: str = "upsert") -> dict:
+        """
+        Merge already-parsed shards [(source, students), ...] into the roster, in order.
+
+        New ids are appended (canonical order = arrival order). Existing Students are
+        updated in place, so views holding references stay valid.
+
+        Returns a report dict:
+          rows       total incoming rows
+          added      new students appended
+          updated    existing students overwritten by a shard
+          unchanged  incoming rows identical to the current record
+          conflicts  [{student_id, kept, dropped, fields}] where kept/dropped are
+                     "memory" or a file path and fields lists the differing columns
+        """
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"Unknown merge policy '{policy}'")
+        source_of: Dict[str, str] = {}   # student_id -> source of the record currently kept
+        added_ids = set()
+        updated_ids = set()
+        conflicts = []
+        rows = unchanged = 0
+        seen_matrix = None
+
+        for source, students in shards:
+            for s in students:
+                rows += 1
+                if s.matrix is not seen_matrix:
+                    # new shard schema: make room for subjects the roster doesn't have yet
+                    seen_matrix = s.matrix
+                    missing = [x for x in s.subjects if x not in self.scores.index]
+                    if missing:
+                        self._relayout(list(self.scores.subjects) + missing)
+                sid = s.student_id
+                cur = self._index.get(sid)
+                if cur is None:
+                    self._adopt(s)
+                    self.students.append(s)
+                    self._assign_ordinals([s])
+                    self._index[sid] = s
+                    self.stats.add(s)
+                    source_of[sid] = source
+                    added_ids.add(sid)
+                    continue
+
+                subjects = self.scores.subjects
+                cur_row, new_row = cur.to_row(subjects), s.to_row(subjects)
+                if cur_row == new_row:
+                    unchanged += 1
+                    continue
+
+                if policy in ("upsert", "keep-latest"):
+                    take = True
+                elif policy == "score-max":
+                    take = s.gpa > cur.gpa
+                else:
+                    take = False
+                old_source = source_of.get(sid, "memory")
+                conflicts.append({
+                    "student_id": sid,
+                    "kept": source if take else old_source,
+                    "dropped": old_source if take else source,
+                    "fields": [h for h, a, b in zip(file_io.roster_header(subjects), cur_row, new_row)
+                               if a != b],
+                })
+                if take:
+                    cur.assign_from(s)
+                    self.stats.update(cur)
+                    source_of[sid] = source
+                    updated_ids.add(sid)
+
+        if added_ids or updated_ids:
+            self.unsaved_changes = True
+            self.history.clear()
+        return {
+            "rows": rows,
+            "added": len(added_ids),
+            "updated": len(updated_ids - added_ids),
+            "unchanged": unchanged,
+            "conflicts": conflicts,
+        }
+
+    def apply_delta(self, upserts: Iterable[Student], deleted: Iterable[str]) -> Dict[str, List[Student]]:
+        """
+        Apply row-level changes read back from disk (see utils.file_watcher.FileWatcher).
+
+        - upserts: parsed Students; existing ids are updated in place when their data
+          differs, new ids are appended
+        - deleted: ids whose rows disappeared from the file
+
+        Like a load, this clears the undo history; unsaved_changes is left as it was.
+        Returns {"added": [...], "updated": [...], "removed": [...]} with the affected
+        roster Students so views can be patched instead of rebuilt.
+        """
+        removed: List[Student] = []
+        gone = {sid for sid in deleted if sid in self._index}
+        if gone:
+            keep = []
+            for s in self.students:
+                (removed if s.student_id in gone else keep).append(s)
+            self.students = keep
+            for s in removed:
+                self._index.pop(s.student_id, None)
+                self.stats.remove(s)
+
+        added: List[Student] = []
+        updated: List[Student] = []
+        for s in upserts:
+            cur = self._index.get(s.student_id)
+            if cur is None:
+                self._adopt(s)
+                self.students.append(s)
+                self._assign_ordinals([s])
+                self._index[s.student_id] = s
+                self.stats.add(s)
+                added.append(s)
+            elif cur.to_row(self.subjects) != s.to_row(self.subjects):
+                cur.assign_from(s)
+                self.stats.update(cur)
+                updated.append(cur)
+
+        if removed or added or updated:
+            self.history.clear()
+            self._maybe_compact()
+        return {"added": added, "updated": updated, "removed": removed}
+
     def save(self) -> bool:
         """
-        Save students to disk via utils.file_io.save_students.
+        Save students to disk via utils.exporters.save_roster (format chosen by the file suffix).
         Returns True on success; resets unsaved_changes flag.
         """
-        ok = file_io.save_students(self.filepath, self.students)
+        ok = exporters.save_roster(self.filepath, self.students, subjects=self.subjects)
         if ok:
             self.unsaved_changes = False
         return ok
@@ -192,14 +511,27 @@ class SystemManager:
         Returns: number of students loaded.
         """
         loaded = file_io.load_students(filename) or []
+        return self.set_students(loaded, filename)
+
+    def set_students(self, students: List[Student], filename: str) -> int:
+        """
+        Replace current student list with already-loaded students (e.g. parsed by a
+        background worker) and make filename the current file.
+
+        Returns: number of students.
+        """
         p = Path(filename)
         if not p.is_absolute():
             p = Path.cwd() / p
         self.filepath = str(p)
         # replace current students (do not merge)
-        self.students = loaded
-        # Rebuild cache for O(1) lookups
+        self.students = list(students)
+        self._next_ordinal = 0
+        self._assign_ordinals(self.students)
+        # Rebuild cache for O(1) lookups, take over the file's score matrix, recompute aggregates
         self._build_index()
+        self._bind_matrix()
+        self.history.clear()
         self.unsaved_changes = False
         return len(self.students)
 
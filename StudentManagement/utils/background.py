@@ -0,0 +1,86 @@
+from typing import Any, Callable, List, Tuple
+import queue
+import threading
+import time
+
+
+class TaskCancelled(BaseException):
+    """
+    Raised inside a worker when the user cancelled the task.
+
+    Derives from BaseException so the broad `except Exception` handlers in file_io
+    do not swallow it and return partial results as if the operation had succeeded.
+    """
+
+
+class BackgroundTask:
+    """
+    Run a blocking function in a worker thread and hand results back to Tk by polling.
+
+    Usage:
+        task = BackgroundTask(file_io.load_students, path)
+        task.start()
+        ...
+        for msg in task.poll():   # call from Tk via after()
+            ...
+
+    The function is called as fn(*args, progress=task.report). Messages are tuples:
+      ("progress", done, total)   total == 0 means unknown
+      ("done", result)
+      ("error", exception)
+      ("cancelled",)
+    Progress messages are throttled to at most one every PROGRESS_INTERVAL seconds.
+    """
+
+    PROGRESS_INTERVAL = 0.05
+
+    def __init__(self, fn: Callable[..., Any], *args: Any):
+        self._fn = fn
+        self._args = args
+        self._queue: "queue.Queue[Tuple]" = queue.Queue()
+        self._cancel = threading.Event()
+        self._last_report = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BackgroundTask":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Request cancellation; the worker stops at its next progress report."""
+        self._cancel.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def report(self, done: int, total: int = 0) -> None:
+        """Progress callback passed to the worker function (runs in the worker thread)."""
+        if self._cancel.is_set():
+            raise TaskCancelled()
+        now = time.monotonic()
+        if now - self._last_report >= self.PROGRESS_INTERVAL or (total and done >= total):
+            self._last_report = now
+            self._queue.put(("progress", done, total))
+
+    def poll(self) -> List[Tuple]:
+        """Return all messages queued since the last poll (never blocks)."""
+        msgs = []
+        while True:
+            try:
+                msgs.append(self._queue.get_nowait())
+            except queue.Empty:
+                return msgs
+
+    def _run(self) -> None:
+        try:
+            result = self._fn(*self._args, progress=self.report)
+        except TaskCancelled:
+            self._queue.put(("cancelled",))
+        except Exception as ex:
+            self._queue.put(("error", ex))
+        else:
+            if self._cancel.is_set():
+                self._queue.put(("cancelled",))
+            else:
+                self._queue.put(("done", result))
@@ -0,0 +1,140 @@
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Sequence, Tuple
+from models.student import Student
+from models.score_matrix import ScoreMatrix
+import json
+import struct
+import sys
+
+"""
+Columnar binary roster format (".scol") for fast reload.
+
+Layout (all numbers little-endian):
+    MAGIC (8 bytes) | header length (uint32) | header (UTF-8 JSON) | column blocks
+
+The header holds the row count, the subject schema, the distinct majors and, for every
+column, [typecode, offset, nbytes]. Column blocks start at 8-byte aligned offsets:
+    id / name      UTF-8 blob ("id_blob") + end offsets per row (array 'Q', "id_ends")
+    major          index into header["majors"] per row (array 'I')
+    birth_year     array 'i'
+    gpa            array 'd' (stored as-is, not recomputed)
+    scores         array 'd', row-major (rows x subjects): exactly ScoreMatrix.data
+
+Reloading therefore needs no text parsing: the score block becomes the roster's
+ScoreMatrix buffer in one copy and only ids/names are decoded per row.
+"""
+
+MAGIC = b"STCOL\x00\x01\n"
+SUFFIX = ".scol"
+_ALIGN = 8
+_SWAP = sys.byteorder != "little"
+
+
+def write_columnar(f: BinaryIO, students: Iterable[Student], subjects: Sequence[str]) -> int:
+    """
+    Write students (any iterable, consumed once) to the binary file object f.
+    Columns are buffered as compact arrays until the iterable is exhausted.
+    Returns the number of rows written.
+    """
+    subjects = tuple(subjects)
+    id_blob, name_blob = bytearray(), bytearray()
+    id_ends, name_ends = array("Q"), array("Q")
+    major_codes, births, gpas, scores = array("I"), array("i"), array("d"), array("d")
+    majors = {}
+    n = 0
+    for s in students:
+        id_blob += s.student_id.encode("utf-8")
+        id_ends.append(len(id_blob))
+        name_blob += s.name.encode("utf-8")
+        name_ends.append(len(name_blob))
+        code = majors.get(s.major)
+        if code is None:
+            code = majors[s.major] = len(majors)
+        major_codes.append(code)
+        births.append(s.birth_year)
+        gpas.append(s.gpa)
+        if s.subjects == subjects:
+            scores.extend(s.matrix.row(s.row_index))
+        else:
+            scores.extend(s.get_score(subj) for subj in subjects)
+        n += 1
+
+    blocks = [("id_blob", "B", id_blob), ("id_ends", "Q", id_ends),
+              ("name_blob", "B", name_blob), ("name_ends", "Q", name_ends),
+              ("major", "I", major_codes), ("birth_year", "i", births),
+              ("gpa", "d", gpas), ("scores", "d", scores)]
+    payloads = []
+    for name, typecode, data in blocks:
+        if _SWAP and isinstance(data, array):
+            data = array(typecode, data)
+            data.byteswap()
+        payloads.append((name, typecode, bytes(data)))
+
+    # offsets are relative to the first column block, which starts aligned after the header
+    columns = {}
+    offset = 0
+    for name, typecode, raw in payloads:
+        columns[name] = [typecode, offset, len(raw)]
+        offset += len(raw) + (-len(raw)) % _ALIGN
+    header = json.dumps({"rows": n, "subjects": list(subjects), "majors": list(majors),
+                         "columns": columns}, ensure_ascii=False).encode("utf-8")
+    header += b" " * ((-(len(MAGIC) + 4 + len(header))) % _ALIGN)
+
+    f.write(MAGIC)
+    f.write(struct.pack("<I", len(header)))
+    f.write(header)
+    for _name, _typecode, raw in payloads:
+        f.write(raw)
+        f.write(b"\0" * ((-len(raw)) % _ALIGN))
+    return n
+
+
+def _read_header(data: memoryview) -> Tuple[dict, int]:
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a columnar roster file (bad magic)")
+    (size,) = struct.unpack_from("<I", data, len(MAGIC))
+    start = len(MAGIC) + 4
+    return json.loads(bytes(data[start:start + size]).decode("utf-8")), start + size
+
+
+def read_columnar(filename: str) -> List[Student]:
+    """Load every Student of a .scol file; all share one ScoreMatrix (raises ValueError if corrupt)."""
+    data = memoryview(Path(filename).read_bytes())
+    header, base = _read_header(data)
+    n = header["rows"]
+    subjects = header["subjects"]
+
+    def column(name: str):
+        typecode, offset, nbytes = header["columns"][name]
+        if base + offset + nbytes > len(data):
+            raise ValueError(f"Truncated columnar file (column {name})")
+        raw = data[base + offset:base + offset + nbytes]
+        if typecode == "B":
+            return bytes(raw)
+        a = array(typecode)
+        a.frombytes(raw)
+        if _SWAP:
+            a.byteswap()
+        return a
+
+    id_blob, id_ends = column("id_blob"), column("id_ends")
+    name_blob, name_ends = column("name_blob"), column("name_ends")
+    majors = header["majors"]
+    codes, births, gpas, scores = column("major"), column("birth_year"), column("gpa"), column("scores")
+    if not (len(id_ends) == len(name_ends) == len(codes) == len(births) == len(gpas) == n
+            and len(scores) == n * len(subjects)):
+        raise ValueError("Inconsistent column lengths in columnar file")
+
+    # the stored score block becomes the matrix buffer as is; student i owns row i
+    matrix = ScoreMatrix(subjects)
+    matrix.data = scores
+    matrix.rows = n
+    bound = Student.bound
+    students = []
+    id_start = name_start = 0
+    for i, (id_end, name_end, code, birth, gpa) in enumerate(zip(id_ends, name_ends, codes, births, gpas)):
+        students.append(bound(matrix, i, id_blob[id_start:id_end].decode("utf-8"),
+                              name_blob[name_start:name_end].decode("utf-8"), birth, majors[code], gpa))
+        id_start, name_start = id_end, name_end
+    return students
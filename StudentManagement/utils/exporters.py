@@ -0,0 +1,208 @@
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from models.student import Student
+from utils import columnar, perf
+from utils.file_io import PROGRESS_EVERY, ProgressCallback, export_xlsx, roster_header, save_students
+import csv
+import gzip
+import io
+import itertools
+import json
+import lzma
+import os
+import tempfile
+
+"""
+Registry of streaming roster exporters.
+
+Every exporter consumes a Student iterator once (a filtered view, a sorted stream, a
+generator over a file...) and writes rows as they come, so no intermediate list is
+built (the columnar format buffers compact column arrays, not Students).
+
+    export_students("out.csv.gz", iter_matches(sm.students, criteria))
+    export_students("out.bin", students, fmt="scol")
+
+Built-in formats (name: suffixes):
+    csv:    .csv             same layout as save_students
+    csv.gz: .csv.gz          gzip-compressed CSV
+    csv.xz: .csv.xz          xz-compressed CSV
+    jsonl:  .jsonl, .ndjson  one Student.to_dict(subjects) JSON object per line
+    xlsx:   .xlsx            write-only openpyxl workbook (requires openpyxl)
+    scol:   .scol            columnar binary, see utils.columnar (fast reload)
+
+register_exporter() adds more; files are written to a temp file and moved into place.
+"""
+
+# Compression settings: favour throughput over the last few percent of size
+GZIP_LEVEL = 6
+XZ_PRESET = 3
+
+# writer(binary file, students iterator, subjects)
+Writer = Callable[[BinaryIO, Iterator[Student], Tuple[str, ...]], None]
+
+
+class Exporter:
+    """One registered output format."""
+
+    __slots__ = ("name", "suffixes", "description", "write", "loadable")
+
+    def __init__(self, name: str, suffixes: Sequence[str], description: str, write: Writer,
+                 loadable: bool = False):
+        self.name = name
+        self.suffixes = tuple(s.lower() for s in suffixes)
+        self.description = description
+        self.write = write
+        # True if file_io.load_students reads this format back
+        self.loadable = loadable
+
+    def __repr__(self):
+        return f"<Exporter {self.name} {list(self.suffixes)}>"
+
+
+# format name -> Exporter, in registration order
+EXPORTERS: Dict[str, Exporter] = {}
+
+
+def register_exporter(name: str, suffixes: Sequence[str], description: str,
+                      loadable: bool = False) -> Callable[[Writer], Writer]:
+    """Decorator registering writer(binary_file, students, subjects) as format name."""
+    def decorate(write: Writer) -> Writer:
+        EXPORTERS[name] = Exporter(name, suffixes, description, write, loadable)
+        return write
+    return decorate
+
+
+def exporter_for(filename: str) -> Optional[Exporter]:
+    """Exporter whose suffix matches filename (longest suffix wins: .csv.gz before .csv)."""
+    lower = str(filename).lower()
+    best, best_len = None, 0
+    for exp in EXPORTERS.values():
+        for suffix in exp.suffixes:
+            if lower.endswith(suffix) and len(suffix) > best_len:
+                best, best_len = exp, len(suffix)
+    return best
+
+
+def filetypes() -> List[Tuple[str, str]]:
+    """(description, "*.suffix ...") pairs for file dialogs, in registration order."""
+    return [(exp.description, " ".join(f"*{s}" for s in exp.suffixes)) for exp in EXPORTERS.values()]
+
+
+def _with_progress(students: Iterable[Student], progress: ProgressCallback, total: int,
+                   counter: List[int]) -> Iterator[Student]:
+    """Pass students through, counting them and reporting progress every PROGRESS_EVERY rows."""
+    n = 0
+    for n, s in enumerate(students, start=1):
+        if progress and n % PROGRESS_EVERY == 0:
+            progress(n, total)
+        yield s
+    counter[0] = n
+
+
+@perf.timed()
+def export_students(filename: str, students: Iterable[Student], fmt: Optional[str] = None,
+                    progress: ProgressCallback = None, subjects: Optional[Sequence[str]] = None) -> int:
+    """
+    Stream students into filename and return the number of rows written.
+
+    - fmt: a registered format name (default: chosen from the file suffix, CSV if unknown)
+    - subjects: score columns (default: the first student's schema, peeked without
+      materializing the iterable)
+    - progress(done, total) every PROGRESS_EVERY rows (total 0 when students has no len)
+
+    Raises KeyError for an unknown fmt, ImportError if the format needs a missing
+    package, OSError on write errors; the target is then left untouched.
+    """
+    exporter = EXPORTERS[fmt] if fmt is not None else (exporter_for(filename) or EXPORTERS["csv"])
+    total = len(students) if hasattr(students, "__len__") else 0
+    it = iter(students)
+    if subjects is None:
+        first = next(it, None)
+        subjects = first.subjects if first is not None else Student.DEFAULT_SUBJECTS
+        if first is not None:
+            it = itertools.chain([first], it)
+    subjects = tuple(subjects)
+
+    path = Path(filename)
+    if not path.is_absolute():
+        path = Path.cwd() / path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    counter = [0]
+    # temp file next to the target so the final replace stays on one filesystem
+    fd, tmp = tempfile.mkstemp(prefix=".export-", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            exporter.write(f, _with_progress(it, progress, total, counter), subjects)
+        os.replace(tmp, path)
+        tmp = None
+    finally:
+        if tmp is not None and os.path.exists(tmp):
+            os.unlink(tmp)
+    rows = counter[0]
+    perf.count(f"export_students.{exporter.name}.rows", rows)
+    if progress:
+        progress(rows, total or rows)
+    return rows
+
+
+def save_roster(filename: str, students: List[Student], progress: ProgressCallback = None,
+                subjects: Optional[Sequence[str]] = None) -> bool:
+    """
+    Save a roster in the format its file suffix names (CSV for .csv and unknown suffixes).
+    Used by every save path so a roster kept as .scol / .xlsx is never rewritten as CSV.
+
+    Returns True on success, False on failure (logged to the console, like file_io.save_students).
+    """
+    exporter = exporter_for(filename)
+    if exporter is None or exporter.name == "csv":
+        return save_students(filename, students, progress, subjects)
+    try:
+        export_students(filename, students, exporter.name, progress, subjects)
+    except (OSError, ImportError, ValueError) as ex:
+        print("File save error:", ex)
+        return False
+    return True
+
+
+# --- built-in formats ---
+def _write_csv_text(text: io.TextIOBase, students: Iterator[Student], subjects: Tuple[str, ...]) -> None:
+    writer = csv.writer(text)
+    writer.writerow(roster_header(subjects))
+    writer.writerows(s.to_row(subjects) for s in students)
+
+
+@register_exporter("csv", (".csv",), "CSV file", loadable=True)
+def _write_csv(f: BinaryIO, students: Iterator[Student], subjects: Tuple[str, ...]) -> None:
+    with io.TextIOWrapper(f, encoding="utf-8", newline="") as text:
+        _write_csv_text(text, students, subjects)
+
+
+@register_exporter("csv.gz", (".csv.gz",), "Gzip-compressed CSV")
+def _write_csv_gz(f: BinaryIO, students: Iterator[Student], subjects: Tuple[str, ...]) -> None:
+    with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=GZIP_LEVEL, filename="") as z, \
+            io.TextIOWrapper(z, encoding="utf-8", newline="") as text:
+        _write_csv_text(text, students, subjects)
+
+
+@register_exporter("csv.xz", (".csv.xz",), "XZ-compressed CSV")
+def _write_csv_xz(f: BinaryIO, students: Iterator[Student], subjects: Tuple[str, ...]) -> None:
+    with lzma.LZMAFile(f, mode="wb", preset=XZ_PRESET) as z, \
+            io.TextIOWrapper(z, encoding="utf-8", newline="") as text:
+        _write_csv_text(text, students, subjects)
+
+
+@register_exporter("jsonl", (".jsonl", ".ndjson"), "JSON Lines")
+def _write_jsonl(f: BinaryIO, students: Iterator[Student], subjects: Tuple[str, ...]) -> None:
+    with io.TextIOWrapper(f, encoding="utf-8", newline="\n") as text:
+        dumps = json.dumps
+        text.writelines(dumps(s.to_dict(subjects), ensure_ascii=False) + "\n" for s in students)
+
+
+@register_exporter("xlsx", (".xlsx",), "Excel workbook", loadable=True)
+def _write_xlsx(f: BinaryIO, students: Iterator[Student], subjects: Tuple[str, ...]) -> None:
+    export_xlsx(f, students, subjects=subjects)
+
+
+@register_exporter("scol", (columnar.SUFFIX,), "Columnar binary (fast reload)", loadable=True)
+def _write_scol(f: BinaryIO, students: Iterator[Student], subjects: Tuple[str, ...]) -> None:
+    columnar.write_columnar(f, students, subjects)
@@ -1,54 +1,109 @@
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 from models.student import Student
+from models.score_matrix import ScoreMatrix, subjects_from_header
+from utils import columnar, perf
+import os
 import tempfile
 import shutil
 import csv
+import itertools
 
+# Optional progress callback: progress(done, total); total == 0 means unknown.
+# It may raise (e.g. utils.background.TaskCancelled) to abort the operation.
+ProgressCallback = Optional[Callable[[int, int], None]]
 
-def save_students(filename: str, students: List[Student]) -> bool:
+# Report progress every N rows
+PROGRESS_EVERY = 1000
+
+# File suffixes read through openpyxl
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xltx", ".xltm")
+
+
+def roster_header(subjects: Sequence[str]) -> List[str]:
+    """Return the CSV/XLSX header row for a subject schema."""
+    return ["student_id", "name", "birth_year", "major", *subjects, "gpa"]
+
+
+def roster_subjects(students: Sequence[Student]) -> Sequence[str]:
+    """Subject schema of a student list (the first student's; DEFAULT_SUBJECTS when empty)."""
+    return students[0].subjects if students else Student.DEFAULT_SUBJECTS
+
+
+def _matrix_for(first_row) -> Tuple[ScoreMatrix, bool]:
+    """Return (ScoreMatrix for a file, whether first_row is a header) from the file's first row."""
+    subjects = subjects_from_header(first_row)
+    if subjects is None:
+        # headerless files use the classic 9-column layout
+        return ScoreMatrix(Student.DEFAULT_SUBJECTS), False
+    return ScoreMatrix(subjects), True
+
+
+@perf.timed()
+def save_students(filename: str, students: List[Student], progress: ProgressCallback = None,
+                  subjects: Optional[Sequence[str]] = None) -> bool:
     """
-    Atomically write the students list to a CSV file (9 columns).
+    Atomically write the students list to a CSV file (5 + <subject count> columns).
 
     Format:
-      Header: student_id,name,birth_year,major,<DEFAULT_SUBJECTS...>,gpa
+      Header: student_id,name,birth_year,major,<subjects...>,gpa
+      subjects defaults to the students' schema (see roster_subjects).
 
     Implementation details:
     - Writes to a temporary file then moves it into place to avoid partial writes.
     - Returns True on success, False on failure (caller can inspect console logs).
+    - progress(done, total) is called every PROGRESS_EVERY rows; if it raises, the temp
+      file is removed, the target is left untouched and the exception propagates.
     """
+    tmp_path = None
     try:
         path = Path(filename)
         # if relative, use current working dir
         if not path.is_absolute():
             path = Path.cwd() / path
         path.parent.mkdir(parents=True, exist_ok=True)
+        total = len(students)
 
         # write to a temp file then replace atomically
         with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False, newline="") as tmp:
+            tmp_path = Path(tmp.name)
             writer = csv.writer(tmp)
             # header row (Excel-friendly)
-            header = ["student_id", "name", "birth_year", "major"] + Student.DEFAULT_SUBJECTS + ["gpa"]
-            writer.writerow(header)
-            for s in students:
-                writer.writerow(s.to_row())
-            tmp_path = Path(tmp.name)
+            subjects = tuple(subjects if subjects is not None else roster_subjects(students))
+            writer.writerow(roster_header(subjects))
+            for i, s in enumerate(students, start=1):
+                writer.writerow(s.to_row(subjects))
+                if progress and i % PROGRESS_EVERY == 0:
+                    progress(i, total)
         shutil.move(str(tmp_path), str(path))
+        tmp_path = None
+        perf.count("save_students.rows", total)
+        if progress:
+            progress(total, total)
         return True
     except Exception as ex:
         # Simple logging for failure; caller can present a UI message.
         print("File save error:", ex)
         return False
+    finally:
+        # cancelled or failed before the move: don't leave temp files behind
+        if tmp_path is not None and tmp_path.exists():
+            os.unlink(tmp_path)
 
 
-def load_students(filename: str) -> List[Student]:
+@perf.timed()
+def load_students(filename: str, progress: ProgressCallback = None) -> List[Student]:
     """
     Read students from CSV or Excel workbook and return a list of Student objects.
 
     Notes:
     - Excel reading requires openpyxl; if missing, function returns an empty list and prints a hint.
+    - Columnar binary files (utils.columnar, ".scol") are read without any text parsing.
     - Header detection is heuristic (looks for common header words); both header and non-header files supported.
+    - Subject columns are read from the header; all returned students share one ScoreMatrix
+      (headerless files use Student.DEFAULT_SUBJECTS).
     - Malformed rows are skipped with a console message.
+    - progress(done, total) is called every PROGRESS_EVERY rows (exceptions it raises propagate).
     """
     students: List[Student] = []
     try:
@@ -56,42 +111,23 @@ def load_students(filename: str) -> List[Student]:
         if not path.is_absolute():
             path = Path.cwd() / path
 
+        # --- columnar binary (written by utils.exporters) ---
+        if path.suffix.lower() == columnar.SUFFIX:
+            students = columnar.read_columnar(path)
+            perf.count("load_students.rows", len(students))
+            return students
+
         # --- Excel (.xlsx) support ---
-        if path.suffix.lower() in (".xlsx", ".xlsm", ".xltx", ".xltm"):
+        if path.suffix.lower() in EXCEL_SUFFIXES:
             try:
                 import openpyxl
             except Exception:
                 print("openpyxl is required to load Excel files. Install with: pip install openpyxl")
                 return students
 
-            wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-            ws = wb.active
-            rows = ws.iter_rows(values_only=True)
-
-            # Peek first row to decide if it's a header row
-            first = next(rows, None)
-            if first is None:
-                return students
-
-            hdr_candidates = [str(c).strip().lower() for c in first if c is not None]
-            header_like = any(h in ("student_id", "id", "name", "birth", "birth year", "major", "gpa") for h in hdr_candidates)
-
-            data_rows = [] if header_like else [first]
-            data_rows.extend(rows)
-
-            for lineno, row in enumerate(data_rows, start=1):
-                # skip empty rows
-                if not row or all(cell is None or str(cell).strip() == "" for cell in row):
-                    continue
-                try:
-                    # Normalize to length 9
-                    cells = list(row) + [""] * max(0, 9 - len(row))
-                    # Use Student.from_row to construct
-                    s = Student.from_row(cells[:9])
-                    students.append(s)
-                except Exception as e:
-                    print(f"Skipping malformed Excel row {lineno}: {e}")
-                    continue
+            # all-or-nothing like the CSV path: a failing workbook yields no partial roster
+            students = list(iter_students_xlsx(path, progress))
+            perf.count("load_students.rows", len(students))
             return students
 
         # --- CSV/text fallback ---
@@ -102,45 +138,200 @@ def load_students(filename: str) -> List[Student]:
             rows = list(reader)
             if not rows:
                 return students
-            # Detect header row by checking common header keywords
-            first = rows[0]
-            hdr = [str(c).strip().lower() for c in first if c is not None]
-            header_like = any(h in ("student_id", "id", "name", "birth", "birth year", "major", "gpa") for h in hdr)
+            # Detect header row by checking common header keywords; it also defines the subjects
+            matrix, header_like = _matrix_for(rows[0])
+            width = 5 + matrix.width
             data_rows = rows[1:] if header_like else rows
+            total = len(data_rows)
             for lineno, row in enumerate(data_rows, start=1):
+                if progress and lineno % PROGRESS_EVERY == 0:
+                    progress(lineno, total)
                 if not row or all(not str(c).strip() for c in row):
                     continue
                 try:
-                    # Normalize to length 9 and create Student
-                    s = Student.from_row(row[:9])
+                    # Trim to the schema's width and create Student
+                    s = Student.from_row(row[:width], matrix)
                     students.append(s)
                 except Exception as e:
                     print(f"Skipping malformed CSV row {lineno}: {e}")
                     continue
+            if progress:
+                progress(total, total)
+            perf.count("load_students.rows", len(students))
     except Exception as ex:
         print("File load error:", ex)
     return students
 
 
-def export_xlsx(filename: str, students: List[Student]) -> None:
+def iter_students_xlsx(filename: str, progress: ProgressCallback = None) -> Iterator[Student]:
+    """
+    Lazily yield Students from the active sheet of an Excel workbook.
+
+    - Uses openpyxl read-only mode and iter_rows, so rows are never collected in a list.
+    - progress(done, total) every PROGRESS_EVERY rows; total is the sheet's max_row
+      (0 when the workbook does not record its dimensions).
+    - Raises ImportError if openpyxl is not installed; malformed rows are skipped with a console message.
+    """
+    try:
+        import openpyxl
+    except Exception:
+        raise ImportError("openpyxl not installed")
+
+    wb = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        total = ws.max_row or 0
+        rows = ws.iter_rows(values_only=True)
+
+        # Peek first row to decide if it's a header row
+        first = next(rows, None)
+        if first is None:
+            return
+        matrix, header_like = _matrix_for(first)
+        width = 5 + matrix.width
+        if not header_like:
+            rows = itertools.chain([first], rows)
+        else:
+            total = max(0, total - 1)
+
+        lineno = 0
+        for lineno, row in enumerate(rows, start=1):
+            if progress and lineno % PROGRESS_EVERY == 0:
+                progress(lineno, total)
+            # skip empty rows
+            if not row or all(cell is None or str(cell).strip() == "" for cell in row):
+                continue
+            try:
+                # Normalize to the schema's width and use Student.from_row to construct
+                cells = list(row[:width]) + [""] * max(0, width - len(row))
+                yield Student.from_row(cells, matrix)
+            except Exception as e:
+                print(f"Skipping malformed Excel row {lineno}: {e}")
+                continue
+        if progress:
+            progress(lineno, max(total, lineno))
+    finally:
+        # read-only workbooks keep the file handle open until closed
+        wb.close()
+
+
+def iter_students_csv(filename: str, progress: ProgressCallback = None) -> Iterator[Student]:
+    """
+    Lazily yield Students from a CSV file without reading it into memory.
+
+    progress(done, total) is reported in bytes (file position / file size) every
+    PROGRESS_EVERY rows. Header/subject detection and malformed-row handling match load_students.
+    """
+    path = Path(filename)
+    if not path.exists():
+        return
+    total = path.stat().st_size
+    with path.open("r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+        matrix, header_like = _matrix_for(first)
+        width = 5 + matrix.width
+        rows = reader if header_like else itertools.chain([first], reader)
+        for lineno, row in enumerate(rows, start=1):
+            if progress and lineno % PROGRESS_EVERY == 0:
+                # buffered byte position: chunk-granular but cheap
+                progress(f.buffer.tell(), total)
+            if not row or all(not str(c).strip() for c in row):
+                continue
+            try:
+                yield Student.from_row(row[:width], matrix)
+            except Exception as e:
+                print(f"Skipping malformed CSV row {lineno}: {e}")
+                continue
+    if progress:
+        progress(total, total)
+
+
+def iter_students(filename: str, progress: ProgressCallback = None) -> Iterator[Student]:
+    """Lazily yield Students from a CSV or Excel file (dispatch on suffix; columnar files are read whole)."""
+    suffix = Path(filename).suffix.lower()
+    if suffix == columnar.SUFFIX:
+        return iter(columnar.read_columnar(filename))
+    if suffix in EXCEL_SUFFIXES:
+        return iter_students_xlsx(filename, progress)
+    return iter_students_csv(filename, progress)
+
+
+def iter_shards(paths: List[str], workers: Optional[int] = None,
+                progress: ProgressCallback = None) -> Iterator[Tuple[str, Iterable[Student]]]:
+    """
+    Yield (path, students) for each file in order.
+
+    - workers > 1 with several paths: shards are parsed in parallel worker processes
+      (load_students per file) and yielded as lists, still in input order.
+    - otherwise each shard is a lazy generator (streaming, one row in memory at a time).
+    progress(done, total) counts completed shards.
+    """
+    paths = [str(p) for p in paths]
+    total = len(paths)
+    if workers is not None and workers > 1 and total > 1:
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=min(workers, total))
+        except (ImportError, NotImplementedError, OSError):
+            executor = None
+        if executor is not None:
+            with executor:
+                for done, (path, shard) in enumerate(zip(paths, executor.map(load_students, paths)), start=1):
+                    yield path, shard
+                    if progress:
+                        progress(done, total)
+            return
+    for done, path in enumerate(paths, start=1):
+        yield path, iter_students(path)
+        if progress:
+            progress(done, total)
+
+
+def load_shards(paths: List[str], workers: Optional[int] = None,
+                progress: ProgressCallback = None) -> List[Tuple[str, List[Student]]]:
+    """Parse several files (in parallel when workers > 1) and return [(path, students), ...]."""
+    return [(path, list(shard)) for path, shard in iter_shards(paths, workers, progress)]
+
+
+def export_xlsx(filename: str, students: Iterable[Student], progress: ProgressCallback = None,
+                subjects: Optional[Sequence[str]] = None) -> None:
     """
     Export students to an .xlsx workbook.
 
     Requires openpyxl. Raises ImportError if not installed.
-    Writes a header row then one row per student using Student.to_row().
+    Uses a write-only (streaming) workbook: rows are serialized as they are appended,
+    so memory stays flat regardless of roster size. `students` may be any iterable.
+    Writes a header row then one row per student using Student.to_row(); subjects
+    defaults to the first student's schema.
+    progress(done, total) is called every PROGRESS_EVERY rows (total 0 if unknown).
     """
     try:
-        import openpyxl
         from openpyxl import Workbook
     except Exception:
         raise ImportError("openpyxl not installed")
 
-    wb = Workbook()
-    ws = wb.active
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Students")
+    total = len(students) if hasattr(students, "__len__") else 0
+    it = iter(students)
+    if subjects is None:
+        # peek the first student for the schema without materializing the iterable
+        first = next(it, None)
+        subjects = first.subjects if first is not None else Student.DEFAULT_SUBJECTS
+        if first is not None:
+            it = itertools.chain([first], it)
+    subjects = tuple(subjects)
     # header matching CSV format
-    header = ["student_id", "name", "birth_year", "major"] + Student.DEFAULT_SUBJECTS + ["gpa"]
-    ws.append(header)
-    for s in students:
-        ws.append(s.to_row())
+    ws.append(roster_header(subjects))
+    done = 0
+    for done, s in enumerate(it, start=1):
+        ws.append(s.to_row(subjects))
+        if progress and done % PROGRESS_EVERY == 0:
+            progress(done, total)
     # save workbook (overwrites atomically via temp file not necessary here)
-    ws.parent.save(filename)
\ No newline at end of file
+    wb.save(filename)
+    if progress:
+        progress(done, total or done)
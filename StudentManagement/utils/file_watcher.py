@@ -0,0 +1,214 @@
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from models.student import Student
+from models.score_matrix import ScoreMatrix, subjects_from_header
+from utils.file_io import EXCEL_SUFFIXES, PROGRESS_EVERY, ProgressCallback
+import csv
+import io
+import os
+
+"""
+Detect external edits of the roster file and turn them into row-level deltas.
+
+The watcher remembers the file's (mtime, size) signature and a hash of every data
+row keyed by student_id. changed() is a cheap stat() for a UI timer; read_changes()
+re-reads the file (only the new tail when the file was merely appended to), hashes
+the rows, and parses into Students only the rows whose hash is new or different.
+
+Workflow (read_changes/snapshot may run in a worker thread; commit on the main thread):
+    delta = watcher.read_changes()
+    sm.apply_delta(delta.upserts, delta.deleted)
+    watcher.commit(delta)
+"""
+
+# Bytes compared at the start and before the old end of the file to detect pure appends
+_PROBE = 4096
+
+
+class RosterDelta:
+    """
+    Row-level difference between the last committed file state and the file on disk.
+
+    - upserts: parsed Students for new or edited rows
+    - deleted: student_ids whose rows disappeared
+    - reload:  True when the header (subject schema) changed; upserts then hold every
+               row and the caller should replace the roster instead of patching it
+    - baseline: True for snapshot() results (state only, nothing to apply)
+    """
+
+    def __init__(self, signature, header, hashes, probe, upserts=None, deleted=None,
+                 reload: bool = False, baseline: bool = False):
+        self.signature = signature
+        self.header = header
+        self.hashes = hashes
+        self.probe = probe
+        self.upserts: List[Student] = upserts or []
+        self.deleted: List[str] = deleted or []
+        self.reload = reload
+        self.baseline = baseline
+
+    def __bool__(self):
+        return bool(self.upserts or self.deleted or self.reload)
+
+    def __repr__(self):
+        return f"<RosterDelta +/~{len(self.upserts)} -{len(self.deleted)} reload={self.reload}>"
+
+
+class FileWatcher:
+    """
+    Poll one roster file (CSV or Excel) for external changes.
+
+    Notes:
+    - Row hashes use Python's hash() of the row's cells: they are only compared within
+      one process, never stored.
+    - Appends to a CSV (first and last bytes before the old end unchanged) are read from
+      the old end on; any other change re-reads the file but re-parses only changed rows.
+    - Duplicate ids in the file: the last row wins, as in SystemManager.merge_students.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._signature: Optional[Tuple[int, int]] = None
+        self._header: Optional[Tuple[str, ...]] = None
+        self._hashes: Dict[str, int] = {}
+        self._probe: Tuple[bytes, bytes] = (b"", b"")
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of the file, or None if it does not exist."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def changed(self) -> bool:
+        """Cheap check (one stat call): has the file changed since the last commit?"""
+        sig = self.signature()
+        return sig is not None and sig != self._signature
+
+    def commit(self, delta: RosterDelta) -> None:
+        """Adopt the file state a delta was computed from (call after applying it)."""
+        self._signature = delta.signature
+        self._header = delta.header
+        self._hashes = delta.hashes
+        self._probe = delta.probe
+
+    def snapshot(self, progress: ProgressCallback = None) -> RosterDelta:
+        """Hash the current file without parsing any Student (initial state / after our own save)."""
+        sig = self.signature()
+        header, rows = self._read_rows(0, progress)
+        hashes = {sid: h for sid, h, _row in rows}
+        return RosterDelta(sig, header, hashes, self._read_probe(sig), baseline=True)
+
+    def read_changes(self, progress: ProgressCallback = None) -> RosterDelta:
+        """Compute the delta between the committed state and the file on disk."""
+        sig = self.signature()
+        appended = self._appended(sig)
+        header, rows = self._read_rows(self._signature[1] if appended else 0, progress)
+        probe = self._read_probe(sig)
+        matrix = ScoreMatrix(header or Student.DEFAULT_SUBJECTS)
+
+        if header != self._header:
+            # schema changed: every row must be rebuilt against the new subject list
+            upserts = list(self._parse(((sid, row) for sid, _h, row in rows), matrix))
+            return RosterDelta(sig, header, {sid: h for sid, h, _row in rows}, probe, upserts, reload=True)
+
+        # last row wins for duplicate ids (both for hashes and for the cells to parse)
+        hashes = dict(self._hashes) if appended else {}
+        cells_of = {}
+        for sid, h, row in rows:
+            hashes[sid] = h
+            cells_of[sid] = row
+        upserts = list(self._parse(((sid, row) for sid, row in cells_of.items()
+                                    if self._hashes.get(sid) != hashes[sid]), matrix))
+        deleted = [] if appended else [sid for sid in self._hashes if sid not in hashes]
+        return RosterDelta(sig, header, hashes, probe, upserts, deleted)
+
+    # --- helpers ---
+    def _appended(self, sig) -> bool:
+        """True if the file only grew since the last commit (CSV only)."""
+        old = self._signature
+        if old is None or sig is None or Path(self.path).suffix.lower() in EXCEL_SUFFIXES:
+            return False
+        if sig[1] <= old[1] or self._probe_at(old[1]) != self._probe:
+            return False
+        # the old content must have ended with a complete line
+        return self._probe[1].endswith(b"\n")
+
+    def _read_probe(self, sig) -> Tuple[bytes, bytes]:
+        """First _PROBE bytes and last _PROBE bytes of the file (for append detection)."""
+        if sig is None or Path(self.path).suffix.lower() in EXCEL_SUFFIXES:
+            return (b"", b"")
+        return self._probe_at(sig[1])
+
+    def _probe_at(self, end: int) -> Tuple[bytes, bytes]:
+        """First _PROBE bytes, and the _PROBE bytes before offset end."""
+        try:
+            with open(self.path, "rb") as f:
+                head = f.read(min(_PROBE, end))
+                f.seek(max(0, end - _PROBE))
+                tail = f.read(min(_PROBE, end))
+        except OSError:
+            return (b"", b"")
+        return (head, tail)
+
+    def _read_rows(self, offset: int, progress: ProgressCallback = None
+                   ) -> Tuple[Optional[Tuple[str, ...]], List[Tuple[str, int, Sequence]]]:
+        """
+        Return (subjects or None if headerless, [(student_id, row_hash, cells), ...]).
+        offset > 0 reads a CSV from that byte on (no header expected there).
+        """
+        rows_iter = self._iter_raw_rows(offset)
+        header = None
+        out = []
+        first = offset == 0
+        width = None
+        for n, row in enumerate(rows_iter, start=1):
+            if progress and n % PROGRESS_EVERY == 0:
+                progress(n, 0)
+            if first:
+                first = False
+                subjects = subjects_from_header(row)
+                if subjects is not None:
+                    header = tuple(subjects)
+                    width = 5 + len(subjects)
+                    continue
+            if width is None:
+                width = 5 + len(self._header if offset else Student.DEFAULT_SUBJECTS)
+            cells = ["" if c is None else c for c in row[:width]]
+            if not cells or all(not str(c).strip() for c in cells):
+                continue
+            sid = str(cells[0]).strip()
+            if not sid:
+                continue
+            out.append((sid, hash(tuple(cells)), cells))
+        return (header if offset == 0 else self._header), out
+
+    def _iter_raw_rows(self, offset: int) -> Iterator[Sequence]:
+        path = Path(self.path)
+        if not path.exists():
+            return
+        if path.suffix.lower() in EXCEL_SUFFIXES:
+            import openpyxl
+            wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+            try:
+                yield from wb.active.iter_rows(values_only=True)
+            finally:
+                wb.close()
+            return
+        if offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                text = f.read().decode("utf-8")
+            yield from csv.reader(io.StringIO(text, newline=""))
+            return
+        with path.open("r", encoding="utf-8", newline="") as f:
+            yield from csv.reader(f)
+
+    @staticmethod
+    def _parse(rows: Iterable[Tuple[str, Sequence]], matrix: ScoreMatrix) -> Iterator[Student]:
+        for sid, cells in rows:
+            try:
+                yield Student.from_row(list(cells), matrix)
+            except Exception as e:
+                print(f"Skipping malformed row for {sid}: {e}")
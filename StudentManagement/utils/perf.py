@@ -0,0 +1,173 @@
+from typing import Any, Callable, Dict, Optional, TypeVar
+from contextlib import contextmanager
+import functools
+import json
+import os
+import threading
+import time
+
+"""
+Lightweight timing / counter instrumentation for the hot paths (file I/O, sorting,
+filtering, search, table refresh).
+
+Usage:
+    @perf.timed("load_students")
+    def load_students(...): ...
+
+    with perf.span("render"): ...
+    perf.count("sort_students.key_calls", n)
+
+    perf.enable()            # or set STUDENT_PERF=1 before starting
+    perf.snapshot()          # dict, see below
+    perf.dump("perf.json")   # same data as JSON
+
+Notes:
+- Disabled by default. While disabled, a timed function costs one extra call and a
+  flag check; span() returns a shared no-op context and count() returns immediately.
+- Recording is thread-safe (load/save run in a background thread).
+"""
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_enabled = os.environ.get("STUDENT_PERF", "") not in ("", "0")
+_lock = threading.Lock()
+# name -> [count, total_s, max_s, last_s]
+_timers: Dict[str, list] = {}
+_counters: Dict[str, int] = {}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable(on: bool = True) -> None:
+    """Turn recording on (or off with on=False). Collected data is kept."""
+    global _enabled
+    _enabled = bool(on)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Drop all recorded timings and counters."""
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+def record(name: str, seconds: float) -> None:
+    """Add one timing sample for name."""
+    with _lock:
+        t = _timers.get(name)
+        if t is None:
+            _timers[name] = [1, seconds, seconds, seconds]
+        else:
+            t[0] += 1
+            t[1] += seconds
+            if seconds > t[2]:
+                t[2] = seconds
+            t[3] = seconds
+
+
+def count(name: str, n: int = 1) -> None:
+    """Increment counter name by n (no-op while disabled)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+@contextmanager
+def _span(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def span(name: str):
+    """Context manager timing its block under name (shared no-op while disabled)."""
+    return _span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator timing every call of the function (default name: function __name__)."""
+    def decorate(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+
+def counting(fn: Callable[..., Any], name: str) -> Callable[..., Any]:
+    """
+    Wrap fn so its calls are counted; the total is added to counter name by .flush().
+    Intended for per-call hooks such as sort keys, so only use it when is_enabled().
+    """
+    calls = 0
+
+    def wrapper(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return fn(*args, **kwargs)
+
+    def flush():
+        nonlocal calls
+        count(name, calls)
+        calls = 0
+
+    wrapper.flush = flush
+    return wrapper
+
+
+def snapshot() -> dict:
+    """
+    Return recorded data:
+      {"enabled": bool,
+       "timers": {name: {count, total_ms, mean_ms, max_ms, last_ms}},
+       "counters": {name: int}}
+    """
+    with _lock:
+        timers = {
+            name: {
+                "count": c,
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total * 1000 / c, 3),
+                "max_ms": round(mx * 1000, 3),
+                "last_ms": round(last * 1000, 3),
+            }
+            for name, (c, total, mx, last) in sorted(_timers.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {"enabled": _enabled, "timers": timers, "counters": counters}
+
+
+def dump(filename: str) -> bool:
+    """Write snapshot() as JSON to filename. Returns True on success."""
+    try:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(snapshot(), f, indent=2)
+            f.write("\n")
+        return True
+    except Exception as ex:
+        print(f"Error writing {filename}: {ex}")
+        return False